@@ -0,0 +1,149 @@
+# How the parameter ranges shape each problem type
+#
+#   python analyze_problem_space.py              table for every topic and type
+#   python analyze_problem_space.py --json FILE  also save the numbers
+#
+# Every type's whole parameter space is evaluated at once with NumPy: template
+# expressions run over parameter grids, and multi-step graphs run their formulas
+# over the same grids with the same per-step rounding. For each type it reports:
+#   problems     distinct parameter combinations
+#   answers      distinct answers
+#   collisions   problems sharing an answer with another problem (largest group in brackets)
+#   confusable   pairs of distinct answers close enough that grade() accepts one for the other
+#   whole        problems with a whole-number answer
+#   degenerate   answers that are NaN/infinite, zero or negative, and parameters
+#                that never change the answer
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import smartlearn_physics as slp
+
+# np.round scales, rounds and unscales, which disagrees with Python's round() on
+# values that sit near a tie (2.675 and the like); the answers must match the app's
+# exactly, so rounding calls the builtin element-wise
+_round = np.frompyfunc(round, 2, 1)
+
+def exact_round(x, ndigits=None):
+    return _round(x, ndigits).astype(np.float64)
+
+# NumPy stand-ins for TEMPLATE_FUNCTIONS
+NUMPY_FUNCTIONS = {
+    "sqrt": np.sqrt,
+    "sin": np.sin,
+    "cos": np.cos,
+    "tan": np.tan,
+    "radians": np.radians,
+    "round": exact_round,
+    "abs": np.abs,
+}
+
+# ======================
+# VECTORIZED ANSWERS
+# ======================
+def parameter_grid(kind):
+    # One flat float64 array per parameter, in itertools.product order
+    pools = [np.asarray(values, dtype=np.float64) for values in _pools(kind)]
+    if not pools:
+        return [], ()
+    grids = np.meshgrid(*pools, indexing="ij")
+    return [g.ravel() for g in grids], grids[0].shape
+
+def _pools(kind):
+    if isinstance(kind, slp.ProblemTemplate):
+        return list(kind.param_values.values())
+    if isinstance(kind, slp.ProblemGraph):
+        return [q.values for q in kind.givens]
+    return [sorted({p[i] for p in kind.param_space()}) for i in range(len(kind.param_names))]
+
+def answers(kind, columns):
+    values = dict(zip(kind.param_names, columns))
+    if isinstance(kind, slp.ProblemTemplate):
+        namespace = dict(NUMPY_FUNCTIONS, __builtins__={})
+        values.update(kind.constants)
+        for name, expression in kind.derived.items():
+            values[name] = eval(expression, namespace, values)
+        result = eval(kind.answer_expression, namespace, values)
+    elif isinstance(kind, slp.ProblemGraph):
+        for q in kind.steps:
+            values[q.symbol] = exact_round(q.formula(*(values[name] for name in q.inputs)), 2)
+        result = values[kind.target]
+    else:
+        # Unknown kinds: fall back to one compute() call per problem
+        result = np.fromiter((kind.compute(p) for p in kind.param_space()), dtype=np.float64)
+    return np.broadcast_to(np.asarray(result, dtype=np.float64), columns[0].shape if columns else ())
+
+# ======================
+# ANALYSIS
+# ======================
+def analyze(kind, tolerance=slp.TOLERANCE):
+    columns, shape = parameter_grid(kind)
+    with np.errstate(all="ignore"):
+        values = answers(kind, columns).ravel()
+    problems = values.size
+    finite = np.isfinite(values)
+    distinct, counts = np.unique(values[finite], return_counts=True)
+
+    # Distinct answers a < b where grade() accepts a for b: b - a <= tol·|b|, so for
+    # each a count the sorted answers up to a + tol·|a| / (1 - tol)
+    reach = distinct + tolerance * np.abs(distinct) / (1 - tolerance)
+    confusable = int((np.searchsorted(distinct, reach, side="right") - np.arange(distinct.size) - 1).sum())
+
+    # A parameter is inert if the answer never varies along its axis
+    inert = []
+    if columns and finite.all():
+        grid = values.reshape(shape)
+        inert = [name for axis, name in enumerate(kind.param_names)
+                 if shape[axis] > 1 and not np.ptp(grid, axis=axis).any()]
+
+    shared = counts[counts > 1]
+    return {
+        "topic": kind.topic,
+        "type": kind.problem_type,
+        "name": kind.name,
+        "problems": int(problems),
+        "answers": int(distinct.size),
+        "collisions": int(shared.sum()),
+        "largest_collision": int(counts.max()) if counts.size else 0,
+        "confusable_pairs": confusable,
+        "whole": int(np.count_nonzero(finite & (values == np.round(values)))),
+        "non_finite": int(problems - np.count_nonzero(finite)),
+        "zero": int(np.count_nonzero(values == 0)),
+        "negative": int(np.count_nonzero(values < 0)),
+        "inert_params": inert,
+        "range": [float(distinct[0]), float(distinct[-1])] if distinct.size else None,
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Analyze the problem space of every generator")
+    parser.add_argument("--json", metavar="FILE", help="write the report to FILE")
+    parser.add_argument("--tolerance", type=float, default=slp.TOLERANCE,
+                        help=f"grading tolerance for confusable answers (default {slp.TOLERANCE})")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    report = [analyze(kind, args.tolerance) for kinds in slp.PROBLEM_TYPES.values() for kind in kinds]
+    elapsed = time.perf_counter() - start
+
+    print(f"{'type':32s} {'problems':>9s} {'answers':>8s} {'collisions':>16s} {'confusable':>11s} {'whole':>7s}  degenerate")
+    for r in report:
+        degenerate = [f"{r[k]} {k.replace('_', '-')}" for k in ("non_finite", "zero", "negative") if r[k]]
+        degenerate += [f"'{name}' has no effect" for name in r["inert_params"]]
+        collisions = f"{r['collisions']} ({r['largest_collision']})" if r["collisions"] else "0"
+        print(f"{r['topic'] + ' ' + str(r['type']) + ' ' + r['name']:32.32s} {r['problems']:>9,d} {r['answers']:>8,d} "
+              f"{collisions:>16s} {r['confusable_pairs']:>11,d} {r['whole']:>7,d}  {', '.join(degenerate) or '-'}")
+    print(f"{len(report)} problem types in {elapsed * 1000:.0f} ms")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"tolerance": args.tolerance, "types": report}, f, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
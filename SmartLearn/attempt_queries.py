@@ -0,0 +1,123 @@
+# Vectorized queries over exported attempt logs
+#
+# Exports come from the History screen (💾 Export) or SessionHistory.export(). Any
+# number of them - a whole district's - are combined into one set of columns.
+#
+#   python attempt_queries.py accuracy class_a.npz class_b.npz   accuracy by topic and week
+#   python attempt_queries.py hints exports/*.npz                hint usage vs. difficulty
+#
+# A path without .npz is read as a directory of .npy columns and memory-mapped.
+import argparse
+import os
+import sys
+
+import numpy as np
+
+COLUMNS = ("topic", "problem_type", "params", "answer", "submitted", "hints", "elapsed", "correct", "timestamp")
+DAY = 24 * 3600
+WEEK = 7 * DAY
+MONDAY = 3 * DAY  # the Unix epoch fell on a Thursday
+
+# ======================
+# LOADING
+# ======================
+def load_one(path):
+    if path.endswith(".npz"):
+        with np.load(path) as archive:
+            return {name: archive[name] for name in ("topics",) + COLUMNS}
+    return {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r")
+            for name in ("topics",) + COLUMNS}
+
+def load(paths):
+    # Topic ids are local to each export, so they are remapped onto one shared list
+    parts = [load_one(path) for path in paths]
+    topics = sorted({str(t) for part in parts for t in part["topics"]})
+    index = {topic: i for i, topic in enumerate(topics)}
+    data = {"topics": np.array(topics)}
+    if len(parts) == 1:
+        part = parts[0]
+        remap = np.array([index[str(t)] for t in part["topics"]], dtype=np.int32)
+        data.update({name: part[name] for name in COLUMNS})
+        data["topic"] = remap[part["topic"]] if len(remap) else part["topic"].astype(np.int32)
+        return data
+    for name in COLUMNS:
+        if name == "topic":
+            data[name] = np.concatenate([
+                np.array([index[str(t)] for t in part["topics"]], dtype=np.int32)[part["topic"]]
+                for part in parts])
+        elif name == "params":
+            width = max(part["params"].shape[1] for part in parts)
+            data[name] = np.concatenate([
+                np.pad(part["params"], ((0, 0), (0, width - part["params"].shape[1])), constant_values=np.nan)
+                for part in parts])
+        else:
+            data[name] = np.concatenate([part[name] for part in parts])
+    return data
+
+# ======================
+# QUERIES
+# ======================
+def answered(data):
+    # Attempts where a number was submitted; skips and empty exam answers are left out
+    return ~np.isnan(data["submitted"])
+
+def group(major, minor):
+    # Group ids for each row by (major, minor), and the distinct pairs. Both are
+    # packed into one int64 key, which np.unique sorts far faster than rows.
+    major = np.asarray(major, dtype=np.int64)
+    minor = np.asarray(minor, dtype=np.int64)
+    low = minor.min() if len(minor) else 0
+    span = (minor.max() - low + 1) if len(minor) else 1
+    unique, inverse = np.unique(major * span + (minor - low), return_inverse=True)
+    return np.stack([unique // span, unique % span + low], axis=1), inverse.reshape(-1)
+
+def accuracy_by_topic_week(data):
+    # [(topic, week start as datetime64[D], attempts, accuracy)]
+    mask = answered(data)
+    topic = data["topic"][mask]
+    week = ((data["timestamp"][mask] + MONDAY) // WEEK).astype(np.int64)
+    keys, inverse = group(topic, week)
+    attempts = np.bincount(inverse, minlength=len(keys))
+    correct = np.bincount(inverse, weights=data["correct"][mask], minlength=len(keys))
+    starts = (keys[:, 1] * WEEK - MONDAY).astype("datetime64[s]").astype("datetime64[D]")
+    return [(str(data["topics"][t]), start, int(n), c / n)
+            for (t, _), start, n, c in zip(keys, starts, attempts, correct)]
+
+def hints_vs_difficulty(data):
+    # Difficulty of a problem type = its error rate. Returns one row per type,
+    # (topic, type, attempts, error rate, mean hints), and the correlation
+    # between error rate and mean hints across types.
+    mask = answered(data)
+    keys, inverse = group(data["topic"][mask], data["problem_type"][mask])
+    attempts = np.bincount(inverse, minlength=len(keys))
+    errors = attempts - np.bincount(inverse, weights=data["correct"][mask], minlength=len(keys))
+    hints = np.bincount(inverse, weights=data["hints"][mask], minlength=len(keys))
+    error_rate = errors / attempts
+    mean_hints = hints / attempts
+    correlation = np.nan
+    if len(keys) > 1 and error_rate.std() and mean_hints.std():
+        correlation = float(np.corrcoef(error_rate, mean_hints)[0, 1])
+    rows = [(str(data["topics"][t]), int(kind), int(n), e, h)
+            for (t, kind), n, e, h in zip(keys, attempts, error_rate, mean_hints)]
+    return rows, correlation
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Query exported SmartLearn attempt logs")
+    parser.add_argument("query", choices=("accuracy", "hints"))
+    parser.add_argument("paths", nargs="+", help=".npz exports or directories of .npy columns")
+    args = parser.parse_args(argv)
+
+    data = load(args.paths)
+    print(f"{len(data['topic']):,d} attempts from {len(args.paths)} export(s)")
+    if args.query == "accuracy":
+        for topic, week, n, accuracy in accuracy_by_topic_week(data):
+            print(f"{topic:20s} week of {week}  {n:>9,d} answered  {accuracy:6.1%} correct")
+    else:
+        rows, correlation = hints_vs_difficulty(data)
+        for topic, kind, n, error_rate, mean_hints in sorted(rows, key=lambda r: r[3]):
+            print(f"{topic:20s} type {kind}  {n:>9,d} answered  {error_rate:6.1%} wrong  {mean_hints:.2f} hints")
+        print(f"Correlation of error rate and hint use: {correlation:.2f}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,299 @@
+# Streaming summaries of exported attempt logs, for logs too big to load at once
+#
+#   python attempt_stats.py class_a.npz class_b.npz          per-topic summary
+#   python attempt_stats.py district/ --json report.json     every export under district/
+#
+# attempt_queries.py loads whole columns; this reads fixed-size chunks of rows
+# straight from the files (memory-mapped where the data is stored uncompressed,
+# as SessionHistory.export() writes it) and folds them into small summaries per topic:
+#   accuracy     answered and correct counts
+#   hints        count, mean and sum of squared deviations (Chan et al.), so
+#                partial results merge into the exact mean and variance
+#   solve time   a merging t-digest of the seconds taken on correct answers
+# Exports are split into row ranges that run in a process pool and the partial
+# summaries are merged as they finish. Memory depends on --chunk and --jobs,
+# not on the number of attempts.
+import argparse
+import json
+import math
+import os
+import struct
+import sys
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import NamedTuple
+
+import numpy as np
+
+COLUMNS = ("topic", "submitted", "hints", "elapsed", "correct")  # the only ones read
+QUANTILES = (0.5, 0.9, 0.99)
+
+# ======================
+# MERGEABLE SUMMARIES
+# ======================
+class Moments:
+    # Count, mean and M2 (sum of squared deviations from the mean)
+    def __init__(self, count=0, mean=0.0, m2=0.0):
+        self.count = count
+        self.mean = mean
+        self.m2 = m2
+
+    def merge(self, other):
+        count = self.count + other.count
+        if not count:
+            return
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+
+    @property
+    def variance(self):
+        return self.m2 / (self.count - 1) if self.count > 1 else math.nan
+
+class TDigest:
+    # Merging t-digest (Dunning & Ertl): weighted centroids in sorted order, sized
+    # with the k1 scale function so clusters stay small in the tails. At most about
+    # compression / 2 centroids are kept, however many values were added.
+    def __init__(self, compression=200):
+        self.compression = compression
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self.min = math.inf
+        self.max = -math.inf
+
+    @property
+    def count(self):
+        return float(self.weights.sum())
+
+    def add(self, values, weights=None):
+        values = np.asarray(values, dtype=np.float64)
+        if not values.size:
+            return
+        if weights is None:
+            weights = np.ones(values.size)
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        means = np.concatenate((self.means, values))
+        weights = np.concatenate((self.weights, weights))
+        order = np.argsort(means, kind="stable")
+        self.compress(means[order], weights[order])
+
+    def merge(self, other):
+        low, high = other.min, other.max
+        self.add(other.means, other.weights)
+        self.min = min(self.min, low)
+        self.max = max(self.max, high)
+
+    def compress(self, means, weights):
+        # Each value joins the cluster numbered by the k-scale of its mid quantile
+        total = weights.sum()
+        q = (np.cumsum(weights) - weights / 2) / total
+        k = self.compression / (2 * math.pi) * np.arcsin(np.clip(2 * q - 1, -1, 1))
+        cluster = np.floor(k).astype(np.int64)
+        starts = np.flatnonzero(np.diff(cluster, prepend=cluster[0] - 1))
+        self.weights = np.add.reduceat(weights, starts)
+        self.means = np.add.reduceat(means * weights, starts) / self.weights
+
+    def quantile(self, q):
+        if not self.weights.size:
+            return math.nan
+        total = self.weights.sum()
+        middles = np.cumsum(self.weights) - self.weights / 2
+        return float(np.interp(q * total, np.concatenate(([0], middles, [total])),
+                               np.concatenate(([self.min], self.means, [self.max]))))
+
+class TopicStats:
+    def __init__(self, compression=200):
+        self.answered = 0
+        self.correct = 0
+        self.hints = Moments()
+        self.solve_time = TDigest(compression)
+
+    def merge(self, other):
+        self.answered += other.answered
+        self.correct += other.correct
+        self.hints.merge(other.hints)
+        self.solve_time.merge(other.solve_time)
+
+    def report(self):
+        return {
+            "answered": self.answered,
+            "accuracy": self.correct / self.answered if self.answered else math.nan,
+            "hints_mean": self.hints.mean,
+            "hints_sd": math.sqrt(self.hints.variance),
+            "solve_time": {f"p{round(q * 100)}": self.solve_time.quantile(q) for q in QUANTILES},
+        }
+
+# ======================
+# READING EXPORTS
+# ======================
+class Column(NamedTuple):
+    path: str     # .npy file, or the .npz archive holding it
+    member: str   # archive member name, or None
+    offset: int   # byte offset of the data in path, or None if it is compressed
+    dtype: np.dtype
+    rows: int
+
+def _read_header(f):
+    version = np.lib.format.read_magic(f)
+    if version == (1, 0):
+        shape, _, dtype = np.lib.format.read_array_header_1_0(f)
+    else:
+        shape, _, dtype = np.lib.format.read_array_header_2_0(f)
+    return dtype, shape[0]
+
+def _member_offset(path, info):
+    # Start of a member's data: its local file header is 30 bytes plus name and extra field
+    with open(path, "rb") as f:
+        f.seek(info.header_offset)
+        name_length, extra_length = struct.unpack("<HH", f.read(30)[26:30])
+    return info.header_offset + 30 + name_length + extra_length
+
+def open_export(path):
+    # ({name: Column} for COLUMNS, topic names) of one export
+    columns = {}
+    if path.endswith(".npz"):
+        with zipfile.ZipFile(path) as archive:
+            for name in COLUMNS:
+                info = archive.getinfo(f"{name}.npy")
+                with archive.open(info) as f:
+                    dtype, rows = _read_header(f)
+                    header = f.tell()
+                offset = None
+                if info.compress_type == zipfile.ZIP_STORED:
+                    offset = _member_offset(path, info) + header
+                columns[name] = Column(path, info.filename, offset, dtype, rows)
+            with archive.open("topics.npy") as f:
+                topics = np.lib.format.read_array(f)
+    else:
+        for name in COLUMNS:
+            file = os.path.join(path, f"{name}.npy")
+            with open(file, "rb") as f:
+                dtype, rows = _read_header(f)
+                columns[name] = Column(file, None, f.tell(), dtype, rows)
+        topics = np.load(os.path.join(path, "topics.npy"))
+    return columns, [str(t) for t in topics]
+
+def read_rows(column, start, stop, chunk):
+    # Arrays of at most `chunk` rows covering start..stop
+    if column.offset is not None:
+        data = np.memmap(column.path, column.dtype, "r", column.offset, (column.rows,))
+        for low in range(start, stop, chunk):
+            yield data[low:min(low + chunk, stop)]
+        return
+    # Compressed members can only be read from the start
+    with zipfile.ZipFile(column.path) as archive, archive.open(column.member) as f:
+        _read_header(f)
+        f.read(start * column.dtype.itemsize)
+        for low in range(start, stop, chunk):
+            count = min(chunk, stop - low)
+            yield np.frombuffer(f.read(count * column.dtype.itemsize), column.dtype, count)
+
+def find_exports(paths):
+    # .npz archives and .npy directories, searching any other directory given
+    for path in paths:
+        if path.endswith(".npz") or os.path.isfile(os.path.join(path, "topics.npy")):
+            yield path
+        elif os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                if "topics.npy" in files:
+                    dirs[:] = []
+                    yield root
+                else:
+                    yield from (os.path.join(root, f) for f in sorted(files) if f.endswith(".npz"))
+        else:
+            raise SystemExit(f"not an export: {path}")
+
+# ======================
+# SUMMARIZING
+# ======================
+def summarize(path, start, stop, chunk, compression):
+    # Runs in a worker: {topic: TopicStats} for rows start..stop of one export
+    columns, topics = open_export(path)
+    stats = {topic: TopicStats(compression) for topic in topics}
+    local = [stats[topic] for topic in topics]
+    n = len(topics)
+    for topic, submitted, hints, elapsed, correct in zip(*(read_rows(columns[name], start, stop, chunk)
+                                                          for name in COLUMNS)):
+        # Skips and blank exam answers have no submitted value and are left out
+        answered = ~np.isnan(submitted)
+        topic = topic[answered].astype(np.intp)
+        hints = hints[answered].astype(np.float64)
+        correct = correct[answered].astype(bool)
+        elapsed = elapsed[answered]
+
+        counts = np.bincount(topic, minlength=n)
+        right = np.bincount(topic, weights=correct, minlength=n)
+        means = np.bincount(topic, weights=hints, minlength=n) / np.maximum(counts, 1)
+        m2 = np.bincount(topic, weights=(hints - means[topic]) ** 2, minlength=n)
+
+        solved = correct & np.isfinite(elapsed)
+        solved_topic = topic[solved]
+        times = elapsed[solved][np.argsort(solved_topic, kind="stable")]
+        solved_counts = np.bincount(solved_topic, minlength=n)
+        ends = np.cumsum(solved_counts)
+
+        for t in np.flatnonzero(counts):
+            s = local[t]
+            s.answered += int(counts[t])
+            s.correct += int(right[t])
+            s.hints.merge(Moments(int(counts[t]), float(means[t]), float(m2[t])))
+            s.solve_time.add(times[ends[t] - solved_counts[t]:ends[t]])
+    return {topic: s for topic, s in stats.items() if s.answered}
+
+def plan(exports, shard):
+    # (path, start, stop) for every task
+    for path in exports:
+        columns, _ = open_export(path)
+        rows = columns["topic"].rows
+        if any(column.offset is None for column in columns.values()):
+            yield path, 0, rows
+        else:
+            for start in range(0, rows, shard):
+                yield path, start, min(start + shard, rows)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Summarize exported SmartLearn attempt logs in bounded memory")
+    parser.add_argument("paths", nargs="+", help=".npz exports, directories of .npy columns, or folders of either")
+    parser.add_argument("--jobs", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--chunk", type=int, default=1 << 18, help="rows read at a time (default %(default)s)")
+    parser.add_argument("--shard", type=int, default=1 << 23, help="rows per task (default %(default)s)")
+    parser.add_argument("--compression", type=int, default=200,
+                        help="t-digest compression; higher is more accurate (default %(default)s)")
+    parser.add_argument("--json", metavar="FILE", help="write the report to FILE")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    exports = list(find_exports(args.paths))
+    totals = {}
+    with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+        futures = [pool.submit(summarize, path, lo, hi, args.chunk, args.compression)
+                   for path, lo, hi in plan(exports, args.shard)]
+        for future in as_completed(futures):
+            for topic, stats in future.result().items():
+                totals.setdefault(topic, TopicStats(args.compression)).merge(stats)
+    elapsed = time.perf_counter() - start
+
+    overall = TopicStats(args.compression)
+    for stats in totals.values():
+        overall.merge(stats)
+    report = {topic: totals[topic].report() for topic in sorted(totals)}
+    report["All topics"] = overall.report()
+
+    print(f"{'topic':20s} {'answered':>12s} {'correct':>8s} {'hints':>12s}  solve time p50 / p90 / p99")
+    for topic, r in report.items():
+        p = r["solve_time"]
+        print(f"{topic:20s} {r['answered']:>12,d} {r['accuracy']:>8.1%} {r['hints_mean']:>5.2f} ± {r['hints_sd']:<4.2f}"
+              f"  {p['p50']:6.1f}s / {p['p90']:6.1f}s / {p['p99']:6.1f}s")
+    print(f"{overall.answered:,d} answered attempts from {len(exports)} export(s) in {elapsed:.1f}s")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"exports": len(exports), "seconds": round(elapsed, 2), "topics": report}, f, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,257 @@
+# SmartLearn Physics benchmarks
+#
+#   python benchmarks.py                     run everything, print a table
+#   python benchmarks.py --json out.json     also save machine-readable results
+#   python benchmarks.py --compare old.json  flag regressions against a saved run
+#
+# UI benchmarks need a display. Without $DISPLAY they start a private Xvfb
+# server if one is installed, and are skipped otherwise.
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+
+import smartlearn_physics as slp
+
+# ======================
+# HELPERS
+# ======================
+def metric(value, unit, better):
+    return {"value": round(value, 4), "unit": unit, "better": better}
+
+def throughput(func, min_time):
+    # Repeat func until min_time has passed; report calls per second
+    calls = 0
+    batch = 64
+    start = time.perf_counter()
+    while True:
+        for _ in range(batch):
+            func()
+        calls += batch
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            return calls / elapsed
+        batch *= 2
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=HERE,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+# ======================
+# GENERATION AND GRADING
+# ======================
+def bench_generation(min_time):
+    results = {}
+    for topic, kinds in slp.PROBLEM_TYPES.items():
+        results[f"generate/{topic}/any"] = metric(
+            throughput(lambda: slp.PhysicsProblem(topic), min_time), "problems/s", "higher")
+        for kind in kinds:
+            results[f"generate/{topic}/{kind.problem_type}"] = metric(
+                throughput(lambda: slp.PhysicsProblem(topic, problem_type=kind.problem_type), min_time),
+                "problems/s", "higher")
+    return results
+
+def bench_grading(min_time):
+    # The app's own graders: grade() as ProblemFrame.check_answer and the drill
+    # call it, and grade_paper() as an exam submission does (text answers, some
+    # not numbers). check_answer itself, widgets and all, is timed in ui_worker.
+    rng = random.Random(1)
+    problems = [slp.PhysicsProblem(rng.choice(list(slp.PROBLEM_TYPES))) for _ in range(1000)]
+    answers = [rng.choice([p.answer, p.answer * 1.01, p.answer + 1, "abc"]) for p in problems]
+    values = [(a if isinstance(a, float) else 0.0, p.answer) for a, p in zip(answers, problems)]
+    texts = [str(a) for a in answers]
+    grade = slp.grade
+
+    def grade_all():
+        for value, correct in values:
+            grade(value, correct)
+
+    return {
+        "grade/grade": metric(throughput(grade_all, min_time) * len(values), "answers/s", "higher"),
+        "grade/grade_paper": metric(throughput(lambda: slp.grade_paper(problems, texts), min_time) * len(texts),
+                                    "answers/s", "higher"),
+    }
+
+# ======================
+# STARTUP AND UI
+# ======================
+IMPORT_PROBE = (
+    "import sys, time; sys.path.insert(0, {here!r}); t = time.perf_counter(); "
+    "import smartlearn_physics; print(time.perf_counter() - t)"
+)
+
+def bench_import(runs):
+    samples = []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", IMPORT_PROBE.format(here=HERE)],
+                             capture_output=True, text=True, check=True).stdout
+        samples.append(float(out))
+    return {"startup/cold_import": metric(statistics.median(samples) * 1000, "ms", "lower")}
+
+def start_xvfb():
+    xvfb = shutil.which("Xvfb")
+    if not xvfb:
+        return None, None
+    for number in range(90, 100):
+        if not os.path.exists(f"/tmp/.X11-unix/X{number}"):
+            server = subprocess.Popen([xvfb, f":{number}", "-screen", "0", "1280x1024x24"],
+                                      stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            time.sleep(1)
+            return server, f":{number}"
+    return None, None
+
+def bench_ui(runs, iterations):
+    env = dict(os.environ)
+    server = None
+    if not env.get("DISPLAY"):
+        server, display = start_xvfb()
+        if not server:
+            print("No display and no Xvfb: skipping startup and UI benchmarks", file=sys.stderr)
+            return {}
+        env["DISPLAY"] = display
+
+    try:
+        startups = []
+        ui = None
+        for run in range(runs):
+            cmd = [sys.executable, os.path.abspath(__file__), "--ui-worker", str(iterations if run == 0 else 0)]
+            out = json.loads(subprocess.run(cmd, env=env, capture_output=True, text=True, check=True).stdout)
+            startups.append(out.pop("startup"))
+            ui = ui or out
+    finally:
+        if server:
+            server.terminate()
+
+    results = {"startup/app_ready": metric(statistics.median(startups) * 1000, "ms", "lower")}
+    for name, summary in ui.items():
+        for stat in ("p50_ms", "p95_ms", "p99_ms"):
+            results[f"ui/{name}/{stat[:-3]}"] = metric(summary[stat], "ms", "lower")
+    return results
+
+def ui_worker(iterations):
+    # Runs in a fresh process with a display: time startup, then frame switches,
+    # problem loads and answer checks, each including the redraw they trigger
+    start = time.perf_counter()
+    app = slp.SmartLearnPhysics()
+    app.update()
+    report = {"startup": time.perf_counter() - start}
+
+    # Nothing may run alongside the timed loop. Nice-answer tables have no
+    # background builder (they are built on first use, and the problems below
+    # don't ask for them); drain any idle work left from startup.
+    app.update_idletasks()
+    app.update()
+
+    switch = slp.LatencyHistogram()
+    load = slp.LatencyHistogram()
+    check = slp.LatencyHistogram()
+    frames = list(app.frames)
+    problem_frame = app.frames["ProblemFrame"]
+    topics = list(slp.PROBLEM_TYPES)
+    clock = time.perf_counter_ns
+    for i in range(iterations):
+        t = clock()
+        app.show_frame(frames[i % len(frames)])
+        app.update()
+        switch.record(clock() - t)
+
+        problem = app.current_problem = slp.PhysicsProblem(topics[i % len(topics)])
+        t = clock()
+        problem_frame.load_problem()
+        app.update()
+        load.record(clock() - t)
+
+        app.show_frame("ProblemFrame")
+        problem_frame.answer_entry.delete(0, "end")
+        problem_frame.answer_entry.insert(0, str(problem.answer if i % 2 else problem.answer + 1))
+        app.update()
+        t = clock()
+        problem_frame.check_answer()
+        app.update()
+        check.record(clock() - t)
+
+    if iterations:
+        report["show_frame"] = switch.summary()
+        report["load_problem"] = load.summary()
+        report["check_answer"] = check.summary()
+    app.destroy()
+    print(json.dumps(report))
+
+# ======================
+# REPORTING
+# ======================
+def compare(results, baseline, threshold):
+    regressions = []
+    for name, current in results.items():
+        old = baseline.get(name)
+        if not old or not old["value"]:
+            continue
+        change = (current["value"] - old["value"]) / old["value"]
+        worse = -change if current["better"] == "higher" else change
+        if worse > threshold:
+            regressions.append((name, old["value"], current["value"], worse))
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark SmartLearn Physics")
+    parser.add_argument("--json", metavar="FILE", help="write results to FILE")
+    parser.add_argument("--compare", metavar="FILE", help="compare against a previous --json run")
+    parser.add_argument("--threshold", type=float, default=0.15,
+                        help="relative slowdown reported as a regression (default 0.15)")
+    parser.add_argument("--quick", action="store_true", help="shorter runs, noisier numbers")
+    parser.add_argument("--skip-ui", action="store_true", help="skip startup and UI benchmarks")
+    parser.add_argument("--ui-worker", type=int, metavar="N", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.ui_worker is not None:
+        ui_worker(args.ui_worker)
+        return 0
+
+    min_time = 0.05 if args.quick else 0.3
+    runs = 3 if args.quick else 7
+    results = {}
+    results.update(bench_generation(min_time))
+    results.update(bench_grading(min_time))
+    results.update(bench_import(runs))
+    if not args.skip_ui:
+        results.update(bench_ui(runs, 50 if args.quick else 300))
+
+    for name, m in results.items():
+        print(f"{name:45s} {m['value']:>14,.4f} {m['unit']}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({
+                "meta": {
+                    "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                    "revision": git_revision(),
+                    "python": platform.python_version(),
+                    "platform": platform.platform(),
+                    "machine": platform.machine(),
+                },
+                "results": results,
+            }, f, indent=2)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.threshold)
+        for name, old, new, worse in regressions:
+            print(f"REGRESSION {name}: {old} -> {new} ({worse:+.0%})")
+        return 1 if regressions else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
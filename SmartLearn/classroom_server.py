@@ -0,0 +1,309 @@
+# Classroom leaderboard server for SmartLearn Physics
+#
+#   python classroom_server.py [--host 127.0.0.1] [--port 8765]
+#
+# Students' apps report their XP (launch the app with --classroom URL --student NAME).
+#   POST /score   {"student": "ana", "score": 120}  or  {"student": "ana", "delta": 8}
+#   GET  /rank?student=ana
+#   GET  /top?k=10
+#   GET  /events  Server-Sent Events: the top of the board whenever it changes
+#
+# Standard library only, so any classroom PC can run it.
+import argparse
+import asyncio
+import http.client
+import json
+import sys
+import threading
+import urllib.parse
+import urllib.request
+from typing import Dict, List, Tuple
+
+# ======================
+# RANKED INDEX
+# ======================
+# The tree has one slot per possible score, so scores are capped: an unchecked
+# POST could otherwise make it allocate billions of slots
+MAX_SCORE = 1_000_000
+
+class FenwickTree:
+    # Counts of students per score; prefix sums and k-th lookups in O(log max_score)
+    def __init__(self, size=1024):
+        self.size = size
+        self.tree = [0] * (size + 1)
+
+    def add(self, index, delta):
+        i = index + 1
+        while i <= self.size:
+            self.tree[i] += delta
+            i += i & -i
+
+    def prefix(self, index):
+        # Number of entries at positions 0..index
+        i = min(index + 1, self.size)
+        total = 0
+        while i > 0:
+            total += self.tree[i]
+            i -= i & -i
+        return total
+
+    def find(self, k):
+        # Smallest position whose prefix count reaches k (1-based k)
+        pos = 0
+        step = 1 << self.size.bit_length()
+        while step:
+            nxt = pos + step
+            if nxt <= self.size and self.tree[nxt] < k:
+                pos = nxt
+                k -= self.tree[nxt]
+            step >>= 1
+        return pos
+
+    @classmethod
+    def from_counts(cls, counts, size):
+        # O(size) build, used when scores outgrow the tree
+        tree = cls(size)
+        for index, count in counts.items():
+            tree.tree[index + 1] += count
+        for i in range(1, size + 1):
+            parent = i + (i & -i)
+            if parent <= size:
+                tree.tree[parent] += tree.tree[i]
+        return tree
+
+class Leaderboard:
+    def __init__(self):
+        self.scores: Dict[str, int] = {}
+        self.buckets: Dict[int, Dict[str, None]] = {}  # score -> students, in arrival order
+        self.tree = FenwickTree()
+
+    def __len__(self):
+        return len(self.scores)
+
+    def set_score(self, student: str, score: int) -> int:
+        if not 0 <= score <= MAX_SCORE:
+            raise ValueError(f"score must be between 0 and {MAX_SCORE}")
+        old = self.scores.get(student)
+        if old == score:
+            return score
+        if old is not None:
+            bucket = self.buckets[old]
+            del bucket[student]
+            if not bucket:
+                del self.buckets[old]
+            self.tree.add(old, -1)
+        if score >= self.tree.size:
+            size = max(self.tree.size * 2, score + 1)
+            counts = {s: len(b) for s, b in self.buckets.items()}
+            self.tree = FenwickTree.from_counts(counts, size)
+        self.scores[student] = score
+        self.buckets.setdefault(score, {})[student] = None
+        self.tree.add(score, 1)
+        return score
+
+    def add(self, student: str, delta: int) -> int:
+        return self.set_score(student, self.scores.get(student, 0) + delta)
+
+    def rank(self, student: str) -> int:
+        # 1 + number of students with a strictly higher score; ties share a rank
+        score = self.scores[student]
+        return 1 + len(self.scores) - self.tree.prefix(score)
+
+    def top(self, k: int) -> List[Tuple[int, str, int]]:
+        result = []
+        below = len(self.scores)  # students with a score below the last one visited
+        while below and len(result) < k:
+            score = self.tree.find(below)
+            bucket = self.buckets[score]
+            rank = 1 + len(self.scores) - below
+            for student in bucket:
+                if len(result) == k:
+                    break
+                result.append((rank, student, score))
+            below -= len(bucket)
+        return result
+
+# ======================
+# HTTP / SSE SERVER
+# ======================
+MAX_BODY = 64 * 1024
+MAX_SUBSCRIBER_BACKLOG = 256 * 1024  # slow SSE clients beyond this are dropped
+
+def _integer(value):
+    # JSON numbers only; int() would also accept "12", 12.7 and true
+    if type(value) is not int:
+        raise ValueError(f"expected an integer, got {value!r}")
+    return value
+
+class ClassroomServer:
+    def __init__(self, top_k=10, push_interval=0.25):
+        self.board = Leaderboard()
+        self.top_k = top_k
+        self.push_interval = push_interval
+        self.version = 0
+        self.subscribers = set()
+
+    def snapshot(self):
+        top = [{"rank": r, "student": s, "score": score} for r, s, score in self.board.top(self.top_k)]
+        return {"students": len(self.board), "top": top}
+
+    async def broadcast(self):
+        # Changes are pushed at most once per interval, however many arrive
+        sent = self.version
+        while True:
+            await asyncio.sleep(self.push_interval)
+            if sent == self.version or not self.subscribers:
+                continue
+            sent = self.version
+            event = f"event: leaderboard\ndata: {json.dumps(self.snapshot())}\n\n".encode()
+            for writer in list(self.subscribers):
+                if writer.is_closing():
+                    self.subscribers.discard(writer)
+                elif writer.transport.get_write_buffer_size() > MAX_SUBSCRIBER_BACKLOG:
+                    self.subscribers.discard(writer)
+                    writer.close()
+                else:
+                    writer.write(event)
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, target, _ = request_line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                length = int(headers.get("content-length", 0))
+                if length > MAX_BODY:
+                    self.respond(writer, 413, {"error": "request too large"}, close=True)
+                    break
+                body = await reader.readexactly(length) if length else b""
+
+                url = urllib.parse.urlsplit(target)
+                if method == "GET" and url.path == "/events":
+                    self.open_stream(writer)
+                    try:
+                        # Clients never send anything more; EOF means they left
+                        while await reader.read(4096):
+                            pass
+                    finally:
+                        self.subscribers.discard(writer)
+                    break
+                status, payload = self.route(method, url.path, urllib.parse.parse_qs(url.query), body)
+                close = headers.get("connection", "").lower() == "close"
+                self.respond(writer, status, payload, close)
+                await writer.drain()
+                if close:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        writer.close()
+
+    def route(self, method, path, query, body):
+        try:
+            if method == "POST" and path == "/score":
+                data = json.loads(body or b"{}")
+                student = str(data["student"])
+                if "delta" in data:
+                    score = self.board.add(student, _integer(data["delta"]))
+                else:
+                    score = self.board.set_score(student, _integer(data["score"]))
+                self.version += 1
+                return 200, {"student": student, "score": score, "rank": self.board.rank(student)}
+            if method == "GET" and path == "/rank":
+                student = query["student"][0]
+                if student not in self.board.scores:
+                    return 404, {"error": f"unknown student '{student}'"}
+                return 200, {"student": student, "score": self.board.scores[student],
+                             "rank": self.board.rank(student), "of": len(self.board)}
+            if method == "GET" and path == "/top":
+                k = int(query.get("k", [self.top_k])[0])
+                top = self.board.top(max(0, min(k, 1000)))
+                return 200, {"students": len(self.board),
+                             "top": [{"rank": r, "student": s, "score": score} for r, s, score in top]}
+        except (KeyError, TypeError, ValueError) as e:
+            return 400, {"error": f"bad request: {e}"}
+        return 404, {"error": "not found"}
+
+    def respond(self, writer, status, payload, close=False):
+        body = json.dumps(payload).encode()
+        reason = {200: "OK", 400: "Bad Request", 404: "Not Found", 413: "Payload Too Large"}[status]
+        writer.write(
+            f"HTTP/1.1 {status} {reason}\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\nConnection: {'close' if close else 'keep-alive'}\r\n\r\n".encode()
+            + body
+        )
+
+    def open_stream(self, writer):
+        writer.write(
+            b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\nCache-Control: no-cache\r\n"
+            b"Connection: keep-alive\r\n\r\n"
+            + f"event: leaderboard\ndata: {json.dumps(self.snapshot())}\n\n".encode()
+        )
+        self.subscribers.add(writer)
+
+    async def serve(self, host, port):
+        server = await asyncio.start_server(self.handle, host, port, backlog=4096)
+        print(f"Classroom leaderboard on http://{host}:{port}")
+        async with server:
+            await asyncio.gather(server.serve_forever(), self.broadcast())
+
+# ======================
+# APP CLIENT
+# ======================
+class ClassroomClient:
+    # Sends the student's running XP total from a background thread. Only the
+    # latest total matters, so bursts collapse into a single request. A kiosk
+    # changes self.student between students; each keeps its own pending total.
+    def __init__(self, url: str, student: str):
+        self.url = url.rstrip("/") + "/score"
+        self.student = student
+        self.pending = {}  # student -> latest total
+        self.error = None  # last failure reported, so an offline server is logged once
+        self.condition = threading.Condition()
+        threading.Thread(target=self.run, daemon=True).start()
+
+    def submit(self, score: int):
+        with self.condition:
+            self.pending[self.student] = score
+            self.condition.notify()
+
+    def run(self):
+        while True:
+            with self.condition:
+                while not self.pending:
+                    self.condition.wait()
+                student = next(iter(self.pending))
+                score = self.pending.pop(student)
+            body = json.dumps({"student": student, "score": score}).encode()
+            request = urllib.request.Request(self.url, data=body, headers={"Content-Type": "application/json"})
+            try:
+                urllib.request.urlopen(request, timeout=5).close()
+                self.error = None
+            except (OSError, ValueError, http.client.HTTPException) as e:
+                # The next score update will carry the total anyway; a bad URL
+                # keeps failing, but must not end the thread
+                if str(e) != self.error:
+                    self.error = str(e)
+                    print(f"Classroom server {self.url}: {e}", file=sys.stderr)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="SmartLearn classroom leaderboard server")
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on (default: loopback)")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--top", type=int, default=10, help="entries pushed to /events subscribers")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(ClassroomServer(top_k=args.top).serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
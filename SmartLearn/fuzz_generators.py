@@ -0,0 +1,182 @@
+# Correctness fuzzing for the problem generators
+#
+#   python fuzz_generators.py                    every parameter combination of every type
+#   python fuzz_generators.py --seeds 1000000    also a million random problems per type
+#   python fuzz_generators.py --json report.json
+#
+# Each problem is checked four ways: the generated answer against an independent
+# reference solver, against kind.compute(), and against the last number in the
+# final hint and in the solution text. Errors such as ZeroDivisionError and NaN
+# or infinite answers are flagged as well. Work is spread over a process pool.
+import argparse
+import itertools
+import json
+import math
+import os
+import random
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import smartlearn_physics as slp
+
+G = 10  # the generators use g = 10 m/s²
+
+# ======================
+# REFERENCE SOLVERS
+# ======================
+# Written from the physics, not from the templates. The exact results are compared
+# with the generators' rounded answers, so the tolerance allows for rounding.
+REFERENCE = {
+    ("Kinematics", 1): lambda v0, a, t: v0 + a * t,
+    ("Kinematics", 2): lambda v0, a, t: v0 * t + a * t * t / 2,
+    ("Kinematics", 3): lambda v0, v, a: (v - v0) / a,
+    ("Free Fall", 1): lambda h: math.sqrt(2 * h / G),
+    ("Free Fall", 2): lambda h: math.sqrt(2 * G * h),
+    ("Dynamics", 1): lambda m, a: m * a,
+    ("Dynamics", 2): lambda F, a: F / a,
+    ("Dynamics", 3): lambda F, m: F / m,
+    ("Work & Energy", 1): lambda F, d: F * d,
+    ("Momentum", 1): lambda m, v: m * v,
+    ("Electricity", 1): lambda V, R: V / R,
+    ("Vectors", 1): lambda x, y: math.hypot(x, y),
+    ("Projectile Motion", 1): lambda v0, angle: (v0 * math.sin(math.radians(angle))) ** 2 / (2 * G),
+    ("Unit Conversion", 1): lambda value: value * 1000,
+    ("Unit Conversion", 2): lambda value: value / 1000,
+    ("Unit Conversion", 3): lambda value: value * 3600,
+    ("Unit Conversion", 4): lambda value: value / 100,
+    ("Unit Conversion", 5): lambda value: value / 1000,
+    ("Multi-Step", 1): lambda m, g, h: m * math.sqrt(2 * g * h),
+    ("Multi-Step", 2): lambda F, d, t: F * d / t,
+    ("Multi-Step", 3): lambda m, v0, a, t: m * (v0 + a * t) ** 2 / 2,
+}
+
+NUMBER = re.compile(r"[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?")
+
+def last_number(text):
+    numbers = NUMBER.findall(text)
+    return float(numbers[-1]) if numbers else None
+
+def close(value, expected, rel_tol, abs_tol):
+    return abs(value - expected) <= max(rel_tol * abs(expected), abs_tol)
+
+# ======================
+# CHECKING
+# ======================
+def check_problem(kind, reference, params, answer, hints, solution, rel_tol, abs_tol):
+    # Returns a list of (check, detail) for everything wrong with one problem
+    problems = []
+    if not isinstance(answer, (int, float)) or not math.isfinite(answer):
+        return [("non-finite", f"answer is {answer!r}")]
+    if kind.compute(params) != answer:
+        problems.append(("compute", f"compute() gives {kind.compute(params)!r}, generate gives {answer!r}"))
+    if reference is not None:
+        try:
+            expected = reference(*params)
+        except ZeroDivisionError:
+            problems.append(("reference", "reference solver divides by zero"))
+        else:
+            if not close(answer, expected, rel_tol, abs_tol):
+                problems.append(("answer", f"answer {answer!r}, reference {expected!r}"))
+    for name, text in (("hint", hints[-1] if hints else ""), ("solution", solution)):
+        shown = last_number(text)
+        if shown is None:
+            problems.append((name, f"no number in {name} text"))
+        elif not close(shown, answer, rel_tol, abs_tol):
+            problems.append((name, f"{name} shows {shown!r}, answer is {answer!r}"))
+    return problems
+
+def check_chunk(topic, problem_type, start, stop, seeded, rel_tol, abs_tol, max_examples):
+    # Runs in a worker: check problems start..stop of one type, either positions in
+    # its parameter space or random seeds
+    kind = slp.find_problem_type(topic, problem_type)
+    reference = REFERENCE.get((topic, problem_type))
+    memo = {}
+    counts = {}
+    examples = []
+    checked = 0
+    if seeded:
+        jobs = ((seed, None) for seed in range(start, stop))
+    else:
+        jobs = ((None, params) for params in itertools.islice(kind.param_space(), start, stop))
+    for seed, params in jobs:
+        checked += 1
+        try:
+            if seeded:
+                params, answer, _, hints, solution = kind.generate(random.Random(seed), memo)
+            else:
+                params, answer, _, hints, solution = kind.render(params, memo)
+            found = check_problem(kind, reference, params, answer, hints, solution, rel_tol, abs_tol)
+        except (ArithmeticError, ValueError) as e:
+            found = [("error", f"{type(e).__name__}: {e}")]
+        for check, detail in found:
+            counts[check] = counts.get(check, 0) + 1
+            if len(examples) < max_examples:
+                examples.append({"check": check, "params": list(params) if params else None,
+                                 "seed": seed, "detail": detail})
+    return topic, problem_type, checked, counts, examples
+
+def plan(seeds, chunk):
+    # (topic, type, start, stop, seeded) for every chunk of work
+    for topic, kinds in slp.PROBLEM_TYPES.items():
+        for kind in kinds:
+            size = sum(1 for _ in kind.param_space())
+            for start in range(0, size, chunk):
+                yield topic, kind.problem_type, start, min(start + chunk, size), False
+            for start in range(0, seeds, chunk):
+                yield topic, kind.problem_type, start, min(start + chunk, seeds), True
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cross-check every problem generator")
+    parser.add_argument("--seeds", type=int, default=0, metavar="N",
+                        help="also check N randomly generated problems per type")
+    parser.add_argument("--jobs", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--chunk", type=int, default=5000, help="problems per task")
+    parser.add_argument("--rel-tol", type=float, default=1e-3, help="relative tolerance (default 1e-3)")
+    parser.add_argument("--abs-tol", type=float, default=0.0051,
+                        help="absolute tolerance, covers rounding to 2 decimals (default 0.0051)")
+    parser.add_argument("--max-examples", type=int, default=10, help="failures kept per type and chunk")
+    parser.add_argument("--json", metavar="FILE", help="write the full report to FILE")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    report = {}
+    with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+        futures = [pool.submit(check_chunk, topic, problem_type, lo, hi, seeded,
+                               args.rel_tol, args.abs_tol, args.max_examples)
+                   for topic, problem_type, lo, hi, seeded in plan(args.seeds, args.chunk)]
+        for future in futures:
+            topic, problem_type, checked, counts, examples = future.result()
+            entry = report.setdefault(f"{topic}/{problem_type}", {
+                "topic": topic, "type": problem_type, "checked": 0, "failures": {}, "examples": [],
+                "reference": (topic, problem_type) in REFERENCE})
+            entry["checked"] += checked
+            for check, n in counts.items():
+                entry["failures"][check] = entry["failures"].get(check, 0) + n
+            entry["examples"].extend(examples[:max(0, args.max_examples - len(entry["examples"]))])
+    elapsed = time.perf_counter() - start
+
+    failed = 0
+    for name, entry in report.items():
+        total = sum(entry["failures"].values())
+        failed += total
+        status = "ok" if not total else ", ".join(f"{c}: {n}" for c, n in entry["failures"].items())
+        if not entry["reference"]:
+            status += " (no reference solver)"
+        print(f"{name:25s} {entry['checked']:>10,d} checked  {status}")
+        for example in entry["examples"][:3]:
+            print(f"    {example['check']}: {example['detail']} (params {example['params']}, seed {example['seed']})")
+    checked = sum(entry["checked"] for entry in report.values())
+    print(f"{checked:,d} problems in {elapsed:.1f}s, {failed:,d} failures")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"checked": checked, "failures": failed, "seconds": round(elapsed, 2),
+                       "types": report}, f, indent=2)
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
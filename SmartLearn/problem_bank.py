@@ -0,0 +1,217 @@
+# Shared-memory problem bank for multi-process servers
+#
+# The parent builds the parameter/answer table of every problem type once, in a
+# single multiprocessing.shared_memory segment; workers attach to it by name and
+# read it in place, so each extra worker adds no copy of the problem data.
+#
+#   bank = ProblemBank.create()                  # parent
+#   bank = ProblemBank.attach(name)              # each worker
+#   problem = bank.problem("Dynamics")           # a PhysicsProblem from the bank
+#
+#   python problem_bank.py create [--name NAME]  build and hold a bank until Ctrl+C
+#   python problem_bank.py info NAME             describe an existing bank
+import argparse
+import itertools
+import json
+import math
+import os
+import random
+import struct
+import sys
+from array import array
+from multiprocessing import resource_tracker, shared_memory
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import smartlearn_physics as slp
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+BANK_VERSION = 1
+MAX_ROWS = 50_000  # per problem type; larger parameter spaces are sampled
+_LENGTH = struct.Struct("<Q")
+
+class BankTable:
+    # Rows of float64: the problem's parameters followed by its answer
+    def __init__(self, info, buf, data_start):
+        self.topic = info["topic"]
+        self.problem_type = info["type"]
+        self.param_names = tuple(info["params"])
+        self.int_columns = tuple(info["int_columns"])
+        self.rows = info["rows"]
+        self.columns = len(self.param_names) + 1
+        self.offset = data_start + info["offset"]
+        self.block = buf[self.offset:self.offset + self.rows * self.columns * 8]
+        self.data = self.block.cast("d")
+
+    def params(self, row):
+        start = row * self.columns
+        values = self.data[start:start + self.columns - 1]
+        return tuple(int(v) if is_int else v for v, is_int in zip(values, self.int_columns))
+
+    def answer(self, row):
+        return self.data[row * self.columns + self.columns - 1]
+
+    def array(self):
+        # Zero-copy NumPy view, shape (rows, params + 1); drop it before closing the bank
+        if np is None:
+            raise RuntimeError("NumPy is not installed")
+        return np.frombuffer(self.data, dtype=np.float64).reshape(self.rows, self.columns)
+
+def _pools(kind):
+    # Per-parameter values; param_space() is their product
+    if isinstance(kind, slp.ProblemTemplate):
+        return [list(values) for values in kind.param_values.values()]
+    if isinstance(kind, slp.ProblemGraph):
+        return [list(q.values) for q in kind.givens]
+    return None
+
+def sample_rows(kind, max_rows, rng):
+    # The whole parameter space if it fits, otherwise max_rows rows drawn without
+    # building it: each sampled index is split into per-parameter indices
+    # (mixed radix, last parameter fastest, as in itertools.product)
+    pools = _pools(kind)
+    if pools is None:
+        rows = list(kind.param_space())
+        return rng.sample(rows, max_rows) if len(rows) > max_rows else rows
+    size = math.prod(len(pool) for pool in pools)
+    if size <= max_rows:
+        return list(itertools.product(*pools))
+    rows = []
+    for index in rng.sample(range(size), max_rows):
+        row = []
+        for pool in reversed(pools):
+            index, digit = divmod(index, len(pool))
+            row.append(pool[digit])
+        rows.append(tuple(reversed(row)))
+    return rows
+
+class ProblemBank:
+    def __init__(self, shm, owner):
+        self.shm = shm
+        self.owner = owner
+        header_length, = _LENGTH.unpack_from(shm.buf, 0)
+        header = json.loads(bytes(shm.buf[_LENGTH.size:_LENGTH.size + header_length]))
+        if header["version"] != BANK_VERSION:
+            raise ValueError(f"Problem bank version {header['version']} is not supported")
+        data_start = _align(_LENGTH.size + header_length)
+        self.tables = {}
+        for info in header["tables"]:
+            self.tables.setdefault(info["topic"], []).append(BankTable(info, shm.buf, data_start))
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    @classmethod
+    def create(cls, name=None, max_rows=MAX_ROWS, seed=0):
+        rng = random.Random(seed)
+        tables = []
+        for topic, kinds in slp.PROBLEM_TYPES.items():
+            for kind in kinds:
+                tables.append((kind, sample_rows(kind, max_rows, rng)))
+
+        # Layout: [header length][JSON header][padding][tables]; table offsets are
+        # relative to the 8-byte aligned start of the table data
+        infos = []
+        offset = 0
+        for kind, rows in tables:
+            int_columns = [all(isinstance(row[i], int) for row in rows) for i in range(len(kind.param_names))]
+            infos.append({"topic": kind.topic, "type": kind.problem_type, "params": list(kind.param_names),
+                          "int_columns": int_columns, "rows": len(rows), "offset": offset})
+            offset += len(rows) * (len(kind.param_names) + 1) * 8
+
+        encoded = json.dumps({"version": BANK_VERSION, "tables": infos}).encode()
+        data_start = _align(_LENGTH.size + len(encoded))
+
+        shm = shared_memory.SharedMemory(name=name, create=True, size=max(data_start + offset, 1))
+        _LENGTH.pack_into(shm.buf, 0, len(encoded))
+        shm.buf[_LENGTH.size:_LENGTH.size + len(encoded)] = encoded
+        for (kind, rows), info in zip(tables, infos):
+            values = array("d")
+            for row in rows:
+                values.extend(row)
+                values.append(kind.compute(row))
+            start = data_start + info["offset"]
+            shm.buf[start:start + len(values) * 8] = memoryview(values).cast("B")
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name):
+        try:
+            shm = shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:
+            # Before Python 3.13 attaching registers the segment with the resource
+            # tracker, which would unlink it when the worker exits; skip that
+            register = resource_tracker.register
+            resource_tracker.register = lambda name, rtype: None
+            try:
+                shm = shared_memory.SharedMemory(name=name)
+            finally:
+                resource_tracker.register = register
+        return cls(shm, owner=False)
+
+    def table(self, topic, problem_type):
+        for table in self.tables[topic]:
+            if table.problem_type == problem_type:
+                return table
+        raise KeyError(f"'{topic}' has no problem type {problem_type} in this bank")
+
+    def problem(self, topic, problem_type=None, row=None, rng=random):
+        # Text, hints and solution are rendered on demand from the shared parameters
+        tables = self.tables[topic]
+        table = rng.choice(tables) if problem_type is None else self.table(topic, problem_type)
+        if row is None:
+            row = rng.randrange(table.rows)
+        return slp.PhysicsProblem(topic, problem_type=table.problem_type, params=table.params(row))
+
+    @property
+    def nbytes(self):
+        return self.shm.size
+
+    def close(self):
+        for tables in self.tables.values():
+            for table in tables:
+                table.data.release()
+                table.block.release()
+        self.tables = {}
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+def _align(n):
+    return -(-n // 8) * 8
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="SmartLearn shared-memory problem bank")
+    sub = parser.add_subparsers(dest="command", required=True)
+    create = sub.add_parser("create", help="build a bank and keep it alive until interrupted")
+    create.add_argument("--name", help="shared memory name (default: generated)")
+    create.add_argument("--max-rows", type=int, default=MAX_ROWS)
+    info = sub.add_parser("info", help="describe an existing bank")
+    info.add_argument("name")
+    args = parser.parse_args(argv)
+
+    if args.command == "create":
+        bank = ProblemBank.create(args.name, args.max_rows)
+        print(f"Problem bank '{bank.name}': {bank.nbytes / 1024:.0f} KiB. Press Ctrl+C to release it.")
+        try:
+            import signal
+            signal.pause() if hasattr(signal, "pause") else input()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            bank.close()
+    else:
+        bank = ProblemBank.attach(args.name)
+        for topic, tables in bank.tables.items():
+            for table in tables:
+                print(f"{topic:20s} type {table.problem_type}: {table.rows:6d} rows ({', '.join(table.param_names)})")
+        bank.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,14 +1,41 @@
 import customtkinter as ctk
 import random
 import math
-from typing import List, Dict, Tuple
+import argparse
+import ast
+import copy
+import functools
+import getpass
+import hashlib
+import itertools
+import json
+import keyword
+import mmap
+import os
+import re
+import string
+import struct
+import sys
+import threading
+import time
+import tkinter
+import zipfile
+from array import array
+from collections import OrderedDict
+from typing import List, Dict, NamedTuple, Tuple
+
+try:
+    import tomllib
+except ImportError:  # Python < 3.11
+    tomllib = None
 
 # ======================
 # COLOR SCHEME
 # ======================
+# Surface and text colors are (light, dark) pairs; customtkinter picks one by appearance mode
 COLORS = {
-    'bg': '#F8FAFC',
-    'bg_secondary': '#EFF6FF',
+    'bg': ('#F8FAFC', '#0F172A'),
+    'bg_secondary': ('#EFF6FF', '#1E293B'),
     'primary': '#6366F1',
     'primary_light': '#818CF8',
     'primary_dark': '#4F46E5',
@@ -17,24 +44,82 @@ COLORS = {
     'success_light': '#34D399',
     'warning': '#F59E0B',
     'error': '#EF4444',
-    'card_bg': '#FFFFFF',
+    'card_bg': ('#FFFFFF', '#1E293B'),
     'card_shadow': '#00000008',
-    'text_dark': '#1E293B',
-    'text_medium': '#475569',
-    'text_light': '#64748B',
-    'input_bg': '#F1F5F9',
-    'input_border': '#E2E8F0',
-    'hint_bg': '#DBEAFE',
-    'hint_text': '#1E40AF',
+    'text_dark': ('#1E293B', '#F1F5F9'),
+    'text_medium': ('#475569', '#CBD5E1'),
+    'text_light': ('#64748B', '#94A3B8'),
+    'input_bg': ('#F1F5F9', '#334155'),
+    'input_border': ('#E2E8F0', '#475569'),
+    'hint_bg': ('#DBEAFE', '#1E3A8A'),
+    'hint_text': ('#1E40AF', '#DBEAFE'),
     'kinematics': '#60A5FA',
     'freefall': '#A78BFA',
     'dynamics': '#F472B6',
     'work_energy': '#FBBF24',
     'momentum': '#34D399',
     'electricity': '#F87171',
-    'vectors': '#818CF8'
+    'vectors': '#818CF8',
+    'multistep': '#2DD4BF'
 }
 
+# ======================
+# STYLES
+# ======================
+class StyleRegistry:
+    # One shared CTkFont per (size, weight) and one dict per shape preset, instead
+    # of every widget resolving its own ("Poppins", N) tuple or literal radius.
+    # Changing the font family reconfigures the shared fonts and customtkinter
+    # redraws the widgets that use them - no frame is rebuilt. Shapes are fixed;
+    # light and dark mode are customtkinter's appearance setting.
+    SHAPES = {
+        "button": {"corner_radius": 25, "height": 55, "border_width": 0},
+        "topic_card": {"corner_radius": 20, "height": 90, "width": 160, "border_width": 0},
+        "large_topic_card": {"corner_radius": 25, "height": 100, "width": 200, "border_width": 0},
+        "bubble": {"corner_radius": 20, "border_width": 2},
+        "card": {"corner_radius": 20, "border_width": 2},
+        "panel": {"corner_radius": 25, "border_width": 2},        # problem and question cards
+        "result_card": {"corner_radius": 30, "border_width": 2},
+        "note": {"corner_radius": 15, "border_width": 2},
+        "tile": {"corner_radius": 15},                            # stat tiles, badges, lists
+        "row": {"corner_radius": 10},
+        "entry": {"corner_radius": 15, "border_width": 2},
+        "header": {"corner_radius": 0},
+        "progress_bar": {"corner_radius": 5},
+    }
+    
+    def __init__(self, family="Poppins"):
+        self.family = family
+        self.fonts = {}
+    
+    def font(self, size, weight="normal"):
+        # Fonts need a Tk root, so they are created on first use
+        key = (size, weight)
+        font = self.fonts.get(key)
+        if font is None:
+            font = self.fonts[key] = ctk.CTkFont(family=self.family, size=size, weight=weight)
+        return font
+    
+    def shape(self, name):
+        return self.SHAPES[name]
+    
+    def reset(self):
+        # Fonts belong to the Tk root they were made under; a new root starts afresh
+        self.fonts = {}
+    
+    def set_family(self, family):
+        self.family = family
+        for font in self.fonts.values():
+            font.configure(family=family)
+    
+    def set_appearance(self, appearance, family=None):
+        # appearance: "light" or "dark"
+        ctk.set_appearance_mode(appearance)
+        if family and family != self.family:
+            self.set_family(family)
+
+STYLES = StyleRegistry()
+
 # ======================
 # REUSABLE UI COMPONENTS
 # ======================
@@ -44,13 +129,11 @@ class RoundedButton(ctk.CTkButton):
             master,
             text=text,
             command=command,
-            corner_radius=25,
-            height=55,
-            font=("Poppins", 16, "bold"),
+            font=STYLES.font(16, "bold"),
             fg_color=color or COLORS['primary'],
             hover_color=COLORS['primary_dark'] if color == COLORS['primary'] else color,
-            border_width=0,
             text_color="#FFFFFF",
+            **STYLES.shape("button"),
             **kwargs
         )
 
@@ -60,14 +143,11 @@ class ModernTopicCard(ctk.CTkButton):
             master,
             text=topic_name,
             command=command,
-            corner_radius=20,
-            height=90,
-            width=160,
-            font=("Poppins", 16, "bold"),
+            font=STYLES.font(16, "bold"),
             fg_color=color,
             hover_color=color,
             text_color="#FFFFFF",
-            border_width=0,
+            **STYLES.shape("topic_card"),
             **kwargs
         )
 
@@ -77,32 +157,76 @@ class TopicCard(ctk.CTkButton):
             master,
             text=topic_name,
             command=command,
-            corner_radius=25,
-            height=100,
-            width=200,
-            font=("Poppins", 18, "bold"),
+            font=STYLES.font(18, "bold"),
             fg_color=color,
             hover_color=color,
             text_color="#FFFFFF",
-            border_width=0,
+            **STYLES.shape("large_topic_card"),
             **kwargs
         )
 
+RESIZE_SETTLE_MS = 80  # a resize counts as finished after this long without <Configure>
+
+class ResponsiveGrid:
+    # Lays widgets out in as many columns of at least `minsize` pixels as fit in
+    # their container. Dragging the window sends a stream of <Configure> events;
+    # they are coalesced and the widgets are only re-gridded once the size settles
+    # on a different column count.
+    def __init__(self, container, widgets, minsize, columns, max_columns, padx=10, pady=10):
+        self.container = container
+        self.widgets = widgets
+        self.minsize = minsize
+        self.max_columns = max_columns
+        self.padx = padx
+        self.pady = pady
+        self.columns = 0
+        self.width = None
+        self.job = None
+        self.reflow(columns)
+        container.bind("<Configure>", self.on_configure, add="+")
+    
+    def on_configure(self, event):
+        if self.job is not None:
+            self.container.after_cancel(self.job)
+        self.width = event.width
+        self.job = self.container.after(RESIZE_SETTLE_MS, self.settle)
+    
+    def settle(self):
+        self.job = None
+        columns = max(1, min(self.max_columns, self.width // self.minsize))
+        if columns != self.columns:
+            start = time.perf_counter_ns()
+            self.reflow(columns)
+            if PROFILER:
+                # The re-grid itself, then until Tk has drawn the new layout
+                PROFILER.record("resize frame", time.perf_counter_ns() - start)
+                self.container.after_idle(lambda: PROFILER.record(
+                    "resize frame (until idle)", time.perf_counter_ns() - start))
+    
+    def reflow(self, columns):
+        for i, widget in enumerate(self.widgets):
+            widget.grid(row=i // columns, column=i % columns, padx=self.padx, pady=self.pady, sticky="ew")
+        for column in range(max(columns, self.columns)):
+            if column < columns:
+                self.container.grid_columnconfigure(column, weight=1, minsize=self.minsize)
+            else:
+                self.container.grid_columnconfigure(column, weight=0, minsize=0)
+        self.columns = columns
+
 class HintBubble(ctk.CTkFrame):
     def __init__(self, master, hint_text, **kwargs):
         super().__init__(
             master,
-            corner_radius=20,
             fg_color=COLORS['hint_bg'],
-            border_width=2,
             border_color=COLORS['primary_light'],
+            **STYLES.shape("bubble"),
             **kwargs
         )
         
         self.label = ctk.CTkLabel(
             self,
             text=hint_text,
-            font=("Poppins", 14),
+            font=STYLES.font(14),
             text_color=COLORS['hint_text'],
             wraplength=500,
             justify="left"
@@ -114,9 +238,8 @@ class StatsCard(ctk.CTkFrame):
         super().__init__(
             master,
             fg_color=COLORS['card_bg'],
-            corner_radius=20,
-            border_width=2,
             border_color=color,
+            **STYLES.shape("card"),
             **kwargs
         )
         
@@ -127,13 +250,13 @@ class StatsCard(ctk.CTkFrame):
         ctk.CTkLabel(
             header,
             text=icon,
-            font=("Poppins", 28)
+            font=STYLES.font(28)
         ).pack(side="left", padx=(0, 10))
         
         ctk.CTkLabel(
             header,
             text=label,
-            font=("Poppins", 14),
+            font=STYLES.font(14),
             text_color=COLORS['text_light']
         ).pack(side="left")
         
@@ -141,7 +264,7 @@ class StatsCard(ctk.CTkFrame):
         ctk.CTkLabel(
             self,
             text=value,
-            font=("Poppins", 24, "bold"),
+            font=STYLES.font(24, "bold"),
             text_color=color
         ).pack(padx=20, pady=(0, 15))
 
@@ -151,22 +274,281 @@ class ProgressBar(ctk.CTkFrame):
         self.total = total
         self.current = 0
         
-        self.bar_bg = ctk.CTkFrame(self, height=10, corner_radius=5, fg_color=COLORS['input_bg'])
+        self.bar_bg = ctk.CTkFrame(self, height=10, fg_color=COLORS['input_bg'], **STYLES.shape("progress_bar"))
         self.bar_bg.pack(fill="x", padx=20)
         
-        self.bar_fill = ctk.CTkFrame(self.bar_bg, height=10, corner_radius=5, fg_color=COLORS['success'], width=0)
+        self.bar_fill = ctk.CTkFrame(self.bar_bg, height=10, fg_color=COLORS['success'], width=0, **STYLES.shape("progress_bar"))
         self.bar_fill.place(x=0, y=0)
         
-        self.label = ctk.CTkLabel(self, text="0 / 0", font=("Poppins", 12), text_color=COLORS['text_light'])
+        self.label = ctk.CTkLabel(self, text="0 / 0", font=STYLES.font(12), text_color=COLORS['text_light'])
         self.label.pack(pady=5)
+        self.redraw_pending = False
+    
+    def set(self, current, total=None):
+        # Any number of updates within one event-loop pass cost a single redraw
+        self.current = current
+        if total is not None:
+            self.total = total
+        if not self.redraw_pending:
+            self.redraw_pending = True
+            self.after_idle(self.redraw)
+    
+    def redraw(self):
+        self.redraw_pending = False
+        fraction = self.current / self.total if self.total else 0
+        if fraction > 0:
+            self.bar_fill.place(x=0, y=0, relwidth=fraction, relheight=1)
+        else:
+            self.bar_fill.place_forget()
+        self.label.configure(text=f"{self.current} / {self.total}")
+
+# ======================
+# LOCALIZATION
+# ======================
+# Translations live in locales/<language>/<domain>.json, a JSON object mapping the
+# English text (the msgid) to its translation. Domains are "ui" for screen labels
+# and one per topic ("kinematics", "work_energy", ...) for problem, hint and
+# solution templates. Each is compiled into a .slc file - a hash-sorted index over
+# a string blob - that is memory-mapped and binary-searched, so only the strings
+# actually shown are ever read. Catalogs are compiled when missing or stale, or
+# all at once with --compile-catalogs.
+LOCALE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "locales")
+_CATALOG_MAGIC = b"SLC1"
+_CATALOG_ENTRY = struct.Struct("<4I")  # msgid offset, msgid length, text offset, text length
+
+def _catalog_hash(key: bytes) -> int:
+    return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), "little")
+
+def catalog_domain(topic: str) -> str:
+    return re.sub(r"\W+", "_", topic.lower()).strip("_")
+
+def compile_catalog(messages: Dict[str, str]) -> bytes:
+    # Layout: magic, count, sorted uint64 hashes, entries, then the UTF-8 blob
+    entries = sorted((_catalog_hash(k.encode()), k.encode(), v.encode()) for k, v in messages.items() if v)
+    blob = bytearray()
+    table = bytearray()
+    for _, key, value in entries:
+        table += _CATALOG_ENTRY.pack(len(blob), len(key), len(blob) + len(key), len(value))
+        blob += key + value
+    hashes = struct.pack(f"<{len(entries)}Q", *(h for h, _, _ in entries))
+    return _CATALOG_MAGIC + struct.pack("<I", len(entries)) + hashes + bytes(table) + bytes(blob)
+
+def compile_catalog_file(source: str) -> str:
+    with open(source, encoding="utf-8") as f:
+        data = compile_catalog(json.load(f))
+    target = os.path.splitext(source)[0] + ".slc"
+    temp = target + ".tmp"
+    with open(temp, "wb") as f:
+        f.write(data)
+    os.replace(temp, target)
+    return target
+
+def compile_catalogs(directory: str = LOCALE_DIR) -> int:
+    count = 0
+    for root, _, files in os.walk(directory):
+        for filename in sorted(files):
+            if filename.endswith(".json"):
+                compile_catalog_file(os.path.join(root, filename))
+                count += 1
+    return count
+
+class Catalog:
+    def __init__(self, buffer):
+        if len(buffer) < 8 or bytes(buffer[:4]) != _CATALOG_MAGIC:
+            raise ValueError("not a SmartLearn catalog")
+        self.buffer = buffer
+        self.count, = struct.unpack_from("<I", buffer, 4)
+        self.entries = 8 + 8 * self.count
+        self.blob = self.entries + _CATALOG_ENTRY.size * self.count
+        self.cache = {}
+        # Strings are laid out in entry order, so the last one must end the file
+        end = self.blob
+        if self.count and self.blob <= len(buffer):
+            _, _, text_at, text_len = _CATALOG_ENTRY.unpack_from(buffer, self.blob - _CATALOG_ENTRY.size)
+            end += text_at + text_len
+        if end != len(buffer):
+            raise ValueError("truncated or damaged catalog")
+    
+    @classmethod
+    def open(cls, path):
+        with open(path, "rb") as f:
+            return cls(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+    
+    def get(self, msgid: str):
+        try:
+            return self.cache[msgid]
+        except KeyError:
+            text = self.cache[msgid] = self._lookup(msgid.encode())
+            return text
+    
+    def _lookup(self, key):
+        target = _catalog_hash(key)
+        buffer = self.buffer
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if struct.unpack_from("<Q", buffer, 8 + 8 * mid)[0] < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        # Equal hashes are adjacent; the msgid itself settles a collision
+        while lo < self.count and struct.unpack_from("<Q", buffer, 8 + 8 * lo)[0] == target:
+            key_at, key_len, text_at, text_len = _CATALOG_ENTRY.unpack_from(buffer, self.entries + _CATALOG_ENTRY.size * lo)
+            if buffer[self.blob + key_at:self.blob + key_at + key_len] == key:
+                return buffer[self.blob + text_at:self.blob + text_at + text_len].decode()
+            lo += 1
+        return None
+
+class Localizer:
+    def __init__(self, language: str = None, directory: str = LOCALE_DIR):
+        self.language = None if language in (None, "", "en") else language
+        self.directory = directory
+        self.catalogs = {}  # domain -> Catalog, or None when there is no translation
+        self.kinds = {}     # problem type -> its localized copy
+    
+    def catalog(self, domain):
+        try:
+            return self.catalogs[domain]
+        except KeyError:
+            pass
+        catalog = None
+        base = os.path.join(self.directory, self.language, domain)
+        source, compiled = base + ".json", base + ".slc"
+        if os.path.exists(source) and (not os.path.exists(compiled) or os.path.getmtime(compiled) < os.path.getmtime(source)):
+            catalog = self.compile(source)
+        elif os.path.exists(compiled):
+            try:
+                catalog = Catalog.open(compiled)
+            except (OSError, ValueError):
+                # Damaged, or left by another version: rebuild it from the JSON
+                catalog = self.compile(source) if os.path.exists(source) else None
+        self.catalogs[domain] = catalog
+        return catalog
+    
+    def compile(self, source):
+        try:
+            return Catalog.open(compile_catalog_file(source))
+        except OSError:
+            # Read-only install: compile in memory instead
+            with open(source, encoding="utf-8") as f:
+                return Catalog(compile_catalog(json.load(f)))
+    
+    def tr(self, msgid: str, domain: str = "ui") -> str:
+        if self.language is None:
+            return msgid
+        catalog = self.catalog(domain)
+        if catalog is None:
+            return msgid
+        return catalog.get(msgid) or msgid
+    
+    def localize(self, kind):
+        # The problem type with translated text, compiled once per language
+        if self.language is None:
+            return kind
+        localized = self.kinds.get(kind)
+        if localized is None:
+            domain = catalog_domain(kind.topic)
+            if self.catalog(domain) is None:
+                localized = kind
+            else:
+                localized = kind.localized(functools.partial(self.tr, domain=domain))
+            self.kinds[kind] = localized
+        return localized
+
+LOCALE = Localizer()
+
+def set_language(language: str):
+    global LOCALE
+    LOCALE = Localizer(language)
+
+def tr(msgid: str) -> str:
+    return LOCALE.tr(msgid)
 
 # ======================
 # PROBLEM GENERATOR
 # ======================
+# Every problem type - a compiled template or a multi-step graph - is registered
+# here under its topic and numbered within it
+PROBLEM_TYPES: Dict[str, list] = {}
+MAX_TOPICS = 255  # topic ids and type numbers are stored in one byte (history, snapshots)
+
+def register_problem_type(kind):
+    if kind.topic not in PROBLEM_TYPES and len(PROBLEM_TYPES) >= MAX_TOPICS:
+        raise ValueError(f"Too many topics for '{kind.topic}' (at most {MAX_TOPICS})")
+    kinds = PROBLEM_TYPES.setdefault(kind.topic, [])
+    if any(k.problem_type == kind.problem_type for k in kinds):
+        raise ValueError(f"Duplicate problem type {kind.problem_type} for topic '{kind.topic}'")
+    kinds.append(kind)
+    kinds.sort(key=lambda k: k.problem_type)
+
+def find_problem_type(topic: str, problem_type: int):
+    for kind in PROBLEM_TYPES[topic]:
+        if kind.problem_type == problem_type:
+            return kind
+    raise KeyError(f"'{topic}' has no problem type {problem_type}")
+
+# Nice-answer sampling: decimal places allowed in the answer for each mode
+NICE_ANSWERS = {"integer": 0, "decimal": 1}
+NICE_MIN_PROBLEMS = 10  # smaller integer tables give way to the decimal one
+NICE_MAX_COMBINATIONS = 25_000  # larger parameter spaces are sampled, not enumerated
+_nice_tables = {}
+_nice_lock = threading.RLock()
+
+def nice_params(kind, mode: str) -> Tuple:
+    # Parameter combinations of a problem type whose answer is nice. A table is built
+    # the first time a type is asked for, from at most NICE_MAX_COMBINATIONS
+    # combinations (tens of milliseconds), so a template with a huge parameter space
+    # costs no more than a small one. Sampling is then a single choice - no
+    # generate-and-reject loop, however tight the constraint.
+    table = _nice_tables.get((kind, mode))
+    if table is None:
+        with _nice_lock:
+            table = _nice_tables.get((kind, mode))
+            if table is None:
+                table = _build_nice_table(kind, mode)
+    return table
+
+def _build_nice_table(kind, mode):
+    scale = 10 ** NICE_ANSWERS[mode]
+    table = tuple(p for p in _nice_candidates(kind) if _is_whole(kind.compute(p) * scale))
+    if mode == "integer" and len(table) < NICE_MIN_PROBLEMS:
+        # Free Fall, Vectors and the like have only a handful of whole answers;
+        # one decimal place keeps the practice varied
+        decimal = nice_params(kind, "decimal")
+        if len(decimal) > len(table):
+            table = decimal
+    _nice_tables[(kind, mode)] = table
+    return table
+
+def _nice_candidates(kind):
+    # The whole parameter space, or a fixed sample of it: indices are split into
+    # per-parameter indices (mixed radix, last parameter fastest, as in param_space)
+    pools = kind.param_pools()
+    size = math.prod(len(pool) for pool in pools)
+    if size <= NICE_MAX_COMBINATIONS:
+        return kind.param_space()
+    rng = random.Random(f"{kind.topic}/{kind.problem_type}")  # the same sample every run
+    rows = []
+    for index in rng.sample(range(size), NICE_MAX_COMBINATIONS):
+        row = []
+        for pool in reversed(pools):
+            index, digit = divmod(index, len(pool))
+            row.append(pool[digit])
+        rows.append(tuple(reversed(row)))
+    return rows
+
+def _is_whole(value):
+    return abs(value - round(value)) < 1e-6
+
 class PhysicsProblem:
-    def __init__(self, topic: str, difficulty: str = "medium"):
+    def __init__(self, topic: str, difficulty: str = "medium", memo: Dict = None,
+                 problem_type: int = None, params: Tuple = None, nice: str = None):
         self.topic = topic
         self.difficulty = difficulty
+        self.memo = memo  # shared step cache when generating many multi-step problems
+        self.problem_type = problem_type
+        self.params = params  # given values; passing them rebuilds that exact problem
+        self.nice = nice  # "integer" or "decimal" to only draw problems with tidy answers
         self.problem_text = ""
         self.answer = 0
         self.unit = ""
@@ -175,455 +557,1580 @@ class PhysicsProblem:
         self.generate()
     
     def generate(self):
-        if self.topic == "Kinematics":
-            self.generate_kinematics()
-        elif self.topic == "Free Fall":
-            self.generate_freefall()
-        elif self.topic == "Dynamics":
-            self.generate_dynamics()
-        elif self.topic == "Work & Energy":
-            self.generate_work_energy()
-        elif self.topic == "Momentum":
-            self.generate_momentum()
-        elif self.topic == "Electricity":
-            self.generate_electricity()
-        elif self.topic == "Vectors":
-            self.generate_vectors()
-        elif self.topic == "Projectile Motion":
-            self.generate_projectile_motion()
-        elif self.topic == "Unit Conversion":
-            self.generate_unit_conversion()
-    
-    def generate_kinematics(self):
-        problem_type = random.choice([1, 2, 3])
-        
-        if problem_type == 1:
-            # Final velocity problem
-            v0 = random.randint(5, 30)
-            a = random.randint(2, 8)
-            t = random.randint(3, 10)
-            v = v0 + a * t
-            
-            self.problem_text = f"A car accelerates from {v0} m/s at {a} m/s² for {t} seconds.\nWhat is its final velocity?"
-            self.answer = v
-            self.unit = "m/s"
-            
-            self.hints = [
-                "💡 Think about constant acceleration motion.",
-                f"📐 Use the formula: v = v₀ + at",
-                f"🔧 Initial velocity v₀ = {v0} m/s, acceleration a = {a} m/s², time t = {t} s",
-                f"🧮 Calculate: v = {v0} + ({a} × {t}) = {v} m/s"
-            ]
-            
-            self.solution = f"Using v = v₀ + at\nv = {v0} + ({a})({t})\nv = {v0} + {a*t}\nv = {v} m/s"
-        
-        elif problem_type == 2:
-            # Distance problem
-            v0 = random.randint(5, 20)
-            a = random.randint(2, 8)
-            t = random.randint(3, 8)
-            s = v0 * t + 0.5 * a * t**2
-            
-            self.problem_text = f"A vehicle starts at {v0} m/s and accelerates at {a} m/s² for {t} seconds.\nHow far does it travel?"
-            self.answer = round(s, 2)
-            self.unit = "m"
-            
-            self.hints = [
-                "💡 Use the kinematic equation for distance.",
-                f"📐 Use: s = v₀t + ½at²",
-                f"🔧 v₀ = {v0} m/s, a = {a} m/s², t = {t} s",
-                f"🧮 s = {v0}({t}) + ½({a})({t}²) = {round(s, 2)} m"
-            ]
-            
-            self.solution = f"s = v₀t + ½at²\ns = {v0}({t}) + ½({a})({t}²)\ns = {v0*t} + {0.5*a*t**2}\ns = {round(s, 2)} m"
-        
+        kinds = PROBLEM_TYPES[self.topic]
+        if self.problem_type is not None:
+            kind = find_problem_type(self.topic, self.problem_type)
+        elif len(kinds) == 1:
+            kind = kinds[0]
         else:
-            # Time problem
-            v0 = random.randint(5, 20)
-            v = random.randint(25, 50)
-            a = random.randint(2, 8)
-            t = (v - v0) / a
-            
-            self.problem_text = f"A car accelerates from {v0} m/s to {v} m/s at {a} m/s².\nHow long does this take?"
-            self.answer = round(t, 2)
-            self.unit = "s"
-            
-            self.hints = [
-                "💡 Use the velocity equation to find time.",
-                f"📐 Rearrange: v = v₀ + at → t = (v - v₀) / a",
-                f"🔧 v = {v} m/s, v₀ = {v0} m/s, a = {a} m/s²",
-                f"🧮 t = ({v} - {v0}) / {a} = {round(t, 2)} s"
-            ]
-            
-            self.solution = f"v = v₀ + at\nt = (v - v₀) / a\nt = ({v} - {v0}) / {a}\nt = {round(t, 2)} s"
-    
-    def generate_freefall(self):
-        problem_type = random.choice([1, 2])
+            kind = random.choice(kinds)
         
-        if problem_type == 1:
-            # Time to fall problem
-            h = random.randint(20, 100)
-            g = 10
-            t = math.sqrt(2 * h / g)
-            
-            self.problem_text = f"An object is dropped from a height of {h} meters.\nHow long does it take to reach the ground? (Use g = 10 m/s²)"
-            self.answer = round(t, 2)
-            self.unit = "s"
-            
-            self.hints = [
-                "💡 This is free fall motion with initial velocity = 0.",
-                f"📐 Use: h = ½gt²",
-                f"🔧 Rearrange to solve for t: t = √(2h/g)",
-                f"🧮 t = √(2×{h}/10) = √{2*h/10} ≈ {round(t, 2)} s"
-            ]
-            
-            self.solution = f"h = ½gt²\n{h} = ½(10)t²\n{h} = 5t²\nt² = {h/5}\nt = √{h/5} ≈ {round(t, 2)} s"
+        if self.params is None and self.nice:
+            # Types with no nice answers at all fall back to ordinary sampling
+            table = nice_params(kind, self.nice)
+            if table:
+                self.params = random.choice(table)
         
+        kind = LOCALE.localize(kind)
+        if self.params is None:
+            result = kind.generate(random, self.memo)
         else:
-            # Final velocity problem
-            h = random.randint(20, 100)
-            g = 10
-            v = math.sqrt(2 * g * h)
-            
-            self.problem_text = f"An object falls freely from a height of {h} meters.\nWhat is its velocity just before hitting the ground? (Use g = 10 m/s²)"
-            self.answer = round(v, 2)
-            self.unit = "m/s"
-            
-            self.hints = [
-                "💡 Use the kinematic equation for final velocity in free fall.",
-                f"📐 Use: v² = 2gh (since v₀ = 0)",
-                f"🔧 h = {h} m, g = 10 m/s²",
-                f"🧮 v = √(2 × 10 × {h}) ≈ {round(v, 2)} m/s"
-            ]
-            
-            self.solution = f"v² = 2gh\nv² = 2 × 10 × {h}\nv² = {2*g*h}\nv = √{2*g*h} ≈ {round(v, 2)} m/s"
+            result = kind.render(tuple(self.params), self.memo)
+        
+        self.params, self.answer, self.problem_text, self.hints, self.solution = result
+        self.problem_type = kind.problem_type
+        self.unit = kind.unit
+    
+    @classmethod
+    def prepared(cls, topic, problem_type, unit, params, answer, text, hints, solution):
+        # A problem already rendered elsewhere (a row from draw_exam_paper); nothing
+        # is generated again
+        problem = cls.__new__(cls)
+        problem.topic, problem.difficulty, problem.memo, problem.nice = topic, "medium", None, None
+        problem.problem_type, problem.unit = problem_type, unit
+        problem.params, problem.answer, problem.problem_text, problem.hints, problem.solution = (
+            params, answer, text, hints, solution)
+        return problem
+
+def generate_problem_set(topic: str, count: int) -> List[PhysicsProblem]:
+    # One memo for the whole set, so repeated inputs never re-evaluate a step
+    memo = {}
+    return [PhysicsProblem(topic, memo=memo) for _ in range(count)]
+
+def generate_exam_paper(count: int) -> List[PhysicsProblem]:
+    return [PhysicsProblem.prepared(*row) for row in draw_exam_paper(localized_problem_types(), count, random)]
+
+def localized_problem_types() -> Dict[str, list]:
+    # Every problem type in the current language, translated up front
+    return {topic: [LOCALE.localize(kind) for kind in kinds] for topic, kinds in PROBLEM_TYPES.items()}
+
+def draw_exam_paper(kinds: Dict[str, list], count: int, rng) -> List[Tuple]:
+    # Spread the questions over every topic before repeating one. Returns plain
+    # (topic, type, unit, params, answer, text, hints, solution) rows and uses only
+    # its arguments - no locale, global random or profiler - so it can run on a
+    # worker thread.
+    topics = list(kinds)
+    rng.shuffle(topics)
+    memo = {}
+    rows = []
+    for i in range(count):
+        topic = topics[i % len(topics)]
+        kind = rng.choice(kinds[topic])
+        rows.append((topic, kind.problem_type, kind.unit, *kind.generate(rng, memo)))
+    return rows
+
+# ======================
+# MULTI-STEP PROBLEMS
+# ======================
+class Quantity:
+    def __init__(self, symbol, unit, values=None, formula=None, inputs=(), equation="", work="", label=None):
+        self.symbol = symbol
+        self.label = label or symbol
+        self.unit = unit
+        self.values = values        # given quantities: the values to sample from
+        self.formula = formula      # derived quantities: computed from `inputs`
+        self.inputs = tuple(inputs)
+        self.equation = equation    # e.g. "v = √(2gh)"
+        self.work = work            # e.g. "√(2 × 10 × {h})", filled with the input values
     
-    def generate_dynamics(self):
-        problem_type = random.choice([1, 2, 3])
+    @property
+    def is_given(self):
+        return self.formula is None
+
+class ProblemGraph:
+    PHRASES = {"plan": "📐 Plan: {plan}", "given": "🔧 Given: {givens}", "step": "🧮 Step {number}: {line}"}
+    
+    def __init__(self, problem_type, name, quantities, target, text, concept, topic="Multi-Step"):
+        self.topic = topic
+        self.problem_type = problem_type
+        self.name = name
+        self.quantities = {q.symbol: q for q in quantities}
+        self.target = target
+        self.text = text
+        self.concept = concept
+        
+        # Resolve the evaluation order once; only nodes the target depends on are kept
+        self.order = []
+        self._visit(target, set())
+        self.givens = [q for q in self.order if q.is_given]
+        self.steps = [q for q in self.order if not q.is_given]
+        self.param_names = tuple(q.symbol for q in self.givens)
+        self.unit = self.quantities[target].unit
+        self.phrases = self.PHRASES
+    
+    def _visit(self, symbol, visiting):
+        quantity = self.quantities[symbol]
+        if quantity in self.order:
+            return
+        if symbol in visiting:
+            raise ValueError(f"Circular dependency at '{symbol}' in '{self.name}'")
+        visiting.add(symbol)
+        for dep in quantity.inputs:
+            self._visit(dep, visiting)
+        visiting.discard(symbol)
+        self.order.append(quantity)
+    
+    def generate(self, rng=random, memo=None):
+        return self.render(tuple(rng.choice(q.values) for q in self.givens), memo)
+    
+    def param_pools(self):
+        return [q.values for q in self.givens]
+    
+    def param_space(self):
+        return itertools.product(*self.param_pools())
+    
+    def compute(self, params):
+        # Answer only, with the same intermediate rounding as solve()
+        values = dict(zip(self.param_names, params))
+        for q in self.steps:
+            values[q.symbol] = round(q.formula(*(values[dep] for dep in q.inputs)), 2)
+        return values[self.target]
+    
+    def render(self, params, memo=None):
+        values, lines = self.solve(dict(zip(self.param_names, params)), memo)
+        hints, solution = self.explain(values, lines)
+        return params, values[self.target], self.text.format(**values), hints, solution
+    
+    def solve(self, givens, memo=None):
+        # Evaluate every step exactly once. Each step's value and its worked line are
+        # memoized together, keyed by the step and its input values, so the answer,
+        # hints and solution all share one evaluation - and so does every other
+        # problem in a set that reaches the same step with the same inputs.
+        if memo is None:
+            memo = {}
+        values = dict(givens)
+        lines = []
+        for q in self.steps:
+            args = tuple(values[dep] for dep in q.inputs)
+            key = (q, args)
+            cached = memo.get(key)
+            if cached is None:
+                value = round(q.formula(*args), 2)
+                work = q.work.format(**dict(zip(q.inputs, args)))
+                line = f"{q.equation} = {work} = {value} {q.unit}"
+                cached = memo[key] = (value, line)
+            values[q.symbol], line = cached
+            lines.append(line)
+        return values, lines
+    
+    def explain(self, values, lines):
+        givens = ", ".join(f"{q.label} = {values[q.symbol]} {q.unit}" for q in self.givens)
+        plan = " → ".join(q.equation for q in self.steps)
         
-        if problem_type == 1:
-            # Force problem
-            m = random.randint(5, 50)
-            a = random.randint(2, 10)
-            F = m * a
-            
-            self.problem_text = f"A {m} kg object accelerates at {a} m/s².\nWhat is the net force acting on it?"
-            self.answer = F
-            self.unit = "N"
-            
-            self.hints = [
-                "💡 Newton's Second Law connects force, mass, and acceleration.",
-                "📐 Use F = ma",
-                f"🔧 Mass = {m} kg, acceleration = {a} m/s²",
-                f"🧮 F = {m} × {a} = {F} N"
-            ]
-            
-            self.solution = f"Using F = ma\nF = {m} × {a}\nF = {F} N"
+        phrases = self.phrases
+        hints = [f"💡 {self.concept}", phrases["plan"].format(plan=plan), phrases["given"].format(givens=givens)]
+        hints += [phrases["step"].format(number=i, line=line) for i, line in enumerate(lines, 1)]
         
-        elif problem_type == 2:
-            # Mass problem
-            F = random.randint(20, 200)
-            a = random.randint(2, 10)
-            m = F / a
+        solution = "\n".join(lines)
+        return hints, solution
+    
+    def localized(self, translate):
+        # Steps are shared, so memoized work lines (pure math) stay valid
+        graph = copy.copy(self)
+        graph.name = translate(self.name)
+        graph.text = translate(self.text)
+        graph.concept = translate(self.concept)
+        graph.phrases = {key: translate(phrase) for key, phrase in self.PHRASES.items()}
+        return graph
+
+# Steps shared between graphs are the same objects, so a set mixing these
+# problems reuses their memoized results across graphs too
+_IMPACT_SPEED = Quantity("v", "m/s", formula=lambda g, h: (2 * g * h) ** 0.5, inputs=("g", "h"),
+                         equation="v = √(2gh)", work="√(2 × {g} × {h})")
+_WORK = Quantity("W", "J", formula=lambda F, d: F * d, inputs=("F", "d"),
+                 equation="W = Fd", work="{F} × {d}")
+_FINAL_SPEED = Quantity("v", "m/s", formula=lambda v0, a, t: v0 + a * t, inputs=("v0", "a", "t"),
+                        equation="v = v₀ + at", work="{v0} + ({a} × {t})")
+
+MULTI_STEP_PROBLEMS = [
+    ProblemGraph(
+        1, "Free fall into momentum",
+        [
+            Quantity("m", "kg", values=range(1, 11)),
+            Quantity("h", "m", values=range(20, 101)),
+            Quantity("g", "m/s²", values=(10,)),
+            _IMPACT_SPEED,
+            Quantity("p", "kg·m/s", formula=lambda m, v: m * v, inputs=("m", "v"),
+                     equation="p = mv", work="{m} × {v}"),
+        ],
+        target="p",
+        text="A {m} kg ball is dropped from a height of {h} meters.\nWhat is its momentum just before it hits the ground? (Use g = 10 m/s²)",
+        concept="First find the impact speed from free fall, then use it for momentum."
+    ),
+    ProblemGraph(
+        2, "Force into work into power",
+        [
+            Quantity("F", "N", values=range(10, 101)),
+            Quantity("d", "m", values=range(5, 31)),
+            Quantity("t", "s", values=range(2, 11)),
+            _WORK,
+            Quantity("P", "W", formula=lambda W, t: W / t, inputs=("W", "t"),
+                     equation="P = W/t", work="{W} / {t}"),
+        ],
+        target="P",
+        text="A motor pulls a crate {d} meters with a force of {F} N in {t} seconds.\nWhat is the motor's average power output?",
+        concept="Work done by the force tells you the energy; power is energy per unit time."
+    ),
+    ProblemGraph(
+        3, "Acceleration into kinetic energy",
+        [
+            Quantity("m", "kg", values=range(2, 21)),
+            Quantity("v0", "m/s", values=range(0, 11), label="v₀"),
+            Quantity("a", "m/s²", values=range(1, 6)),
+            Quantity("t", "s", values=range(2, 9)),
+            _FINAL_SPEED,
+            Quantity("KE", "J", formula=lambda m, v: 0.5 * m * v ** 2, inputs=("m", "v"),
+                     equation="KE = ½mv²", work="½ × {m} × {v}²"),
+        ],
+        target="KE",
+        text="A {m} kg cart moving at {v0} m/s accelerates at {a} m/s² for {t} seconds.\nWhat is its kinetic energy at the end?",
+        concept="Find the final velocity first, then plug it into the kinetic energy formula."
+    ),
+]
+
+for graph in MULTI_STEP_PROBLEMS:
+    register_problem_type(graph)
+
+# ======================
+# PROBLEM TEMPLATES
+# ======================
+# A template describes one problem type as data:
+#   params   - {"min": a, "max": b} draws an integer, {"choices": [...]} picks one,
+#              {"value": x} is a constant
+#   derived  - named expressions, evaluated in order (arithmetic and TEMPLATE_FUNCTIONS only)
+#   answer   - the expression graded against the student's answer
+#   text, hints, solution - str.format strings over every param and derived name
+# Each template is compiled once into a generate/render closure pair with its
+# format strings already split, so generating a problem runs no interpretation.
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "problem_templates")
+
+TEMPLATE_FUNCTIONS = {
+    "sqrt": math.sqrt,
+    "sin": math.sin,
+    "cos": math.cos,
+    "tan": math.tan,
+    "radians": math.radians,
+    "round": round,
+    "abs": abs,
+}
+
+_EXPRESSION_NODES = (
+    ast.Expression, ast.BinOp, ast.UnaryOp, ast.Call, ast.Name, ast.Load, ast.Constant,
+    ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod, ast.Pow, ast.USub, ast.UAdd
+)
+_FORMAT_SPEC = re.compile(r"[\w.,%<>=^+\- #]*")
+
+class TemplateError(ValueError):
+    pass
+
+class ProblemTemplate:
+    def __init__(self, spec: Dict, source: str = "<builtin>"):
+        self.spec = spec
+        try:
+            self.topic = spec["topic"]
+            self.problem_type = spec["type"]
+            self.where = f"{source}: {self.topic} type {self.problem_type}"
+            self._check_identity()
+            self.name = spec.get("name", f"Type {self.problem_type}")
+            self.unit = spec.get("unit", "")
             
-            self.problem_text = f"A net force of {F} N acts on an object causing {a} m/s² acceleration.\nWhat is the mass of the object?"
-            self.answer = round(m, 2)
-            self.unit = "kg"
+            # Sampled parameters keep their value pools; constants are inlined
+            self.param_values = {}
+            self.constants = {}
+            for name, param in spec["params"].items():
+                self._check_name(name)
+                self._add_param(name, param)
+            self.param_names = tuple(self.param_values)
             
-            self.hints = [
-                "💡 Rearrange Newton's Second Law to find mass.",
-                "📐 From F = ma, we get m = F/a",
-                f"🔧 Force = {F} N, acceleration = {a} m/s²",
-                f"🧮 m = {F} / {a} = {round(m, 2)} kg"
-            ]
+            known = set(self.param_names) | set(self.constants)
+            self.derived = dict(spec.get("derived", {}))
+            for name, expression in self.derived.items():
+                self._check_name(name)
+                self._check_expression(expression, known)
+                known.add(name)
+            self.answer_expression = spec["answer"]
+            self._check_expression(self.answer_expression, known)
             
-            self.solution = f"F = ma\nm = F/a\nm = {F} / {a}\nm = {round(m, 2)} kg"
-        
+            text = self._compile_text(spec["text"], known)
+            hints = [self._compile_text(hint, known) for hint in spec["hints"]]
+            solution = self._compile_text(spec["solution"], known)
+        except KeyError as e:
+            raise TemplateError(f"{source}: template is missing '{e.args[0]}'") from None
+        except (AttributeError, TypeError) as e:
+            raise TemplateError(f"{source}: malformed template ({e})") from None
+        
+        self.source = self._build_source(text, hints, solution)
+        namespace = dict(TEMPLATE_FUNCTIONS, __builtins__={})
+        exec(compile(self.source, f"<template {self.where}>", "exec"), namespace)
+        self.generate = namespace["generate"]
+        self.render = namespace["render"]
+        self.compute = namespace["compute"]
+    
+    def param_pools(self):
+        return list(self.param_values.values())
+    
+    def param_space(self):
+        return itertools.product(*self.param_pools())
+    
+    def localized(self, translate):
+        spec = dict(
+            self.spec,
+            name=translate(self.name),
+            text=translate(self.spec["text"]),
+            hints=[translate(hint) for hint in self.spec["hints"]],
+            solution=translate(self.spec["solution"])
+        )
+        if spec == self.spec:
+            return self
+        try:
+            return ProblemTemplate(spec, "<translation>")
+        except TemplateError as e:
+            # A broken translation must not stop the class: keep the English text
+            print(f"Ignoring translation: {e}", file=sys.stderr)
+            return self
+    
+    def _add_param(self, name, param):
+        if "value" in param:
+            self.constants[name] = self._check_number(param["value"], name)
+        elif "choices" in param:
+            choices = tuple(self._check_number(c, name) for c in param["choices"])
+            if not choices:
+                raise TemplateError(f"{self.where}: '{name}' has no choices")
+            self.param_values[name] = choices
+        elif "min" in param and "max" in param:
+            low, high = param["min"], param["max"]
+            if not (isinstance(low, int) and isinstance(high, int)) or low > high:
+                raise TemplateError(f"{self.where}: '{name}' needs integer min <= max")
+            self.param_values[name] = range(low, high + 1)
         else:
-            # Acceleration problem
-            F = random.randint(20, 200)
-            m = random.randint(5, 40)
-            a = F / m
-            
-            self.problem_text = f"A {m} kg object experiences a net force of {F} N.\nWhat is its acceleration?"
-            self.answer = round(a, 2)
-            self.unit = "m/s²"
-            
-            self.hints = [
-                "💡 Use Newton's Second Law to find acceleration.",
-                "📐 From F = ma, we get a = F/m",
-                f"🔧 Force = {F} N, Mass = {m} kg",
-                f"🧮 a = {F} / {m} = {round(a, 2)} m/s²"
-            ]
-            
-            self.solution = f"F = ma\na = F/m\na = {F} / {m}\na = {round(a, 2)} m/s²"
+            raise TemplateError(f"{self.where}: '{name}' needs min/max, choices or value")
     
-    def generate_work_energy(self):
-        F = random.randint(10, 100)
-        d = random.randint(5, 30)
-        
-        W = F * d
-        
-        self.problem_text = f"A force of {F} N moves an object {d} meters in the direction of the force.\nHow much work is done?"
-        self.answer = W
-        self.unit = "J"
-        
-        self.hints = [
+    def _check_identity(self):
+        if not isinstance(self.topic, str) or not self.topic.strip():
+            raise TemplateError(f"{self.where}: topic must be a non-empty name")
+        if self.topic not in PROBLEM_TYPES and len(PROBLEM_TYPES) >= MAX_TOPICS:
+            raise TemplateError(f"{self.where}: no room for another topic (at most {MAX_TOPICS})")
+        if isinstance(self.problem_type, bool) or not isinstance(self.problem_type, int) \
+                or not 1 <= self.problem_type <= 255:
+            raise TemplateError(f"{self.where}: type must be a whole number from 1 to 255")
+    
+    def _check_number(self, value, name):
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise TemplateError(f"{self.where}: '{name}' values must be numbers")
+        return value
+    
+    def _check_name(self, name):
+        if (not name.isidentifier() or keyword.iskeyword(name) or name.startswith("_")
+                or name in TEMPLATE_FUNCTIONS):
+            raise TemplateError(f"{self.where}: '{name}' is not a usable name")
+    
+    def _check_expression(self, expression, known):
+        try:
+            tree = ast.parse(expression, mode="eval")
+        except SyntaxError:
+            raise TemplateError(f"{self.where}: cannot parse '{expression}'") from None
+        
+        functions = {id(node.func) for node in ast.walk(tree) if isinstance(node, ast.Call)}
+        for node in ast.walk(tree):
+            if not isinstance(node, _EXPRESSION_NODES):
+                raise TemplateError(f"{self.where}: '{expression}' uses unsupported syntax")
+            if isinstance(node, ast.Call):
+                if not isinstance(node.func, ast.Name) or node.func.id not in TEMPLATE_FUNCTIONS or node.keywords:
+                    raise TemplateError(f"{self.where}: '{expression}' calls an unknown function")
+            elif isinstance(node, ast.Name) and id(node) not in functions and node.id not in known:
+                raise TemplateError(f"{self.where}: '{expression}' uses undefined '{node.id}'")
+            elif isinstance(node, ast.Constant) and not isinstance(node.value, (int, float)):
+                raise TemplateError(f"{self.where}: '{expression}' may only contain numbers")
+    
+    def _compile_text(self, fmt, known):
+        # Pre-split the format string into literal pieces and single-field f-strings;
+        # adjacent literals concatenate at compile time into one string build
+        pieces = []
+        try:
+            parsed = list(string.Formatter().parse(fmt))
+        except ValueError as e:
+            raise TemplateError(f"{self.where}: bad format string {fmt!r} ({e})") from None
+        for literal, field, format_spec, conversion in parsed:
+            if literal:
+                pieces.append(repr(literal))
+            if field is None:
+                continue
+            if field not in known or conversion or not _FORMAT_SPEC.fullmatch(format_spec):
+                raise TemplateError(f"{self.where}: unknown field '{{{field}}}' in {fmt!r}")
+            pieces.append(f"f'{{{field}:{format_spec}}}'" if format_spec else f"f'{{{field}}}'")
+        return " ".join(pieces) or "''"
+    
+    def _build_source(self, text, hints, solution):
+        names = ", ".join(self.param_names) + ("," if len(self.param_names) == 1 else "")
+        params = f"({names})"
+        body = [f"    {name} = {value!r}" for name, value in self.constants.items()]
+        body += [f"    {name} = {expression}" for name, expression in self.derived.items()]
+        body.append(f"    return ({params}, {self.answer_expression}, {text}, [{', '.join(hints)}], {solution})")
+        
+        draws = []
+        for name, values in self.param_values.items():
+            if isinstance(values, range):
+                draws.append(f"    {name} = _rng.randint({values.start}, {values.stop - 1})")
+            else:
+                draws.append(f"    {name} = _rng.choice({values!r})")
+        
+        unpack = [f"    {names} = _params"] if self.param_names else []
+        lines = ["def render(_params, _memo=None):"] + unpack + body
+        lines += ["def compute(_params):"] + unpack + body[:-1]
+        lines.append(f"    return {self.answer_expression}")
+        lines.append("def generate(_rng, _memo=None):")
+        lines += draws + body
+        return "\n".join(lines) + "\n"
+
+def load_templates(directory: str = TEMPLATE_DIR) -> int:
+    # Curriculum templates: TOML files with [[template]] tables, or JSON lists of templates
+    # A file that cannot be read or has a bad template is skipped with a message,
+    # so one broken file never stops the app from starting
+    if not os.path.isdir(directory):
+        return 0
+    count = 0
+    for filename in sorted(os.listdir(directory)):
+        path = os.path.join(directory, filename)
+        try:
+            if filename.endswith(".toml"):
+                if tomllib is None:
+                    raise TemplateError(f"{path}: TOML templates need Python 3.11 or newer")
+                with open(path, "rb") as f:
+                    specs = tomllib.load(f).get("template", [])
+            elif filename.endswith(".json"):
+                with open(path, encoding="utf-8") as f:
+                    specs = json.load(f)
+            else:
+                continue
+            if not isinstance(specs, list) or not all(isinstance(spec, dict) for spec in specs):
+                raise TemplateError(f"{path}: expected a list of templates")
+            templates = [ProblemTemplate(spec, path) for spec in specs]
+        except (OSError, ValueError) as e:  # TemplateError and JSON/TOML errors included
+            print(f"Skipping template file: {e if isinstance(e, TemplateError) else f'{path}: {e}'}",
+                  file=sys.stderr)
+            continue
+        for template in templates:
+            try:
+                register_problem_type(template)
+            except ValueError as e:
+                print(f"Skipping template: {e}", file=sys.stderr)
+                continue
+            count += 1
+    return count
+
+def _conversion_template(problem_type, short_from, short_to, low, high, factor):
+    # Each conversion is its own problem type, so the type is chosen before its one
+    # value is drawn. The pre-template generator drew a value for all five first,
+    # so for a given random state this topic's problems differ from the old ones
+    # (the other topics draw in the old order).
+    return {
+        "topic": "Unit Conversion", "type": problem_type, "name": f"{short_from} to {short_to}",
+        "params": {"value": {"min": low, "max": high}, "factor": {"value": factor}},
+        "derived": {"result": "round(value * factor, 4)"},
+        "answer": "result",
+        "unit": short_to,
+        "text": f"Convert {{value}} {short_from} to {short_to}.",
+        "hints": [
+            f"💡 You need to convert {short_from} to {short_to}.",
+            f"📐 Conversion factor: 1 {short_from} = {{factor}} {short_to}",
+            f"🔧 Starting value = {{value}} {short_from}",
+            f"🧮 {{value}} × {{factor}} = {{result}} {short_to}"
+        ],
+        "solution": f"{{value}} {short_from} × {{factor}}\n= {{result}} {short_to}"
+    }
+
+BUILTIN_TEMPLATES = [
+    # Kinematics
+    {
+        "topic": "Kinematics", "type": 1, "name": "Final velocity",
+        "params": {"v0": {"min": 5, "max": 30}, "a": {"min": 2, "max": 8}, "t": {"min": 3, "max": 10}},
+        "derived": {"v": "v0 + a * t", "a_t": "a * t"},
+        "answer": "v",
+        "unit": "m/s",
+        "text": "A car accelerates from {v0} m/s at {a} m/s² for {t} seconds.\nWhat is its final velocity?",
+        "hints": [
+            "💡 Think about constant acceleration motion.",
+            "📐 Use the formula: v = v₀ + at",
+            "🔧 Initial velocity v₀ = {v0} m/s, acceleration a = {a} m/s², time t = {t} s",
+            "🧮 Calculate: v = {v0} + ({a} × {t}) = {v} m/s"
+        ],
+        "solution": "Using v = v₀ + at\nv = {v0} + ({a})({t})\nv = {v0} + {a_t}\nv = {v} m/s"
+    },
+    {
+        "topic": "Kinematics", "type": 2, "name": "Distance",
+        "params": {"v0": {"min": 5, "max": 20}, "a": {"min": 2, "max": 8}, "t": {"min": 3, "max": 8}},
+        "derived": {"s": "round(v0 * t + 0.5 * a * t**2, 2)", "v0_t": "v0 * t", "half_a_t2": "0.5 * a * t**2"},
+        "answer": "s",
+        "unit": "m",
+        "text": "A vehicle starts at {v0} m/s and accelerates at {a} m/s² for {t} seconds.\nHow far does it travel?",
+        "hints": [
+            "💡 Use the kinematic equation for distance.",
+            "📐 Use: s = v₀t + ½at²",
+            "🔧 v₀ = {v0} m/s, a = {a} m/s², t = {t} s",
+            "🧮 s = {v0}({t}) + ½({a})({t}²) = {s} m"
+        ],
+        "solution": "s = v₀t + ½at²\ns = {v0}({t}) + ½({a})({t}²)\ns = {v0_t} + {half_a_t2}\ns = {s} m"
+    },
+    {
+        "topic": "Kinematics", "type": 3, "name": "Time",
+        "params": {"v0": {"min": 5, "max": 20}, "v": {"min": 25, "max": 50}, "a": {"min": 2, "max": 8}},
+        "derived": {"t": "round((v - v0) / a, 2)"},
+        "answer": "t",
+        "unit": "s",
+        "text": "A car accelerates from {v0} m/s to {v} m/s at {a} m/s².\nHow long does this take?",
+        "hints": [
+            "💡 Use the velocity equation to find time.",
+            "📐 Rearrange: v = v₀ + at → t = (v - v₀) / a",
+            "🔧 v = {v} m/s, v₀ = {v0} m/s, a = {a} m/s²",
+            "🧮 t = ({v} - {v0}) / {a} = {t} s"
+        ],
+        "solution": "v = v₀ + at\nt = (v - v₀) / a\nt = ({v} - {v0}) / {a}\nt = {t} s"
+    },
+    # Free Fall
+    {
+        "topic": "Free Fall", "type": 1, "name": "Time to fall",
+        "params": {"h": {"min": 20, "max": 100}, "g": {"value": 10}},
+        "derived": {"t": "round(sqrt(2 * h / g), 2)", "two_h_g": "2 * h / g", "h_5": "h / 5"},
+        "answer": "t",
+        "unit": "s",
+        "text": "An object is dropped from a height of {h} meters.\nHow long does it take to reach the ground? (Use g = 10 m/s²)",
+        "hints": [
+            "💡 This is free fall motion with initial velocity = 0.",
+            "📐 Use: h = ½gt²",
+            "🔧 Rearrange to solve for t: t = √(2h/g)",
+            "🧮 t = √(2×{h}/10) = √{two_h_g} ≈ {t} s"
+        ],
+        "solution": "h = ½gt²\n{h} = ½(10)t²\n{h} = 5t²\nt² = {h_5}\nt = √{h_5} ≈ {t} s"
+    },
+    {
+        "topic": "Free Fall", "type": 2, "name": "Impact velocity",
+        "params": {"h": {"min": 20, "max": 100}, "g": {"value": 10}},
+        "derived": {"v": "round(sqrt(2 * g * h), 2)", "two_g_h": "2 * g * h"},
+        "answer": "v",
+        "unit": "m/s",
+        "text": "An object falls freely from a height of {h} meters.\nWhat is its velocity just before hitting the ground? (Use g = 10 m/s²)",
+        "hints": [
+            "💡 Use the kinematic equation for final velocity in free fall.",
+            "📐 Use: v² = 2gh (since v₀ = 0)",
+            "🔧 h = {h} m, g = 10 m/s²",
+            "🧮 v = √(2 × 10 × {h}) ≈ {v} m/s"
+        ],
+        "solution": "v² = 2gh\nv² = 2 × 10 × {h}\nv² = {two_g_h}\nv = √{two_g_h} ≈ {v} m/s"
+    },
+    # Dynamics
+    {
+        "topic": "Dynamics", "type": 1, "name": "Force",
+        "params": {"m": {"min": 5, "max": 50}, "a": {"min": 2, "max": 10}},
+        "derived": {"F": "m * a"},
+        "answer": "F",
+        "unit": "N",
+        "text": "A {m} kg object accelerates at {a} m/s².\nWhat is the net force acting on it?",
+        "hints": [
+            "💡 Newton's Second Law connects force, mass, and acceleration.",
+            "📐 Use F = ma",
+            "🔧 Mass = {m} kg, acceleration = {a} m/s²",
+            "🧮 F = {m} × {a} = {F} N"
+        ],
+        "solution": "Using F = ma\nF = {m} × {a}\nF = {F} N"
+    },
+    {
+        "topic": "Dynamics", "type": 2, "name": "Mass",
+        "params": {"F": {"min": 20, "max": 200}, "a": {"min": 2, "max": 10}},
+        "derived": {"m": "round(F / a, 2)"},
+        "answer": "m",
+        "unit": "kg",
+        "text": "A net force of {F} N acts on an object causing {a} m/s² acceleration.\nWhat is the mass of the object?",
+        "hints": [
+            "💡 Rearrange Newton's Second Law to find mass.",
+            "📐 From F = ma, we get m = F/a",
+            "🔧 Force = {F} N, acceleration = {a} m/s²",
+            "🧮 m = {F} / {a} = {m} kg"
+        ],
+        "solution": "F = ma\nm = F/a\nm = {F} / {a}\nm = {m} kg"
+    },
+    {
+        "topic": "Dynamics", "type": 3, "name": "Acceleration",
+        "params": {"F": {"min": 20, "max": 200}, "m": {"min": 5, "max": 40}},
+        "derived": {"a": "round(F / m, 2)"},
+        "answer": "a",
+        "unit": "m/s²",
+        "text": "A {m} kg object experiences a net force of {F} N.\nWhat is its acceleration?",
+        "hints": [
+            "💡 Use Newton's Second Law to find acceleration.",
+            "📐 From F = ma, we get a = F/m",
+            "🔧 Force = {F} N, Mass = {m} kg",
+            "🧮 a = {F} / {m} = {a} m/s²"
+        ],
+        "solution": "F = ma\na = F/m\na = {F} / {m}\na = {a} m/s²"
+    },
+    # Work & Energy
+    {
+        "topic": "Work & Energy", "type": 1, "name": "Work",
+        "params": {"F": {"min": 10, "max": 100}, "d": {"min": 5, "max": 30}},
+        "derived": {"W": "F * d"},
+        "answer": "W",
+        "unit": "J",
+        "text": "A force of {F} N moves an object {d} meters in the direction of the force.\nHow much work is done?",
+        "hints": [
             "💡 Work is force times displacement when they're parallel.",
             "📐 Use W = Fd (when force and displacement are parallel)",
-            f"🔧 Force = {F} N, distance = {d} m",
-            f"🧮 W = {F} × {d} = {W} J"
-        ]
-        
-        self.solution = f"W = Fd\nW = {F} × {d}\nW = {W} J"
-    
-    def generate_momentum(self):
-        m = random.randint(2, 20)
-        v = random.randint(5, 30)
-        
-        p = m * v
-        
-        self.problem_text = f"A {m} kg object moves at {v} m/s.\nWhat is its momentum?"
-        self.answer = p
-        self.unit = "kg·m/s"
-        
-        self.hints = [
+            "🔧 Force = {F} N, distance = {d} m",
+            "🧮 W = {F} × {d} = {W} J"
+        ],
+        "solution": "W = Fd\nW = {F} × {d}\nW = {W} J"
+    },
+    # Momentum
+    {
+        "topic": "Momentum", "type": 1, "name": "Momentum",
+        "params": {"m": {"min": 2, "max": 20}, "v": {"min": 5, "max": 30}},
+        "derived": {"p": "m * v"},
+        "answer": "p",
+        "unit": "kg·m/s",
+        "text": "A {m} kg object moves at {v} m/s.\nWhat is its momentum?",
+        "hints": [
             "💡 Momentum is the product of mass and velocity.",
             "📐 Use p = mv",
-            f"🔧 Mass = {m} kg, velocity = {v} m/s",
-            f"🧮 p = {m} × {v} = {p} kg·m/s"
-        ]
-        
-        self.solution = f"p = mv\np = {m} × {v}\np = {p} kg·m/s"
-    
-    def generate_electricity(self):
-        V = random.randint(6, 24)
-        R = random.randint(2, 12)
-        
-        I = V / R
-        
-        self.problem_text = f"A circuit has a voltage of {V} V and resistance of {R} Ω.\nWhat is the current?"
-        self.answer = round(I, 2)
-        self.unit = "A"
-        
-        self.hints = [
+            "🔧 Mass = {m} kg, velocity = {v} m/s",
+            "🧮 p = {m} × {v} = {p} kg·m/s"
+        ],
+        "solution": "p = mv\np = {m} × {v}\np = {p} kg·m/s"
+    },
+    # Electricity
+    {
+        "topic": "Electricity", "type": 1, "name": "Current",
+        "params": {"V": {"min": 6, "max": 24}, "R": {"min": 2, "max": 12}},
+        "derived": {"I": "round(V / R, 2)"},
+        "answer": "I",
+        "unit": "A",
+        "text": "A circuit has a voltage of {V} V and resistance of {R} Ω.\nWhat is the current?",
+        "hints": [
             "💡 Ohm's Law relates voltage, current, and resistance.",
             "📐 Use V = IR, so I = V/R",
-            f"🔧 Voltage = {V} V, resistance = {R} Ω",
-            f"🧮 I = {V}/{R} = {round(I, 2)} A"
-        ]
-        
-        self.solution = f"I = V/R\nI = {V}/{R}\nI = {round(I, 2)} A"
-    
-    def generate_vectors(self):
-        x = random.randint(3, 10)
-        y = random.randint(3, 10)
-        
-        mag = math.sqrt(x**2 + y**2)
-        
-        self.problem_text = f"A vector has components: x = {x} m, y = {y} m.\nWhat is its magnitude?"
-        self.answer = round(mag, 2)
-        self.unit = "m"
-        
-        self.hints = [
+            "🔧 Voltage = {V} V, resistance = {R} Ω",
+            "🧮 I = {V}/{R} = {I} A"
+        ],
+        "solution": "I = V/R\nI = {V}/{R}\nI = {I} A"
+    },
+    # Vectors
+    {
+        "topic": "Vectors", "type": 1, "name": "Magnitude",
+        "params": {"x": {"min": 3, "max": 10}, "y": {"min": 3, "max": 10}},
+        "derived": {"sum_sq": "x**2 + y**2", "mag": "round(sqrt(sum_sq), 2)"},
+        "answer": "mag",
+        "unit": "m",
+        "text": "A vector has components: x = {x} m, y = {y} m.\nWhat is its magnitude?",
+        "hints": [
             "💡 Use the Pythagorean theorem for vector magnitude.",
             "📐 |v| = √(x² + y²)",
-            f"🔧 x = {x}, y = {y}",
-            f"🧮 |v| = √({x}² + {y}²) = √{x**2 + y**2} ≈ {round(mag, 2)} m"
-        ]
-        
-        self.solution = f"|v| = √(x² + y²)\n|v| = √({x}² + {y}²)\n|v| = √{x**2 + y**2}\n|v| ≈ {round(mag, 2)} m"
-    
-    def generate_projectile_motion(self):
-        v0 = random.randint(10, 30)
-        angle_deg = random.choice([30, 45, 60])
-        angle_rad = math.radians(angle_deg)
-        
-        max_height = (v0**2 * math.sin(angle_rad)**2) / (2 * 10)
-        
-        self.problem_text = f"A projectile is launched at {v0} m/s at an angle of {angle_deg}° from the ground.\nWhat is the maximum height reached? (Use g = 10 m/s²)"
-        self.answer = round(max_height, 2)
-        self.unit = "m"
-        
-        self.hints = [
+            "🔧 x = {x}, y = {y}",
+            "🧮 |v| = √({x}² + {y}²) = √{sum_sq} ≈ {mag} m"
+        ],
+        "solution": "|v| = √(x² + y²)\n|v| = √({x}² + {y}²)\n|v| = √{sum_sq}\n|v| ≈ {mag} m"
+    },
+    # Projectile Motion
+    {
+        "topic": "Projectile Motion", "type": 1, "name": "Maximum height",
+        "params": {"v0": {"min": 10, "max": 30}, "angle": {"choices": [30, 45, 60]}},
+        "derived": {
+            "angle_rad": "radians(angle)",
+            "h_max": "round((v0**2 * sin(angle_rad)**2) / (2 * 10), 2)",
+            "v0_sq": "v0**2",
+            "sin_sq": "round(sin(angle_rad)**2, 3)"
+        },
+        "answer": "h_max",
+        "unit": "m",
+        "text": "A projectile is launched at {v0} m/s at an angle of {angle}° from the ground.\nWhat is the maximum height reached? (Use g = 10 m/s²)",
+        "hints": [
             "💡 This is projectile motion - we need the vertical component.",
-            f"📐 Use: h_max = (v₀² sin²θ) / (2g)",
-            f"🔧 Initial velocity = {v0} m/s, angle = {angle_deg}°, g = 10 m/s²",
-            f"🧮 h_max = ({v0}² × sin²({angle_deg}°)) / 20 ≈ {round(max_height, 2)} m"
-        ]
-        
-        self.solution = f"h_max = (v₀² sin²θ) / (2g)\nh_max = ({v0}² × sin²({angle_deg}°)) / (2 × 10)\nh_max = ({v0**2} × {round(math.sin(angle_rad)**2, 3)}) / 20\nh_max ≈ {round(max_height, 2)} m"
+            "📐 Use: h_max = (v₀² sin²θ) / (2g)",
+            "🔧 Initial velocity = {v0} m/s, angle = {angle}°, g = 10 m/s²",
+            "🧮 h_max = ({v0}² × sin²({angle}°)) / 20 ≈ {h_max} m"
+        ],
+        "solution": "h_max = (v₀² sin²θ) / (2g)\nh_max = ({v0}² × sin²({angle}°)) / (2 × 10)\nh_max = ({v0_sq} × {sin_sq}) / 20\nh_max ≈ {h_max} m"
+    },
+    # Unit Conversion
+    _conversion_template(1, "km", "m", 1, 10, 1000),
+    _conversion_template(2, "g", "kg", 100, 9000, 0.001),
+    _conversion_template(3, "h", "s", 1, 24, 3600),
+    _conversion_template(4, "cm", "m", 10, 500, 0.01),
+    _conversion_template(5, "mL", "L", 100, 5000, 0.001),
+]
+
+for spec in BUILTIN_TEMPLATES:
+    register_problem_type(ProblemTemplate(spec))
+load_templates()
+
+# ======================
+# GRADING
+# ======================
+TOLERANCE = 0.02  # answers within 2% of the correct value are accepted
+
+def grade(user_value: float, correct_answer: float) -> bool:
+    return abs(user_value - correct_answer) <= abs(correct_answer * TOLERANCE)
+
+def xp_for(hints_shown: int) -> int:
+    # Every hint costs 2 XP, but a correct answer is always worth at least 2
+    return max(10 - hints_shown * 2, 2)
+
+def grade_paper(problems: List[PhysicsProblem], answers: List[str]) -> List[bool]:
+    # Grade a whole paper in one pass; blank or non-numeric answers are wrong
+    results = []
+    for problem, answer in zip(problems, answers):
+        try:
+            results.append(grade(float(answer), problem.answer))
+        except ValueError:
+            results.append(False)
+    return results
+
+# ======================
+# SESSION HISTORY
+# ======================
+ATTEMPT_MODES = ("Study", "Quiz", "Exam", "Drill")  # stored as their index
+
+class Attempt(NamedTuple):
+    topic: str
+    problem_type: int
+    params: Tuple
+    answer: float
+    submitted: float  # NaN when no number was entered
+    hints: int
+    elapsed: float    # seconds, NaN when not measured
+    correct: bool
+    timestamp: float
+    mode: str = "Study"  # one of ATTEMPT_MODES
     
-    def generate_unit_conversion(self):
-        conversions = [
-            ("kilometers", "meters", random.randint(1, 10), 1000, "km", "m"),
-            ("grams", "kilograms", random.randint(100, 9000), 0.001, "g", "kg"),
-            ("hours", "seconds", random.randint(1, 24), 3600, "h", "s"),
-            ("centimeters", "meters", random.randint(10, 500), 0.01, "cm", "m"),
-            ("milliliters", "liters", random.randint(100, 5000), 0.001, "mL", "L")
-        ]
-        
-        from_unit, to_unit, value, factor, short_from, short_to = random.choice(conversions)
-        result = value * factor
-        
-        self.problem_text = f"Convert {value} {short_from} to {short_to}."
-        self.answer = round(result, 4)
-        self.unit = short_to
-        
-        self.hints = [
-            f"💡 You need to convert {short_from} to {short_to}.",
-            f"📐 Conversion factor: 1 {short_from} = {factor} {short_to}",
-            f"🔧 Starting value = {value} {short_from}",
-            f"🧮 {value} × {factor} = {round(result, 4)} {short_to}"
-        ]
+    def problem(self) -> PhysicsProblem:
+        # Rebuild the full problem, text and all, from its parameters
+        return PhysicsProblem(self.topic, problem_type=self.problem_type, params=self.params)
+
+class SessionHistory:
+    # Every attempt as one row across parallel typed columns. No PhysicsProblem or
+    # text is kept: problems are re-rendered from their parameters when reviewed.
+    # With a capacity the columns become a ring buffer holding the newest rows.
+    COLUMNS = {
+        "topic": "B", "problem_type": "B", "params": "d", "answer": "d", "submitted": "d",
+        "hints": "B", "elapsed": "f", "correct": "b", "timestamp": "d", "mode": "B",
+    }
+    
+    def __init__(self, capacity: int = None):
+        self.capacity = capacity
+        self.topics = list(PROBLEM_TYPES)
+        self.topic_ids = {topic: i for i, topic in enumerate(self.topics)}
+        self.width = max(len(kind.param_names) for kinds in PROBLEM_TYPES.values() for kind in kinds)
+        self.clear()
+    
+    def clear(self):
+        for name, typecode in self.COLUMNS.items():
+            setattr(self, name, array(typecode))
+        self.start = 0   # physical row of the oldest attempt once the ring is full
+        self.total = 0   # attempts ever recorded, including overwritten ones
+    
+    def __len__(self):
+        return len(self.topic)
+    
+    def record(self, problem: PhysicsProblem, submitted: float = None, hints: int = 0,
+               elapsed: float = None, correct: bool = None, timestamp: float = None, mode: str = "Study"):
+        if problem.topic not in self.topic_ids:
+            self.topic_ids[problem.topic] = len(self.topics)
+            self.topics.append(problem.topic)
+        if correct is None:
+            correct = submitted is not None and grade(submitted, problem.answer)
+        
+        params = list(problem.params)[:self.width]
+        params += [math.nan] * (self.width - len(params))
+        row = (
+            self.topic_ids[problem.topic], problem.problem_type, problem.answer,
+            math.nan if submitted is None else submitted, min(hints, 255),
+            math.nan if elapsed is None else elapsed, bool(correct),
+            time.time() if timestamp is None else timestamp, ATTEMPT_MODES.index(mode),
+        )
         
-        self.solution = f"{value} {short_from} × {factor}\n= {round(result, 4)} {short_to}"
+        if self.capacity is None or len(self) < self.capacity:
+            for column, value in zip(self._scalar_columns(), row):
+                column.append(value)
+            self.params.extend(params)
+        else:
+            i = self.start
+            for column, value in zip(self._scalar_columns(), row):
+                column[i] = value
+            self.params[i * self.width:(i + 1) * self.width] = array("d", params)
+            self.start = (i + 1) % self.capacity
+        self.total += 1
+    
+    def _scalar_columns(self):
+        return (self.topic, self.problem_type, self.answer, self.submitted, self.hints,
+                self.elapsed, self.correct, self.timestamp, self.mode)
+    
+    def _row(self, index):
+        # Logical index (0 = oldest kept attempt) to physical row
+        n = len(self)
+        if index < 0:
+            index += n
+        if not 0 <= index < n:
+            raise IndexError("attempt index out of range")
+        return (self.start + index) % n if self.start else index
+    
+    def __getitem__(self, index) -> Attempt:
+        i = self._row(index)
+        params = tuple(
+            int(v) if v.is_integer() else v
+            for v in self.params[i * self.width:(i + 1) * self.width] if not math.isnan(v)
+        )
+        return Attempt(
+            self.topics[self.topic[i]], self.problem_type[i], params, self.answer[i],
+            self.submitted[i], self.hints[i], self.elapsed[i], bool(self.correct[i]), self.timestamp[i],
+            ATTEMPT_MODES[self.mode[i]]
+        )
+    
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+    
+    def last(self, n: int) -> List[Attempt]:
+        # Newest first
+        return [self[-k] for k in range(1, min(n, len(self)) + 1)]
+    
+    @property
+    def nbytes(self):
+        return sum(column.buffer_info()[1] * column.itemsize
+                   for column in (self.params,) + self._scalar_columns())
+    
+    def dump(self) -> bytes:
+        # Compact binary form used by saved profiles: oldest attempt first, columns
+        # in native byte order (profiles stay on the machine that wrote them)
+        parts = [struct.pack("<IBB", len(self), self.width, len(self.topics))]
+        parts += [_pack_text(topic) for topic in self.topics]
+        for name in self.COLUMNS:
+            column = getattr(self, name)
+            cut = self.start * (self.width if name == "params" else 1)
+            parts += [column[cut:].tobytes(), column[:cut].tobytes()]
+        return b"".join(parts)
+    
+    @classmethod
+    def load(cls, data, offset: int = 0, capacity: int = None, columns=None):
+        # Inverse of dump(); returns (history, offset after it). `columns` names the
+        # columns present in older data; missing ones are filled with zeros.
+        rows, width, topic_count = struct.unpack_from("<IBB", data, offset)
+        offset += 6
+        topics = []
+        for _ in range(topic_count):
+            topic, offset = _unpack_text(data, offset)
+            topics.append(topic)
+        history = cls(capacity)
+        # Topic ids in the data index its own topic list; keep that list as the prefix
+        history.topics = topics + [t for t in history.topics if t not in topics]
+        history.topic_ids = {topic: i for i, topic in enumerate(history.topics)}
+        for name, typecode in cls.COLUMNS.items():
+            column = array(typecode)
+            count = rows * (width if name == "params" else 1)
+            if columns is None or name in columns:
+                column.frombytes(bytes(data[offset:offset + count * column.itemsize]))
+                offset += count * column.itemsize
+            else:
+                column.frombytes(bytes(count * column.itemsize))
+            setattr(history, name, column)
+        if width != history.width:
+            # Problem types were added or removed since: re-pad the parameter rows
+            old, history.params = history.params, array("d")
+            for row in range(rows):
+                values = list(old[row * width:(row + 1) * width])[:history.width]
+                history.params.extend(values + [math.nan] * (history.width - len(values)))
+        if capacity is not None and rows > capacity:
+            for name in cls.COLUMNS:
+                step = history.width if name == "params" else 1
+                setattr(history, name, getattr(history, name)[(rows - capacity) * step:])
+        history.total = len(history)
+        return history, offset
+    
+    def export(self, path: str):
+        # Columnar export, oldest attempt first: one NPY array per field, readable
+        # with numpy.load. A .npz path gives one uncompressed archive; any other path
+        # is a directory of .npy files, which numpy can memory-map.
+        n = len(self)
+        columns = {"topics": _npy_strings(self.topics), "modes": _npy_strings(ATTEMPT_MODES)}
+        for name, typecode in self.COLUMNS.items():
+            column = getattr(self, name)
+            step = self.width if name == "params" else 1
+            shape = (n, self.width) if name == "params" else (n,)
+            # Undo the ring rotation without copying the column twice
+            chunks = (column[self.start * step:].tobytes(), column[:self.start * step].tobytes())
+            columns[name] = (_npy_descr(typecode), shape, chunks)
+        
+        if path.endswith(".npz"):
+            with zipfile.ZipFile(path, "w", zipfile.ZIP_STORED) as archive:
+                for name, (descr, shape, chunks) in columns.items():
+                    with archive.open(f"{name}.npy", "w") as f:
+                        _write_npy(f, descr, shape, chunks)
+        else:
+            os.makedirs(path, exist_ok=True)
+            for name, (descr, shape, chunks) in columns.items():
+                with open(os.path.join(path, f"{name}.npy"), "wb") as f:
+                    _write_npy(f, descr, shape, chunks)
+
+# NPY format 1.0 (numpy.lib.format), written without needing NumPy
+_NPY_TYPES = {"B": "u1", "b": "b1", "d": "f8", "f": "f4"}  # the "correct" column only holds 0/1
+
+def _npy_descr(typecode):
+    kind = _NPY_TYPES[typecode]
+    if kind[1] == "1":
+        return "|" + kind
+    return ("<" if sys.byteorder == "little" else ">") + kind
+
+def _npy_strings(values):
+    width = max((len(v) for v in values), default=1)
+    data = b"".join(v.ljust(width, "\0").encode("utf-32-le") for v in values)
+    return f"<U{width}", (len(values),), (data,)
+
+def _write_npy(f, descr, shape, chunks):
+    header = f"{{'descr': '{descr}', 'fortran_order': False, 'shape': {shape}, }}"
+    # Magic, version and length take 10 bytes; the header is padded to 64 bytes
+    header += " " * (-(10 + len(header) + 1) % 64) + "\n"
+    f.write(b"\x93NUMPY\x01\x00" + len(header).to_bytes(2, "little") + header.encode("latin-1"))
+    for chunk in chunks:
+        f.write(chunk)
 
 # ======================
-# MAIN APPLICATION
+# OBSERVABLE STATE
 # ======================
-class SmartLearnPhysics(ctk.CTk):
+class AppState:
+    # Session counters that announce their changes
+    FIELDS = {"score": 0, "problems_solved": 0, "hints_shown": 0, "mode": "Study",  # mode: Study, Quiz, Exam, Drill
+              "student": ""}
+    
     def __init__(self):
-        super().__init__()
-        
-        # Window setup
-        self.title("SmartLearn Physics - Master Physics with Intelligent Practice")
-        self.geometry("1000x750")
-        self.minsize(800, 600)
-        ctk.set_appearance_mode("light")
-        ctk.set_default_color_theme("blue")
-        
-        # App state
-        self.current_problem = None
-        self.hints_shown = 0
-        self.score = 0
-        self.problems_solved = 0
-        self.mode = "Study"  # Study, Quiz, Exam
-        
-        # Container for all frames
-        self.container = ctk.CTkFrame(self, fg_color=COLORS['bg'])
-        self.container.pack(fill="both", expand=True)
-        
-        # Create all frames
-        self.frames = {}
-        for F in (HomeFrame, TopicFrame, ProblemFrame, ResultFrame):
-            frame = F(self.container, self)
-            self.frames[F.__name__] = frame
-            frame.grid(row=0, column=0, sticky="nsew")
-        
-        self.container.grid_rowconfigure(0, weight=1)
-        self.container.grid_columnconfigure(0, weight=1)
-        
-        # Show home frame
-        self.show_frame("HomeFrame")
+        self.__dict__.update(self.FIELDS)
+        self.watchers = {field: [] for field in self.FIELDS}
     
-    def show_frame(self, frame_name):
-        frame = self.frames[frame_name]
-        frame.tkraise()
+    def set(self, field, value):
+        if getattr(self, field) != value:
+            setattr(self, field, value)
+            for callback in self.watchers[field]:
+                callback(field)
+    
+    def watch(self, field, callback):
+        self.watchers[field].append(callback)
+
+class StateBinder:
+    # Keeps widgets in sync with an AppState. A change marks only the widgets bound
+    # to that field dirty; they are redrawn together in one idle callback, and
+    # only if their rendered options actually differ from what they show.
+    def __init__(self, state: AppState, root):
+        self.state = state
+        self.root = root
+        self.bindings = {}  # field -> widgets
+        self.renders = {}   # widget -> render(state) returning configure options
+        self.applied = {}   # widget -> options last configured
+        self.dirty = {}     # ordered set of widgets waiting for the flush
+        self.flush_pending = False
+        for field in state.FIELDS:
+            state.watch(field, self.mark)
+    
+    def bind(self, widget, fields, render):
+        self.renders[widget] = render
+        for field in fields:
+            self.bindings.setdefault(field, []).append(widget)
+        self.apply(widget)
+    
+    def mark(self, field):
+        for widget in self.bindings.get(field, ()):
+            self.dirty[widget] = None
+        if self.dirty and not self.flush_pending:
+            self.flush_pending = True
+            self.root.after_idle(self.flush)
+    
+    def flush(self):
+        self.flush_pending = False
+        dirty, self.dirty = self.dirty, {}
+        for widget in dirty:
+            self.apply(widget)
+    
+    def apply(self, widget):
+        options = self.renders[widget](self.state)
+        if options != self.applied.get(widget):
+            self.applied[widget] = options
+            widget.configure(**options)
 
 # ======================
-# HOME FRAME
+# SESSION SNAPSHOTS
 # ======================
-class HomeFrame(ctk.CTkFrame):
-    def __init__(self, parent, controller):
-        super().__init__(parent, fg_color=COLORS['bg'])
-        self.controller = controller
-        
-        # Main container with better padding
-        main_content = ctk.CTkScrollableFrame(self, fg_color=COLORS['bg'])
-        main_content.pack(fill="both", expand=True, padx=0, pady=0)
-        
-        # Decorative header
-        header_frame = ctk.CTkFrame(main_content, fg_color=COLORS['primary'], corner_radius=0)
-        header_frame.pack(fill="x", pady=(0, 25))
-        
+# The session - score, screen, current problem (as its parameters), hints shown and
+# the half-typed answer - is captured every few seconds on the Tk thread as a small
+# struct-packed record. A background thread writes it to a temp file, fsyncs and
+# renames it over the old one, so a power cut leaves either the old or the new
+# snapshot, never a torn one.
+SNAPSHOT_PATH = os.path.join(os.path.expanduser("~"), ".smartlearn", "session.snap")
+SNAPSHOT_INTERVAL_MS = 2000
+SNAPSHOT_VERSION = 2
+_SNAPSHOT_HEADER = struct.Struct("<4sBdIIB")  # magic, version, saved at, score, solved, hints shown
+# Screens that can be resumed as they were; the rest resume on the nearest safe one
+RESUME_SCREENS = {
+    "HomeFrame": "HomeFrame", "TopicFrame": "TopicFrame", "ProblemFrame": "ProblemFrame",
+    "ResultFrame": "ProblemFrame", "HistoryFrame": "HistoryFrame",
+}
+
+def pack_snapshot(score, problems_solved, hints_shown, screen, problem=None, draft="", student=""):
+    return b"".join((
+        _SNAPSHOT_HEADER.pack(b"SLSS", SNAPSHOT_VERSION, time.time(), score, problems_solved, min(hints_shown, 255)),
+        _pack_text(screen), _pack_problem(problem), _pack_text(draft), _pack_text(student),
+    ))
+
+def unpack_snapshot(data):
+    # Returns a dict, or raises ValueError/struct.error for anything unusable
+    magic, version, saved_at, score, solved, hints = _SNAPSHOT_HEADER.unpack_from(data, 0)
+    if magic != b"SLSS" or version != SNAPSHOT_VERSION:
+        raise ValueError("not a SmartLearn snapshot")
+    offset = _SNAPSHOT_HEADER.size
+    screen, offset = _unpack_text(data, offset)
+    problem, offset = _unpack_problem(data, offset)
+    draft, offset = _unpack_text(data, offset)
+    student, offset = _unpack_text(data, offset)
+    return {"saved_at": saved_at, "score": score, "problems_solved": solved, "hints_shown": hints,
+            "screen": screen, "problem": problem, "draft": draft, "student": student}
+
+def _pack_problem(problem):
+    # A problem is stored as its topic, type and parameters, and re-rendered on load
+    if problem is None:
+        return b"\xff"
+    params = tuple(problem.params)
+    return struct.pack(f"<BB{len(params)}d", problem.problem_type, len(params), *params) + _pack_text(problem.topic)
+
+def _unpack_problem(data, offset):
+    # Returns ((topic, type, params) or None, offset after it)
+    if data[offset] == 0xFF:
+        return None, offset + 1
+    problem_type, count = struct.unpack_from("<BB", data, offset)
+    params = struct.unpack_from(f"<{count}d", data, offset + 2)
+    topic, offset = _unpack_text(data, offset + 2 + 8 * count)
+    return (topic, problem_type, tuple(int(v) if v.is_integer() else v for v in params)), offset
+
+def _pack_text(text):
+    data = text.encode()[:65535]
+    return struct.pack("<H", len(data)) + data
+
+def _unpack_text(data, offset):
+    length, = struct.unpack_from("<H", data, offset)
+    end = offset + 2 + length
+    if end > len(data):
+        raise ValueError("truncated snapshot")
+    return bytes(data[offset + 2:end]).decode(), end
+
+WRITE_RETRY_SECONDS = 5
+
+class AtomicWriter:
+    # Writes files from a background thread. Only the newest data for each path
+    # matters, so a slow disk just skips stale versions. A failed write is reported
+    # and retried until it succeeds or newer data for the path replaces it.
+    def __init__(self):
+        self.pending = {}     # path -> newest data
+        self.writing = None   # (path, data) being written right now
+        self.errors = {}      # path -> error of its last failed write
+        self.condition = threading.Condition()
+        self.idle = threading.Event()
+        self.idle.set()
+        threading.Thread(target=self.run, daemon=True).start()
+    
+    def submit(self, path: str, data: bytes):
+        with self.condition:
+            self.pending[path] = data
+            self.idle.clear()
+            self.condition.notify()
+    
+    def latest(self, path):
+        # Data submitted for path that may not have reached the disk yet, or None
+        with self.condition:
+            if path in self.pending:
+                return self.pending[path]
+            if self.writing and self.writing[0] == path:
+                return self.writing[1]
+            return None
+    
+    def flush(self, timeout=2.0):
+        # Wait for everything submitted to reach the disk (used on exit)
+        return self.idle.wait(timeout)
+    
+    def run(self):
+        while True:
+            with self.condition:
+                while not self.pending:
+                    self.condition.wait()
+                path = next(iter(self.pending))
+                data = self.pending.pop(path)
+                self.writing = (path, data)
+            try:
+                write_atomic(path, data)
+                error = None
+            except OSError as e:
+                error = e
+            with self.condition:
+                self.writing = None
+                if error is None:
+                    self.errors.pop(path, None)
+                else:
+                    if path not in self.errors:
+                        print(f"Could not save {path}: {error} (retrying)", file=sys.stderr)
+                    self.errors[path] = error
+                    # Queued behind other paths, unless newer data already arrived
+                    self.pending.setdefault(path, data)
+                    self.condition.wait(WRITE_RETRY_SECONDS)
+                if not self.pending:
+                    self.idle.set()
+
+def write_atomic(path, data: bytes):
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    temp = f"{path}.{os.getpid()}.tmp"
+    with open(temp, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp, path)
+    if hasattr(os, "O_DIRECTORY"):
+        # Make the rename itself durable
+        fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+# ======================
+# STUDENT PROFILES
+# ======================
+# Every app has an active profile: a student's counters, history, current problem
+# and a few problems generated ahead of time. In kiosk mode many students share
+# one running app; their profiles are kept in memory in least-recently-used order
+# up to a byte budget, and profiles pushed out are saved and reloaded on demand.
+PROFILE_DIR = os.path.join(os.path.expanduser("~"), ".smartlearn", "profiles")
+PROFILE_MEMORY_LIMIT = 64 * 1024 * 1024
+PROFILE_VERSION = 2
+_PROFILE_COLUMNS = {1: tuple(SessionHistory.COLUMNS)[:-1]}  # older versions: history columns saved
+_PROFILE_HEADER = struct.Struct("<4sBII")  # magic, version, score, solved
+_PROFILE_OVERHEAD = 4096   # rough bytes per profile besides its history
+_PREFETCHED_SIZE = 2048    # rough bytes per prefetched problem (text, hints, solution)
+
+class StudentProfile:
+    def __init__(self, name: str, history: SessionHistory):
+        self.name = name
+        self.score = 0
+        self.problems_solved = 0
+        self.history = history
+        self.current_problem = None
+        self.upcoming = {}  # topic -> a problem generated ahead of time
+        self.saved = None   # (score, solved, attempts, problem) when last written
+    
+    @property
+    def nbytes(self):
+        return _PROFILE_OVERHEAD + self.history.nbytes + _PREFETCHED_SIZE * len(self.upcoming)
+    
+    def state(self):
+        return (self.score, self.problems_solved, self.history.total, self.current_problem)
+    
+    def dump(self) -> bytes:
+        return b"".join((
+            _PROFILE_HEADER.pack(b"SLPF", PROFILE_VERSION, self.score, self.problems_solved),
+            _pack_text(self.name), _pack_problem(self.current_problem), self.history.dump(),
+        ))
+    
+    @classmethod
+    def load(cls, data, history_limit=None):
+        magic, version, score, solved = _PROFILE_HEADER.unpack_from(data, 0)
+        if magic != b"SLPF" or not (version == PROFILE_VERSION or version in _PROFILE_COLUMNS):
+            raise ValueError("not a SmartLearn profile")
+        name, offset = _unpack_text(data, _PROFILE_HEADER.size)
+        problem, offset = _unpack_problem(data, offset)
+        # Version 1 had no mode column; those attempts read as Study
+        history, offset = SessionHistory.load(data, offset, history_limit, _PROFILE_COLUMNS.get(version))
+        profile = cls(name, history)
+        profile.score = score
+        profile.problems_solved = solved
+        if problem:
+            topic, problem_type, params = problem
+            profile.current_problem = PhysicsProblem(topic, problem_type=problem_type, params=params)
+        profile.saved = profile.state()
+        return profile
+
+class ProfileStore:
+    def __init__(self, directory: str = None, memory_limit: int = PROFILE_MEMORY_LIMIT,
+                 history_limit: int = None, writer: AtomicWriter = None):
+        self.directory = directory  # None: profiles live in memory only
+        self.memory_limit = memory_limit
+        self.history_limit = history_limit
+        self.writer = writer
+        self.profiles = OrderedDict()  # name -> StudentProfile, least recently used first
+    
+    def path(self, name):
+        slug = re.sub(r"[^\w-]+", "_", name)[:40]
+        digest = hashlib.blake2b(name.encode(), digest_size=4).hexdigest()
+        return os.path.join(self.directory, f"{slug}-{digest}.profile")
+    
+    def get(self, name: str) -> StudentProfile:
+        profile = self.profiles.get(name)
+        if profile is None:
+            profile = self.load(name) or StudentProfile(name, SessionHistory(self.history_limit))
+        self.put(profile)
+        return profile
+    
+    def put(self, profile: StudentProfile):
+        # Adds or replaces a profile as the most recently used one
+        self.profiles[profile.name] = profile
+        self.profiles.move_to_end(profile.name)
+        self.evict()
+    
+    def load(self, name):
+        if not self.directory:
+            return None
+        path = self.path(name)
+        # A profile evicted moments ago may still be on its way to the disk
+        data = self.writer.latest(path) if self.writer else None
+        try:
+            if data is None:
+                with open(path, "rb") as f:
+                    data = f.read()
+            profile = StudentProfile.load(data, self.history_limit)
+        except FileNotFoundError:
+            return None  # a new student
+        except (OSError, ValueError, KeyError, IndexError, struct.error) as e:
+            print(f"Could not load the profile of {name}: {e}", file=sys.stderr)
+            return None
+        return profile if profile.name == name else None
+    
+    def save(self, profile: StudentProfile):
+        # Profiles grow between saves (history, prefetched problems), so the byte
+        # cap is checked again here and not only when one is added
+        self.write(profile)
+        self.evict()
+    
+    def save_all(self):
+        for profile in self.profiles.values():
+            self.write(profile)
+    
+    def write(self, profile: StudentProfile):
+        # Packed on the calling (Tk) thread, written by the background writer
+        if self.directory and self.writer and profile.state() != profile.saved:
+            self.writer.submit(self.path(profile.name), profile.dump())
+            profile.saved = profile.state()
+    
+    def evict(self):
+        # Never the most recent (active) profile
+        total = sum(profile.nbytes for profile in self.profiles.values())
+        while total > self.memory_limit and len(self.profiles) > 1:
+            name, profile = next(iter(self.profiles.items()))
+            self.write(profile)
+            del self.profiles[name]
+            total -= profile.nbytes
+    
+    def recent(self):
+        # Names in memory, most recent first
+        return list(reversed(self.profiles))
+
+def _state_field(field):
+    return property(lambda self: getattr(self.session, field),
+                    lambda self, value: self.session.set(field, value))
+
+# ======================
+# MAIN APPLICATION
+# ======================
+class SmartLearnPhysics(ctk.CTk):
+    score = _state_field("score")
+    problems_solved = _state_field("problems_solved")
+    hints_shown = _state_field("hints_shown")
+    mode = _state_field("mode")
+    student = _state_field("student")
+    
+    def __init__(self, history_limit: int = None, snapshot_path: str = None, resume: bool = True,
+                 profile_dir: str = None, student: str = "", profile_memory: int = PROFILE_MEMORY_LIMIT):
+        super().__init__()
+        STYLES.reset()
+        
+        # Window setup
+        self.title(tr("SmartLearn Physics - Master Physics with Intelligent Practice"))
+        self.geometry("1000x750")
+        self.minsize(800, 600)
+        ctk.set_appearance_mode("light")
+        ctk.set_default_color_theme("blue")
+        
+        # App state; score, problems_solved, hints_shown, mode and student live in
+        # self.session (not self.state, which Tk uses for the window state)
+        self.session = AppState()
+        self.binder = StateBinder(self.session, self)
+        self.current_problem = None
+        self.nice_answers = None  # None or a NICE_ANSWERS mode
+        self.classroom = None  # ClassroomClient when taking part in a class leaderboard
+        self.current_frame = None
+        
+        # Per-student state; with a profile_dir (kiosk mode) students can switch in place
+        self.writer = AtomicWriter()
+        self.profiles = ProfileStore(profile_dir, profile_memory, history_limit, self.writer)
+        self.kiosk = profile_dir is not None
+        self.profile = self.profiles.get(student)
+        self.history = self.profile.history
+        self.score = self.profile.score
+        self.problems_solved = self.profile.problems_solved
+        self.current_problem = self.profile.current_problem
+        self.student = student
+        
+        # Container for all frames
+        self.container = ctk.CTkFrame(self, fg_color=COLORS['bg'])
+        self.container.pack(fill="both", expand=True)
+        
+        # Create all frames
+        self.frames = {}
+        for F in (HomeFrame, TopicFrame, ProblemFrame, ResultFrame, ExamFrame, DrillFrame, HistoryFrame):
+            frame = F(self.container, self)
+            self.frames[F.__name__] = frame
+            frame.grid(row=0, column=0, sticky="nsew")
+        
+        self.container.grid_rowconfigure(0, weight=1)
+        self.container.grid_columnconfigure(0, weight=1)
+        
+        # Show home frame, or pick up where the last session stopped
+        self.show_frame("HomeFrame")
+        self.snapshot_path = snapshot_path
+        self.last_snapshot = None
+        if snapshot_path:
+            if resume:
+                self.restore_snapshot(snapshot_path)
+            self.after(SNAPSHOT_INTERVAL_MS, self.take_snapshot)
+            self.protocol("WM_DELETE_WINDOW", self.close)
+    
+    def show_frame(self, frame_name):
+        frame = self.frames[frame_name]
+        frame.tkraise()
+        self.current_frame = frame_name
+    
+    def capture_snapshot(self):
+        draft = ""
+        if self.current_frame == "ProblemFrame":
+            draft = self.frames["ProblemFrame"].answer_entry.get()
+        return (self.score, self.problems_solved, self.hints_shown, self.current_frame,
+                self.current_problem, draft, self.student)
+    
+    def take_snapshot(self):
+        # Runs on the Tk thread; only a changed session is packed and handed to the writer
+        state = self.capture_snapshot()
+        if state != self.last_snapshot:
+            self.last_snapshot = state
+            self.writer.submit(self.snapshot_path, pack_snapshot(*state))
+            self.store_profile()
+            self.profiles.save(self.profile)
+        self.after(SNAPSHOT_INTERVAL_MS, self.take_snapshot)
+    
+    def save_snapshot(self):
+        # Final snapshot and profiles on the way out, while the widgets still exist
+        if self.winfo_exists():
+            if self.snapshot_path:
+                self.writer.submit(self.snapshot_path, pack_snapshot(*self.capture_snapshot()))
+            self.store_profile()
+            self.profiles.save_all()
+            if not self.writer.flush():
+                print(f"Could not save everything: {self.writer.errors or 'the disk is too slow'}", file=sys.stderr)
+    
+    def close(self):
+        self.save_snapshot()
+        self.destroy()
+    
+    def restore_snapshot(self, path):
+        try:
+            with open(path, "rb") as f:
+                snapshot = unpack_snapshot(f.read())
+            problem = None
+            if snapshot["problem"]:
+                topic, problem_type, params = snapshot["problem"]
+                problem = PhysicsProblem(topic, problem_type=problem_type, params=params)
+        except (OSError, ValueError, KeyError, IndexError, struct.error):
+            return False  # no snapshot, or one from an incompatible version
+        
+        if self.kiosk and snapshot["student"]:
+            self.switch_profile(snapshot["student"])
+        self.score = snapshot["score"]
+        self.problems_solved = snapshot["problems_solved"]
+        self.current_problem = problem
+        # Exams and drills are timed, so they resume on the home screen
+        screen = RESUME_SCREENS.get(snapshot["screen"], "HomeFrame")
+        if screen == "ProblemFrame":
+            if problem is None:
+                screen = "TopicFrame"
+            else:
+                problem_frame = self.frames["ProblemFrame"]
+                problem_frame.load_problem()
+                if snapshot["screen"] == "ProblemFrame":
+                    for _ in range(min(snapshot["hints_shown"], len(problem.hints))):
+                        problem_frame.show_hint()
+                    problem_frame.answer_entry.insert(0, snapshot["draft"])
+        self.show_frame(screen)
+        return True
+    
+    def store_profile(self):
+        profile = self.profile
+        profile.score = self.score
+        profile.problems_solved = self.problems_solved
+        profile.current_problem = self.current_problem
+    
+    def switch_profile(self, name):
+        # Hands the app to another student without rebuilding any frame: the
+        # bound labels follow the session fields, other screens redraw when shown
+        if name == self.profile.name:
+            return
+        self.store_profile()
+        self.profiles.save(self.profile)
+        self.profile = self.profiles.get(name)
+        self.history = self.profile.history
+        self.current_problem = self.profile.current_problem
+        self.score = self.profile.score
+        self.problems_solved = self.profile.problems_solved
+        self.hints_shown = 0
+        self.student = name
+        if self.classroom:
+            self.classroom.student = name
+        self.show_frame("HomeFrame")
+    
+    def new_problem(self, topic):
+        # The problem prefetched for this student and topic, if it is still usable;
+        # the next one is generated once the UI is idle
+        problem = self.profile.upcoming.pop(topic, None)
+        if problem is None or problem.nice != self.nice_answers:
+            problem = PhysicsProblem(topic, nice=self.nice_answers)
+        self.after_idle(self.prefetch, self.profile, topic)
+        return problem
+    
+    def prefetch(self, profile, topic):
+        profile.upcoming[topic] = PhysicsProblem(topic, nice=self.nice_answers)
+        self.profiles.evict()
+
+# ======================
+# HOME FRAME
+# ======================
+class HomeFrame(ctk.CTkFrame):
+    def __init__(self, parent, controller):
+        super().__init__(parent, fg_color=COLORS['bg'])
+        self.controller = controller
+        
+        # Main container with better padding
+        main_content = ctk.CTkScrollableFrame(self, fg_color=COLORS['bg'])
+        main_content.pack(fill="both", expand=True, padx=0, pady=0)
+        
+        # Decorative header
+        header_frame = ctk.CTkFrame(main_content, fg_color=COLORS['primary'], **STYLES.shape("header"))
+        header_frame.pack(fill="x", pady=(0, 25))
+        
         # Title
         title = ctk.CTkLabel(
             header_frame,
-            text="🧪 SmartLearn Physics",
-            font=("Poppins", 44, "bold"),
+            text=tr("🧪 SmartLearn Physics"),
+            font=STYLES.font(44, "bold"),
             text_color="#FFFFFF"
         )
         title.pack(pady=(35, 12))
         
         subtitle = ctk.CTkLabel(
             header_frame,
-            text="Master Physics with Intelligent Practice",
-            font=("Poppins", 16),
+            text=tr("Master Physics with Intelligent Practice"),
+            font=STYLES.font(16),
             text_color="#E0E0E0"
         )
         subtitle.pack(pady=(0, 35))
         
+        if controller.kiosk:
+            # Shared lab PCs: show whose session this is
+            self.student_label = ctk.CTkLabel(header_frame, text="", font=STYLES.font(16, "bold"), text_color="#FFFFFF")
+            self.student_label.pack(pady=(0, 20))
+            controller.binder.bind(self.student_label, ("student",), lambda s: {"text": f"👤 {s.student}"})
+        
         # Stats cards display - constrained width
         stats_frame = ctk.CTkFrame(main_content, fg_color="transparent")
         stats_frame.pack(pady=20, padx=40, fill="x", expand=False)
         
-        # Create two stat cards
-        stat1_frame = ctk.CTkFrame(stats_frame, fg_color=COLORS['card_bg'], corner_radius=15, height=120)
-        stat1_frame.pack(side="left", padx=5, fill="both", expand=True)
+        # Create two stat cards; side by side when they fit, stacked when not
+        stat1_frame = ctk.CTkFrame(stats_frame, fg_color=COLORS['card_bg'], height=120, **STYLES.shape("tile"))
         stat1_frame.pack_propagate(False)
         
         ctk.CTkLabel(
             stat1_frame,
             text="🎯",
-            font=("Poppins", 28)
+            font=STYLES.font(28)
         ).pack(pady=(8, 0))
         
         ctk.CTkLabel(
             stat1_frame,
-            text="Problems",
-            font=("Poppins", 12),
+            text=tr("Problems"),
+            font=STYLES.font(12),
             text_color=COLORS['text_light']
         ).pack()
         
         self.problems_label = ctk.CTkLabel(
             stat1_frame,
-            text=f"{controller.problems_solved}",
-            font=("Poppins", 28, "bold"),
+            text="",
+            font=STYLES.font(28, "bold"),
             text_color=COLORS['primary']
         )
         self.problems_label.pack(pady=(2, 8))
+        controller.binder.bind(self.problems_label, ("problems_solved",), lambda s: {"text": str(s.problems_solved)})
         
-        stat2_frame = ctk.CTkFrame(stats_frame, fg_color=COLORS['card_bg'], corner_radius=15, height=120)
-        stat2_frame.pack(side="left", padx=5, fill="both", expand=True)
+        stat2_frame = ctk.CTkFrame(stats_frame, fg_color=COLORS['card_bg'], height=120, **STYLES.shape("tile"))
         stat2_frame.pack_propagate(False)
         
         ctk.CTkLabel(
             stat2_frame,
             text="⭐",
-            font=("Poppins", 28)
+            font=STYLES.font(28)
         ).pack(pady=(8, 0))
         
         ctk.CTkLabel(
             stat2_frame,
-            text="Total XP",
-            font=("Poppins", 12),
+            text=tr("Total XP"),
+            font=STYLES.font(12),
             text_color=COLORS['text_light']
         ).pack()
         
         self.xp_label = ctk.CTkLabel(
             stat2_frame,
-            text=f"{controller.score}",
-            font=("Poppins", 28, "bold"),
+            text="",
+            font=STYLES.font(28, "bold"),
             text_color=COLORS['success']
         )
         self.xp_label.pack(pady=(2, 8))
+        controller.binder.bind(self.xp_label, ("score",), lambda s: {"text": str(s.score)})
+        self.stats_grid = ResponsiveGrid(stats_frame, [stat1_frame, stat2_frame], 220, 2, 2, padx=5, pady=5)
         
         # Main action buttons
         btn_frame = ctk.CTkFrame(main_content, fg_color="transparent")
         btn_frame.pack(pady=15, padx=40, expand=False)
         
+        if controller.kiosk:
+            RoundedButton(
+                btn_frame,
+                text=tr("👤 Switch Student"),
+                command=self.show_switch_student,
+                color=COLORS['primary_light'],
+                width=300
+            ).pack(pady=8, anchor="center")
+        
         RoundedButton(
             btn_frame,
-            text="🚀 Start Practice",
+            text=tr("🚀 Start Practice"),
             command=lambda: controller.show_frame("TopicFrame"),
             width=300
         ).pack(pady=8, anchor="center")
         
+        RoundedButton(
+            btn_frame,
+            text=tr("📝 Exam Mode"),
+            command=lambda: controller.frames["ExamFrame"].start_exam(),
+            color=COLORS['secondary'],
+            width=300
+        ).pack(pady=8, anchor="center")
+        
+        RoundedButton(
+            btn_frame,
+            text=tr("⚡ Speed Drill"),
+            command=lambda: controller.frames["DrillFrame"].start_drill(),
+            color=COLORS['warning'],
+            width=300
+        ).pack(pady=8, anchor="center")
+        
         # Secondary buttons (vertical)
         RoundedButton(
             btn_frame,
-            text="📊 Progress",
+            text=tr("📊 Progress"),
             command=self.show_progress,
             color=COLORS['success'],
             width=300
@@ -631,7 +2138,15 @@ class HomeFrame(ctk.CTkFrame):
         
         RoundedButton(
             btn_frame,
-            text="ℹ️ Info",
+            text=tr("📜 History"),
+            command=lambda: controller.show_frame("HistoryFrame"),
+            color=COLORS['momentum'],
+            width=300
+        ).pack(pady=8, anchor="center")
+        
+        RoundedButton(
+            btn_frame,
+            text=tr("ℹ️ Info"),
             command=self.show_info,
             color=COLORS['primary_light'],
             width=300
@@ -640,15 +2155,28 @@ class HomeFrame(ctk.CTkFrame):
         # Exit button
         RoundedButton(
             btn_frame,
-            text="❌ Exit",
+            text=tr("❌ Exit"),
             command=controller.quit,
             color=COLORS['error'],
             width=300
         ).pack(pady=8, anchor="center")
+        
+        self.theme_switch = ctk.CTkSwitch(
+            btn_frame,
+            text=tr("🌙 Dark mode"),
+            font=STYLES.font(14),
+            text_color=COLORS['text_medium'],
+            progress_color=COLORS['primary'],
+            command=self.toggle_theme
+        )
+        self.theme_switch.pack(pady=(12, 8), anchor="center")
+    
+    def toggle_theme(self):
+        STYLES.set_appearance("dark" if self.theme_switch.get() else "light")
     
     def show_info(self):
         popup = ctk.CTkToplevel(self)
-        popup.title("About SmartLearn")
+        popup.title(tr("About SmartLearn"))
         popup.geometry("500x400")
         popup.resizable(False, False)
         
@@ -658,13 +2186,13 @@ class HomeFrame(ctk.CTkFrame):
         y = self.winfo_y() + (self.winfo_height() - popup.winfo_height()) // 2
         popup.geometry(f"+{x}+{y}")
         
-        header = ctk.CTkFrame(popup, fg_color=COLORS['primary'], corner_radius=0)
+        header = ctk.CTkFrame(popup, fg_color=COLORS['primary'], **STYLES.shape("header"))
         header.pack(fill="x")
         
         ctk.CTkLabel(
             header,
-            text="📚 About SmartLearn",
-            font=("Poppins", 24, "bold"),
+            text=tr("📚 About SmartLearn"),
+            font=STYLES.font(24, "bold"),
             text_color="#FFFFFF"
         ).pack(pady=20)
         
@@ -674,15 +2202,15 @@ class HomeFrame(ctk.CTkFrame):
         
         info_text = ctk.CTkLabel(
             info_frame,
-            text="Welcome to SmartLearn Physics!\n\n"
-                 "An interactive learning platform that helps you master physics through:\n\n"
-                 "✨ Interactive Problem Solving\n"
-                 "💡 Intelligent Hints\n"
-                 "📈 Progress Tracking\n"
-                 "🎯 XP Reward System\n"
-                 "🧠 Multiple Physics Topics\n\n"
-                 "Practice problems across 9 different topics and track your progress!",
-            font=("Poppins", 14),
+            text=tr("Welcome to SmartLearn Physics!\n\n"
+                    "An interactive learning platform that helps you master physics through:\n\n"
+                    "✨ Interactive Problem Solving\n"
+                    "💡 Intelligent Hints\n"
+                    "📈 Progress Tracking\n"
+                    "🎯 XP Reward System\n"
+                    "🧠 Multiple Physics Topics\n\n"
+                    "Practice problems across 9 different topics and track your progress!"),
+            font=STYLES.font(14),
             text_color=COLORS['text_dark'],
             wraplength=420,
             justify="left"
@@ -692,11 +2220,59 @@ class HomeFrame(ctk.CTkFrame):
         button_frame = ctk.CTkFrame(popup, fg_color="transparent")
         button_frame.pack(pady=15, padx=20, expand=False)
         
-        RoundedButton(button_frame, text="Close", command=popup.destroy, width=150).pack(anchor="center")
+        RoundedButton(button_frame, text=tr("Close"), command=popup.destroy, width=150).pack(anchor="center")
+    
+    def show_switch_student(self):
+        popup = ctk.CTkToplevel(self)
+        popup.title(tr("Switch Student"))
+        popup.geometry("400x480")
+        popup.resizable(False, False)
+        
+        # Center the popup
+        popup.update_idletasks()
+        x = self.winfo_x() + (self.winfo_width() - popup.winfo_width()) // 2
+        y = self.winfo_y() + (self.winfo_height() - popup.winfo_height()) // 2
+        popup.geometry(f"+{x}+{y}")
+        
+        header = ctk.CTkFrame(popup, fg_color=COLORS['primary'], **STYLES.shape("header"))
+        header.pack(fill="x")
+        
+        ctk.CTkLabel(
+            header,
+            text=tr("👤 Who is practicing?"),
+            font=STYLES.font(24, "bold"),
+            text_color="#FFFFFF"
+        ).pack(pady=20)
+        
+        def switch(name):
+            name = name.strip()
+            if name:
+                popup.destroy()
+                self.controller.switch_profile(name)
+        
+        entry = ctk.CTkEntry(popup, placeholder_text=tr("Your name"), font=STYLES.font(16), height=40, width=300)
+        entry.pack(pady=(20, 10))
+        entry.bind("<Return>", lambda event: switch(entry.get()))
+        entry.focus_set()
+        
+        RoundedButton(popup, text=tr("Continue"), command=lambda: switch(entry.get()), width=300).pack(pady=(0, 15))
+        
+        # Students who used this PC recently, most recent first
+        recent = [name for name in self.controller.profiles.recent() if name != self.controller.student][:5]
+        if recent:
+            ctk.CTkLabel(popup, text=tr("Recent"), font=STYLES.font(12), text_color=COLORS['text_light']).pack()
+            for name in recent:
+                RoundedButton(
+                    popup,
+                    text=name,
+                    command=lambda n=name: switch(n),
+                    color=COLORS['primary_light'],
+                    width=300
+                ).pack(pady=4)
     
     def show_progress(self):
         popup = ctk.CTkToplevel(self)
-        popup.title("Your Progress")
+        popup.title(tr("Your Progress"))
         popup.geometry("500x450")
         popup.resizable(False, False)
         
@@ -706,13 +2282,13 @@ class HomeFrame(ctk.CTkFrame):
         y = self.winfo_y() + (self.winfo_height() - popup.winfo_height()) // 2
         popup.geometry(f"+{x}+{y}")
         
-        header = ctk.CTkFrame(popup, fg_color=COLORS['primary'], corner_radius=0)
+        header = ctk.CTkFrame(popup, fg_color=COLORS['primary'], **STYLES.shape("header"))
         header.pack(fill="x")
         
         ctk.CTkLabel(
             header,
-            text="📊 Your Progress",
-            font=("Poppins", 24, "bold"),
+            text=tr("📊 Your Progress"),
+            font=STYLES.font(24, "bold"),
             text_color="#FFFFFF"
         ).pack(pady=20)
         
@@ -721,35 +2297,35 @@ class HomeFrame(ctk.CTkFrame):
         stats_scroll.pack(fill="both", expand=True, padx=20, pady=20)
         
         stat_items = [
-            ("🎯 Problems Solved", str(self.controller.problems_solved), COLORS['primary']),
-            ("⭐ Total XP Earned", str(self.controller.score), COLORS['success']),
-            ("📈 Average per Problem", str(self.controller.score // max(1, self.controller.problems_solved)) if self.controller.problems_solved > 0 else "0", COLORS['warning'])
+            (tr("🎯 Problems Solved"), str(self.controller.problems_solved), COLORS['primary']),
+            (tr("⭐ Total XP Earned"), str(self.controller.score), COLORS['success']),
+            (tr("📈 Average per Problem"), str(self.controller.score // max(1, self.controller.problems_solved)) if self.controller.problems_solved > 0 else "0", COLORS['warning'])
         ]
         
         for icon_label, value, color in stat_items:
-            stat_frame = ctk.CTkFrame(stats_scroll, fg_color=COLORS['card_bg'], corner_radius=15)
+            stat_frame = ctk.CTkFrame(stats_scroll, fg_color=COLORS['card_bg'], **STYLES.shape("tile"))
             stat_frame.pack(fill="x", pady=8)
             
-            left = ctk.CTkLabel(stat_frame, text=icon_label, font=("Poppins", 14), text_color=COLORS['text_dark'])
+            left = ctk.CTkLabel(stat_frame, text=icon_label, font=STYLES.font(14), text_color=COLORS['text_dark'])
             left.pack(side="left", padx=20, pady=15)
             
-            right = ctk.CTkLabel(stat_frame, text=value, font=("Poppins", 18, "bold"), text_color=color)
+            right = ctk.CTkLabel(stat_frame, text=value, font=STYLES.font(18, "bold"), text_color=color)
             right.pack(side="right", padx=20, pady=15)
         
         # Motivational message
-        msg_frame = ctk.CTkFrame(stats_scroll, fg_color=COLORS['hint_bg'], corner_radius=15, border_width=2, border_color=COLORS['primary_light'])
+        msg_frame = ctk.CTkFrame(stats_scroll, fg_color=COLORS['hint_bg'], border_color=COLORS['primary_light'], **STYLES.shape("note"))
         msg_frame.pack(fill="x", pady=8, padx=0)
         
-        motivation = "🌟 Keep it up! You're doing great! 🌟"
+        motivation = tr("🌟 Keep it up! You're doing great! 🌟")
         if self.controller.problems_solved > 10:
-            motivation = "🔥 Amazing progress! You're unstoppable! 🔥"
+            motivation = tr("🔥 Amazing progress! You're unstoppable! 🔥")
         elif self.controller.problems_solved > 5:
-            motivation = "💪 Great work! Keep practicing! 💪"
+            motivation = tr("💪 Great work! Keep practicing! 💪")
         
         ctk.CTkLabel(
             msg_frame,
             text=motivation,
-            font=("Poppins", 14, "bold"),
+            font=STYLES.font(14, "bold"),
             text_color=COLORS['hint_text'],
             wraplength=380,
             justify="center"
@@ -759,13 +2335,7 @@ class HomeFrame(ctk.CTkFrame):
         button_frame = ctk.CTkFrame(popup, fg_color="transparent")
         button_frame.pack(pady=15, padx=20, expand=False)
         
-        RoundedButton(button_frame, text="Close", command=popup.destroy, width=150).pack(anchor="center")
-    
-    def tkraise(self):
-        super().tkraise()
-        # Update stats
-        self.problems_label.configure(text=str(self.controller.problems_solved))
-        self.xp_label.configure(text=str(self.controller.score))
+        RoundedButton(button_frame, text=tr("Close"), command=popup.destroy, width=150).pack(anchor="center")
 
 # ======================
 # TOPIC SELECTION FRAME
@@ -780,21 +2350,21 @@ class TopicFrame(ctk.CTkFrame):
         main_content.pack(fill="both", expand=True, padx=0, pady=0)
         
         # Header with gradient effect
-        header_frame = ctk.CTkFrame(main_content, fg_color=COLORS['primary'], corner_radius=0)
+        header_frame = ctk.CTkFrame(main_content, fg_color=COLORS['primary'], **STYLES.shape("header"))
         header_frame.pack(fill="x", pady=(0, 40))
         
         title = ctk.CTkLabel(
             header_frame,
-            text="📚 Choose Your Topic",
-            font=("Poppins", 36, "bold"),
+            text=tr("📚 Choose Your Topic"),
+            font=STYLES.font(36, "bold"),
             text_color="#FFFFFF"
         )
         title.pack(pady=(30, 10))
         
         subtitle = ctk.CTkLabel(
             header_frame,
-            text="Select a physics topic to start practicing",
-            font=("Poppins", 13),
+            text=tr("Select a physics topic to start practicing"),
+            font=STYLES.font(13),
             text_color="#E0E0E0"
         )
         subtitle.pack(pady=(0, 25))
@@ -812,46 +2382,57 @@ class TopicFrame(ctk.CTkFrame):
             ("🔌 Electricity", COLORS['electricity']),
             ("➡️ Vectors", COLORS['vectors']),
             ("🎯 Projectile Motion", COLORS['warning']),
-            ("📏 Unit Conversion", COLORS['secondary'])
+            ("📏 Unit Conversion", COLORS['secondary']),
+            ("🔗 Multi-Step", COLORS['multistep'])
         ]
         
-        row, col = 0, 0
+        # Topics that only exist in curriculum template files get a generic card
+        listed = {topic.split(" ", 1)[1] for topic, _ in topics}
+        topics += [(f"📘 {name}", COLORS['primary_light']) for name in PROBLEM_TYPES if name not in listed]
+        
+        cards = []
         for topic, color in topics:
             # Extract topic name (remove emoji)
             topic_name = topic.split(" ", 1)[1] if " " in topic else topic
             
-            card = ModernTopicCard(
+            cards.append(ModernTopicCard(
                 topics_container,
-                topic,
+                tr(topic),
                 color,
                 command=lambda t=topic_name: self.select_topic(t)
-            )
-            card.grid(row=row, column=col, padx=10, pady=10, sticky="ew")
-            
-            col += 1
-            if col > 2:
-                col = 0
-                row += 1
+            ))
         
-        # Configure grid weights for proper spacing
-        topics_container.grid_columnconfigure(0, weight=1, minsize=180)
-        topics_container.grid_columnconfigure(1, weight=1, minsize=180)
-        topics_container.grid_columnconfigure(2, weight=1, minsize=180)
+        # Three columns of at least 180px to start with, then as many as the window fits
+        self.topics_grid = ResponsiveGrid(topics_container, cards, 180, 3, 5)
         
         # Back button at bottom
         footer_frame = ctk.CTkFrame(main_content, fg_color="transparent")
         footer_frame.pack(pady=15, padx=40, expand=False)
         
+        self.nice_switch = ctk.CTkSwitch(
+            footer_frame,
+            # Whole numbers where a type has enough of them, otherwise one decimal place
+            text=tr("🔢 Simpler answers"),
+            font=STYLES.font(14),
+            text_color=COLORS['text_medium'],
+            progress_color=COLORS['primary'],
+            command=self.toggle_nice_answers
+        )
+        self.nice_switch.pack(pady=(0, 15), anchor="center")
+        
         RoundedButton(
             footer_frame,
-            text="← Back to Home",
+            text=tr("← Back to Home"),
             command=lambda: controller.show_frame("HomeFrame"),
             color=COLORS['text_light'],
             width=300
         ).pack(anchor="center")
     
+    def toggle_nice_answers(self):
+        self.controller.nice_answers = "integer" if self.nice_switch.get() else None
+    
     def select_topic(self, topic):
-        self.controller.current_problem = PhysicsProblem(topic)
+        self.controller.current_problem = self.controller.new_problem(topic)
         self.controller.hints_shown = 0
         problem_frame = self.controller.frames["ProblemFrame"]
         problem_frame.load_problem()
@@ -866,13 +2447,13 @@ class ProblemFrame(ctk.CTkFrame):
         self.controller = controller
         
         # Header
-        header = ctk.CTkFrame(self, fg_color=COLORS['primary_light'], corner_radius=0)
+        header = ctk.CTkFrame(self, fg_color=COLORS['primary_light'], **STYLES.shape("header"))
         header.pack(fill="x", padx=0, pady=0)
         
         ctk.CTkLabel(
             header,
-            text="🎯 Problem Solving",
-            font=("Poppins", 28, "bold"),
+            text=tr("🎯 Problem Solving"),
+            font=STYLES.font(28, "bold"),
             text_color="#FFFFFF"
         ).pack(pady=20)
         
@@ -884,13 +2465,13 @@ class ProblemFrame(ctk.CTkFrame):
         content_frame.pack(fill="both", expand=True, padx=30, pady=30)
         
         # Problem card with modern design
-        self.problem_card = ctk.CTkFrame(content_frame, fg_color=COLORS['card_bg'], corner_radius=25, border_width=2, border_color=COLORS['input_border'])
+        self.problem_card = ctk.CTkFrame(content_frame, fg_color=COLORS['card_bg'], border_color=COLORS['input_border'], **STYLES.shape("panel"))
         self.problem_card.pack(pady=20, fill="x")
         
         self.problem_label = ctk.CTkLabel(
             self.problem_card,
             text="",
-            font=("Poppins", 20),
+            font=STYLES.font(20),
             text_color=COLORS['text_dark'],
             wraplength=700,
             justify="center"
@@ -898,13 +2479,13 @@ class ProblemFrame(ctk.CTkFrame):
         self.problem_label.pack(pady=40, padx=40)
         
         # Input section with better styling
-        input_section = ctk.CTkFrame(content_frame, fg_color=COLORS['card_bg'], corner_radius=25, border_width=2, border_color=COLORS['input_border'])
+        input_section = ctk.CTkFrame(content_frame, fg_color=COLORS['card_bg'], border_color=COLORS['input_border'], **STYLES.shape("panel"))
         input_section.pack(pady=20, fill="x")
         
         ctk.CTkLabel(
             input_section,
-            text="Your Answer",
-            font=("Poppins", 16, "bold"),
+            text=tr("Your Answer"),
+            font=STYLES.font(16, "bold"),
             text_color=COLORS['text_dark']
         ).pack(pady=(20, 10), padx=40)
         
@@ -912,12 +2493,11 @@ class ProblemFrame(ctk.CTkFrame):
             input_section,
             width=300,
             height=55,
-            corner_radius=15,
-            font=("Poppins", 18),
+            font=STYLES.font(18),
             fg_color=COLORS['input_bg'],
             border_color=COLORS['primary'],
-            border_width=2,
-            placeholder_text="Enter your answer..."
+            placeholder_text=tr("Enter your answer..."),
+            **STYLES.shape("entry")
         )
         self.answer_entry.pack(pady=(0, 20), padx=40)
         
@@ -927,22 +2507,24 @@ class ProblemFrame(ctk.CTkFrame):
         
         RoundedButton(
             btn_frame,
-            text="✓ Check Answer",
+            text=tr("✓ Check Answer"),
             command=self.check_answer,
             width=220
         ).pack(pady=8, anchor="center")
         
-        RoundedButton(
+        self.hint_button = RoundedButton(
             btn_frame,
-            text="💡 Show Hint",
+            text=tr("💡 Show Hint"),
             command=self.show_hint,
             color=COLORS['warning'],
             width=220
-        ).pack(pady=8, anchor="center")
+        )
+        self.hint_button.pack(pady=8, anchor="center")
+        controller.binder.bind(self.hint_button, ("hints_shown",), self.hint_button_options)
         
         RoundedButton(
             btn_frame,
-            text="→ Skip",
+            text=tr("→ Skip"),
             command=self.next_problem,
             color=COLORS['text_light'],
             width=220
@@ -958,7 +2540,7 @@ class ProblemFrame(ctk.CTkFrame):
         
         RoundedButton(
             footer,
-            text="← Back to Topics",
+            text=tr("← Back to Topics"),
             command=lambda: controller.show_frame("TopicFrame"),
             color=COLORS['text_light'],
             width=300
@@ -974,6 +2556,13 @@ class ProblemFrame(ctk.CTkFrame):
             widget.destroy()
         
         self.controller.hints_shown = 0
+        self.started = time.monotonic()
+    
+    def hint_button_options(self, state):
+        problem = self.controller.current_problem
+        if problem is None or not state.hints_shown:
+            return {"text": tr("💡 Show Hint")}
+        return {"text": f"{tr('💡 Show Hint')} ({state.hints_shown}/{len(problem.hints)})"}
     
     def show_hint(self):
         problem = self.controller.current_problem
@@ -986,28 +2575,31 @@ class ProblemFrame(ctk.CTkFrame):
             self.controller.hints_shown += 1
             self.main_container._parent_canvas.yview_moveto(1)  # Scroll to bottom
         else:
-            self.show_message("✨ You've seen all hints! Try solving now!")
+            self.show_message(tr("✨ You've seen all hints! Try solving now!"))
     
     def check_answer(self):
         user_answer = self.answer_entry.get().strip()
         
         if not user_answer:
-            self.show_message("⚠️ Please enter an answer!")
+            self.show_message(tr("⚠️ Please enter an answer!"))
             return
         
         try:
             user_value = float(user_answer)
-            correct_answer = self.controller.current_problem.answer
-            
-            # Check with tolerance
-            tolerance = abs(correct_answer * 0.02)  # 2% tolerance
+            problem = self.controller.current_problem
+            correct = grade(user_value, problem.answer)
+            self.controller.history.record(
+                problem, user_value, self.controller.hints_shown, time.monotonic() - self.started, correct,
+                mode=self.controller.mode
+            )
             
-            if abs(user_value - correct_answer) <= tolerance:
+            if correct:
                 # Correct!
-                xp_earned = 10 - (self.controller.hints_shown * 2)
-                xp_earned = max(xp_earned, 2)
+                xp_earned = xp_for(self.controller.hints_shown)
                 self.controller.score += xp_earned
                 self.controller.problems_solved += 1
+                if self.controller.classroom:
+                    self.controller.classroom.submit(self.controller.score)
                 
                 result_frame = self.controller.frames["ResultFrame"]
                 result_frame.show_result(True, xp_earned)
@@ -1019,7 +2611,7 @@ class ProblemFrame(ctk.CTkFrame):
                 self.controller.show_frame("ResultFrame")
         
         except ValueError:
-            self.show_message("⚠️ Please enter a valid number!")
+            self.show_message(tr("⚠️ Please enter a valid number!"))
     
     def next_problem(self):
         self.controller.show_frame("TopicFrame")
@@ -1042,24 +2634,24 @@ class ResultFrame(ctk.CTkFrame):
         main_container.pack(fill="both", expand=True, padx=0, pady=0)
         
         # Header
-        header = ctk.CTkFrame(main_container, fg_color=COLORS['success'], corner_radius=0)
+        header = ctk.CTkFrame(main_container, fg_color=COLORS['success'], **STYLES.shape("header"))
         header.pack(fill="x", padx=0, pady=(0, 40))
         
         self.emoji_label = ctk.CTkLabel(
             header,
             text="🎉",
-            font=("Poppins", 60)
+            font=STYLES.font(60)
         )
         self.emoji_label.pack(pady=20)
         
         # Result card
-        self.result_card = ctk.CTkFrame(main_container, fg_color=COLORS['card_bg'], corner_radius=30, border_width=2, border_color=COLORS['success'])
+        self.result_card = ctk.CTkFrame(main_container, fg_color=COLORS['card_bg'], border_color=COLORS['success'], **STYLES.shape("result_card"))
         self.result_card.pack(expand=True, padx=40, pady=20, fill="both")
         
         self.result_text = ctk.CTkLabel(
             self.result_card,
-            text="Great Job!",
-            font=("Poppins", 36, "bold"),
+            text=tr("Great Job!"),
+            font=STYLES.font(36, "bold"),
             text_color=COLORS['success']
         )
         self.result_text.pack(pady=(30, 10))
@@ -1067,7 +2659,7 @@ class ResultFrame(ctk.CTkFrame):
         self.detail_text = ctk.CTkLabel(
             self.result_card,
             text="",
-            font=("Poppins", 16),
+            font=STYLES.font(16),
             text_color=COLORS['text_dark'],
             wraplength=600,
             justify="center"
@@ -1077,7 +2669,7 @@ class ResultFrame(ctk.CTkFrame):
         self.solution_text = ctk.CTkLabel(
             self.result_card,
             text="",
-            font=("Poppins", 13),
+            font=STYLES.font(13),
             text_color=COLORS['text_medium'],
             wraplength=600,
             justify="left"
@@ -1085,13 +2677,13 @@ class ResultFrame(ctk.CTkFrame):
         self.solution_text.pack(pady=10, padx=40)
         
         # XP badge
-        self.xp_badge = ctk.CTkFrame(self.result_card, fg_color=COLORS['primary_light'], corner_radius=15)
+        self.xp_badge = ctk.CTkFrame(self.result_card, fg_color=COLORS['primary_light'], **STYLES.shape("tile"))
         self.xp_badge.pack(pady=20)
         
         self.xp_text = ctk.CTkLabel(
             self.xp_badge,
-            text="+10 XP",
-            font=("Poppins", 20, "bold"),
+            text=tr("+10 XP"),
+            font=STYLES.font(20, "bold"),
             text_color="#FFFFFF"
         )
         self.xp_text.pack(padx=30, pady=15)
@@ -1102,14 +2694,14 @@ class ResultFrame(ctk.CTkFrame):
         
         RoundedButton(
             btn_frame,
-            text="🔄 Try Again",
+            text=tr("🔄 Try Again"),
             command=self.try_again,
             width=220
         ).pack(pady=8, anchor="center")
         
         RoundedButton(
             btn_frame,
-            text="→ Next Problem",
+            text=tr("→ Next Problem"),
             command=self.next_problem,
             color=COLORS['success'],
             width=220
@@ -1117,7 +2709,7 @@ class ResultFrame(ctk.CTkFrame):
         
         RoundedButton(
             btn_frame,
-            text="🏠 Home",
+            text=tr("🏠 Home"),
             command=lambda: controller.show_frame("HomeFrame"),
             color=COLORS['text_light'],
             width=220
@@ -1128,22 +2720,23 @@ class ResultFrame(ctk.CTkFrame):
         
         if correct:
             self.emoji_label.configure(text="🎉")
-            self.result_text.configure(text="Excellent!", text_color=COLORS['success'])
+            self.result_text.configure(text=tr("Excellent!"), text_color=COLORS['success'])
             self.detail_text.configure(
-                text=f"You got it right!\n\nCorrect answer: {problem.answer} {problem.unit}"
+                text=tr("You got it right!\n\nCorrect answer: {answer} {unit}").format(answer=problem.answer, unit=problem.unit)
             )
-            self.xp_text.configure(text=f"+{xp_earned} XP 🌟")
+            self.xp_text.configure(text=tr("+{xp} XP 🌟").format(xp=xp_earned))
             self.xp_badge.configure(fg_color=COLORS['success'])
             self.solution_text.configure(text="")
         else:
             self.emoji_label.configure(text="🤔")
-            self.result_text.configure(text="Not Quite Right", text_color=COLORS['warning'])
+            self.result_text.configure(text=tr("Not Quite Right"), text_color=COLORS['warning'])
             self.detail_text.configure(
-                text=f"The correct answer is: {problem.answer} {problem.unit}\n\nDon't worry! Keep practicing and you'll master this! 💪"
+                text=tr("The correct answer is: {answer} {unit}\n\nDon't worry! Keep practicing and you'll master this! 💪").format(
+                    answer=problem.answer, unit=problem.unit)
             )
-            self.xp_text.configure(text="0 XP - Try Again")
+            self.xp_text.configure(text=tr("0 XP - Try Again"))
             self.xp_badge.configure(fg_color=COLORS['warning'])
-            self.solution_text.configure(text=f"📚 Solution:\n{problem.solution}")
+            self.solution_text.configure(text=f"{tr('📚 Solution:')}\n{problem.solution}")
     
     def try_again(self):
         problem_frame = self.controller.frames["ProblemFrame"]
@@ -1153,10 +2746,892 @@ class ResultFrame(ctk.CTkFrame):
     def next_problem(self):
         self.controller.show_frame("TopicFrame")
 
+# ======================
+# EXAM FRAME
+# ======================
+EXAM_QUESTIONS = 10
+EXAM_SECONDS = 15 * 60
+EXAM_XP_PER_QUESTION = 10
+
+class ExamFrame(ctk.CTkFrame):
+    def __init__(self, parent, controller):
+        super().__init__(parent, fg_color=COLORS['bg'])
+        self.controller = controller
+        self.paper = []
+        self.answers = []
+        self.index = 0
+        self.deadline = 0
+        self.timer_job = None
+        self.session = 0  # bumped per exam, so a stale background paper is ignored
+        
+        # Header with countdown
+        header = ctk.CTkFrame(self, fg_color=COLORS['secondary'], **STYLES.shape("header"))
+        header.pack(fill="x", padx=0, pady=0)
+        
+        ctk.CTkLabel(
+            header,
+            text=tr("📝 Exam Mode"),
+            font=STYLES.font(28, "bold"),
+            text_color="#FFFFFF"
+        ).pack(side="left", padx=30, pady=20)
+        
+        self.timer_label = ctk.CTkLabel(
+            header,
+            text="",
+            font=STYLES.font(24, "bold"),
+            text_color="#FFFFFF"
+        )
+        self.timer_label.pack(side="right", padx=30, pady=20)
+        
+        self.body = ctk.CTkScrollableFrame(self, fg_color=COLORS['bg'])
+        self.body.pack(fill="both", expand=True, padx=0, pady=0)
+        
+        self.loading_label = ctk.CTkLabel(
+            self.body,
+            text=tr("⏳ Preparing your exam paper..."),
+            font=STYLES.font(18),
+            text_color=COLORS['text_medium']
+        )
+        
+        # Question view
+        self.exam_view = ctk.CTkFrame(self.body, fg_color="transparent")
+        
+        self.progress = ProgressBar(self.exam_view, total=EXAM_QUESTIONS)
+        self.progress.pack(fill="x", padx=30, pady=(20, 0))
+        
+        self.number_label = ctk.CTkLabel(
+            self.exam_view,
+            text="",
+            font=STYLES.font(14, "bold"),
+            text_color=COLORS['text_light']
+        )
+        self.number_label.pack(pady=(10, 0))
+        
+        question_card = ctk.CTkFrame(self.exam_view, fg_color=COLORS['card_bg'], border_color=COLORS['input_border'], **STYLES.shape("panel"))
+        question_card.pack(padx=30, pady=20, fill="x")
+        
+        self.question_label = ctk.CTkLabel(
+            question_card,
+            text="",
+            font=STYLES.font(20),
+            text_color=COLORS['text_dark'],
+            wraplength=700,
+            justify="center"
+        )
+        self.question_label.pack(pady=40, padx=40)
+        
+        self.answer_entry = ctk.CTkEntry(
+            self.exam_view,
+            width=300,
+            height=55,
+            font=STYLES.font(18),
+            fg_color=COLORS['input_bg'],
+            border_color=COLORS['secondary'],
+            placeholder_text=tr("Enter your answer..."),
+            **STYLES.shape("entry")
+        )
+        self.answer_entry.pack(pady=(0, 20))
+        self.answer_entry.bind("<KeyRelease>", lambda e: self.save_answer())
+        self.answer_entry.bind("<Return>", lambda e: self.go_to(self.index + 1))
+        
+        nav = ctk.CTkFrame(self.exam_view, fg_color="transparent")
+        nav.pack(pady=10)
+        
+        RoundedButton(
+            nav,
+            text=tr("← Previous"),
+            command=lambda: self.go_to(self.index - 1),
+            color=COLORS['text_light'],
+            width=180
+        ).pack(side="left", padx=8)
+        
+        RoundedButton(
+            nav,
+            text=tr("Next →"),
+            command=lambda: self.go_to(self.index + 1),
+            width=180
+        ).pack(side="left", padx=8)
+        
+        RoundedButton(
+            self.exam_view,
+            text=tr("✓ Submit Exam"),
+            command=self.submit,
+            color=COLORS['success'],
+            width=300
+        ).pack(pady=(20, 8), anchor="center")
+        
+        RoundedButton(
+            self.exam_view,
+            text=tr("✕ Quit Exam"),
+            command=self.quit_exam,
+            color=COLORS['error'],
+            width=300
+        ).pack(pady=8, anchor="center")
+        
+        # Results view
+        self.result_view = ctk.CTkFrame(self.body, fg_color="transparent")
+        
+        self.summary_label = ctk.CTkLabel(
+            self.result_view,
+            text="",
+            font=STYLES.font(32, "bold"),
+            text_color=COLORS['success']
+        )
+        self.summary_label.pack(pady=(30, 10))
+        
+        self.review_label = ctk.CTkLabel(
+            self.result_view,
+            text="",
+            font=STYLES.font(14),
+            text_color=COLORS['text_dark'],
+            wraplength=700,
+            justify="left"
+        )
+        self.review_label.pack(padx=40, pady=20)
+        
+        RoundedButton(
+            self.result_view,
+            text=tr("🏠 Home"),
+            command=lambda: controller.show_frame("HomeFrame"),
+            color=COLORS['text_light'],
+            width=300
+        ).pack(pady=20, anchor="center")
+    
+    def show_view(self, view):
+        for widget in (self.loading_label, self.exam_view, self.result_view):
+            widget.pack_forget()
+        view.pack(fill="both", expand=True, pady=20)
+    
+    def start_exam(self):
+        self.session += 1
+        self.controller.mode = "Exam"
+        self.timer_label.configure(text="")
+        self.show_view(self.loading_label)
+        self.controller.show_frame("ExamFrame")
+        
+        # Generate the whole paper off the UI thread before the clock starts. The
+        # worker gets its own rng and the problem types already translated, and
+        # hands back plain rows; the problems are built here.
+        rng = random.Random(random.getrandbits(64))
+        threading.Thread(target=self.prepare_paper, args=(self.session, localized_problem_types(), rng),
+                         daemon=True).start()
+    
+    def prepare_paper(self, session, kinds, rng):
+        # Worker thread
+        rows = draw_exam_paper(kinds, EXAM_QUESTIONS, rng)
+        try:
+            self.after(0, self.paper_ready, session, rows)
+        except RuntimeError:
+            pass  # the window was closed meanwhile
+    
+    def paper_ready(self, session, rows):
+        if session != self.session:
+            return
+        
+        self.paper = [PhysicsProblem.prepared(*row) for row in rows]
+        self.answers = [""] * len(self.paper)
+        self.index = 0
+        self.progress.set(0, len(self.paper))
+        self.show_view(self.exam_view)
+        self.show_question()
+        
+        self.deadline = time.monotonic() + EXAM_SECONDS
+        self.tick()
+    
+    def tick(self):
+        # The countdown is read off the monotonic clock on every tick, so late
+        # callbacks never add up to drift
+        remaining = self.deadline - time.monotonic()
+        if remaining <= 0:
+            self.timer_job = None
+            self.timer_label.configure(text="⏱ 00:00")
+            self.submit()
+            return
+        
+        seconds = math.ceil(remaining)
+        self.timer_label.configure(text=f"⏱ {seconds // 60:02d}:{seconds % 60:02d}")
+        
+        # Wake just after the display next needs to change
+        delay = remaining - (seconds - 1)
+        self.timer_job = self.after(int(delay * 1000) + 1, self.tick)
+    
+    def show_question(self):
+        problem = self.paper[self.index]
+        self.number_label.configure(text=tr("Question {number} of {count} · {topic}").format(
+            number=self.index + 1, count=len(self.paper), topic=tr(problem.topic)))
+        self.question_label.configure(text=problem.problem_text)
+        self.answer_entry.delete(0, 'end')
+        if self.answers[self.index]:
+            self.answer_entry.insert(0, self.answers[self.index])
+        self.answer_entry.focus_set()
+    
+    def save_answer(self):
+        if not self.paper:
+            return
+        self.answers[self.index] = self.answer_entry.get().strip()
+        self.progress.set(sum(1 for answer in self.answers if answer))
+    
+    def go_to(self, index):
+        if not self.paper:
+            return
+        self.save_answer()
+        self.index = max(0, min(index, len(self.paper) - 1))
+        self.show_question()
+    
+    def stop_timer(self):
+        if self.timer_job is not None:
+            self.after_cancel(self.timer_job)
+            self.timer_job = None
+    
+    def submit(self):
+        if not self.paper:
+            return
+        self.save_answer()
+        self.stop_timer()
+        
+        results = grade_paper(self.paper, self.answers)
+        correct = sum(results)
+        for problem, answer, ok in zip(self.paper, self.answers, results):
+            try:
+                submitted = float(answer)
+            except ValueError:
+                submitted = None
+            self.controller.history.record(problem, submitted, 0, None, ok, mode="Exam")
+        xp_earned = correct * EXAM_XP_PER_QUESTION
+        self.controller.score += xp_earned
+        self.controller.problems_solved += correct
+        self.controller.mode = "Study"
+        if self.controller.classroom:
+            self.controller.classroom.submit(self.controller.score)
+        
+        lines = []
+        for i, (problem, answer, ok) in enumerate(zip(self.paper, self.answers, results), 1):
+            mark = "✅" if ok else "❌"
+            given = answer or "—"
+            lines.append(tr("{mark} Q{number} ({topic}): you answered {given}, correct answer {answer} {unit}").format(
+                mark=mark, number=i, topic=tr(problem.topic), given=given, answer=problem.answer, unit=problem.unit))
+        
+        self.summary_label.configure(
+            text=tr("{correct} / {count} correct · +{xp} XP").format(correct=correct, count=len(self.paper), xp=xp_earned),
+            text_color=COLORS['success'] if correct * 2 >= len(self.paper) else COLORS['warning']
+        )
+        self.review_label.configure(text="\n\n".join(lines))
+        self.paper = []
+        self.show_view(self.result_view)
+    
+    def quit_exam(self):
+        self.stop_timer()
+        self.session += 1
+        self.paper = []
+        self.controller.mode = "Study"
+        self.controller.show_frame("HomeFrame")
+
+# ======================
+# DRILL FRAME
+# ======================
+DRILL_MIXED = "🎲 Mixed"
+
+def speed_trends(history, min_solved=3):
+    # Per topic: drill problems solved, mean solve time and the least-squares slope
+    # of solve time over successive correct answers (negative = getting faster).
+    # Practice and exam attempts are timed differently and left out.
+    times = {}
+    for attempt in history:
+        if attempt.mode == "Drill" and attempt.correct and not math.isnan(attempt.elapsed):
+            times.setdefault(attempt.topic, []).append(attempt.elapsed)
+    trends = {}
+    for topic, ys in times.items():
+        n = len(ys)
+        mean_y = sum(ys) / n
+        slope = None
+        if n >= min_solved:
+            mean_x = (n - 1) / 2
+            sxx = sum((x - mean_x) ** 2 for x in range(n))
+            slope = sum((x - mean_x) * (y - mean_y) for x, y in enumerate(ys)) / sxx
+        trends[topic] = (n, mean_y, slope)
+    return trends
+
+class DrillFrame(ctk.CTkFrame):
+    # Rapid-fire practice on one screen: Enter submits, a correct answer moves
+    # straight on to a problem generated in advance, Esc skips. Feedback goes in a
+    # label that already exists, so answering never creates widgets or switches frames.
+    def __init__(self, parent, controller):
+        super().__init__(parent, fg_color=COLORS['bg'])
+        self.controller = controller
+        self.topic = None  # None = mixed
+        self.problem = None
+        self.upcoming = None
+        self.started = 0
+        self.answered = 0
+        self.solved = 0
+        
+        header = ctk.CTkFrame(self, fg_color=COLORS['warning'], **STYLES.shape("header"))
+        header.pack(fill="x", padx=0, pady=0)
+        
+        ctk.CTkLabel(
+            header,
+            text=tr("⚡ Speed Drill"),
+            font=STYLES.font(28, "bold"),
+            text_color="#FFFFFF"
+        ).pack(side="left", padx=30, pady=20)
+        
+        # Menu label -> topic (None for mixed)
+        self.menu_topics = {tr(DRILL_MIXED): None, **{tr(topic): topic for topic in PROBLEM_TYPES}}
+        self.topic_menu = ctk.CTkOptionMenu(
+            header,
+            values=list(self.menu_topics),
+            command=self.change_topic,
+            font=STYLES.font(14),
+            fg_color=COLORS['card_bg'],
+            text_color=COLORS['text_dark'],
+            button_color=COLORS['primary'],
+            width=200
+        )
+        self.topic_menu.pack(side="right", padx=30, pady=20)
+        
+        self.body = ctk.CTkScrollableFrame(self, fg_color=COLORS['bg'])
+        self.body.pack(fill="both", expand=True, padx=0, pady=0)
+        
+        self.stats_label = ctk.CTkLabel(
+            self.body,
+            text="",
+            font=STYLES.font(14, "bold"),
+            text_color=COLORS['text_light']
+        )
+        self.stats_label.pack(pady=(20, 0))
+        
+        problem_card = ctk.CTkFrame(self.body, fg_color=COLORS['card_bg'], border_color=COLORS['input_border'], **STYLES.shape("panel"))
+        problem_card.pack(padx=30, pady=20, fill="x")
+        
+        self.problem_label = ctk.CTkLabel(
+            problem_card,
+            text="",
+            font=STYLES.font(20),
+            text_color=COLORS['text_dark'],
+            wraplength=700,
+            justify="center"
+        )
+        self.problem_label.pack(pady=40, padx=40)
+        
+        self.answer_entry = ctk.CTkEntry(
+            self.body,
+            width=300,
+            height=55,
+            font=STYLES.font(18),
+            fg_color=COLORS['input_bg'],
+            border_color=COLORS['warning'],
+            placeholder_text=tr("Answer, then Enter (Esc skips)"),
+            **STYLES.shape("entry")
+        )
+        self.answer_entry.pack(pady=(0, 10))
+        self.answer_entry.bind("<Return>", self.submit)
+        self.answer_entry.bind("<Escape>", self.skip)
+        
+        self.feedback_label = ctk.CTkLabel(
+            self.body,
+            text="",
+            font=STYLES.font(16, "bold"),
+            text_color=COLORS['text_medium']
+        )
+        self.feedback_label.pack(pady=(0, 20))
+        
+        self.trend_label = ctk.CTkLabel(
+            self.body,
+            text="",
+            font=STYLES.font(14),
+            text_color=COLORS['text_dark'],
+            justify="left"
+        )
+        
+        self.footer = ctk.CTkFrame(self.body, fg_color="transparent")
+        self.footer.pack(pady=10)
+        
+        RoundedButton(
+            self.footer,
+            text=tr("📈 Speed Trend"),
+            command=self.show_trend,
+            color=COLORS['success'],
+            width=300
+        ).pack(pady=8, anchor="center")
+        
+        RoundedButton(
+            self.footer,
+            text=tr("← Back to Home"),
+            command=self.finish,
+            color=COLORS['text_light'],
+            width=300
+        ).pack(pady=8, anchor="center")
+    
+    def start_drill(self, topic=None):
+        self.topic = topic
+        self.topic_menu.set(tr(topic or DRILL_MIXED))
+        self.answered = 0
+        self.solved = 0
+        self.controller.mode = "Drill"
+        self.controller.hints_shown = 0
+        self.trend_label.pack_forget()
+        self.feedback_label.configure(text="")
+        self.upcoming = self.make_problem()
+        self.advance()
+        self.controller.show_frame("DrillFrame")
+        self.answer_entry.focus_set()
+    
+    def change_topic(self, choice):
+        self.start_drill(self.menu_topics[choice])
+    
+    def make_problem(self):
+        topic = self.topic or random.choice(list(PROBLEM_TYPES))
+        return PhysicsProblem(topic, nice=self.controller.nice_answers)
+    
+    def prepare_next(self):
+        self.upcoming = self.make_problem()
+    
+    def advance(self):
+        self.problem = self.upcoming
+        self.upcoming = None
+        self.problem_label.configure(text=self.problem.problem_text)
+        self.answer_entry.delete(0, 'end')
+        self.update_stats()
+        self.started = time.monotonic()
+        # The next problem is generated once this one is on screen
+        self.after_idle(self.prepare_next)
+    
+    def next_problem(self):
+        if self.upcoming is None:
+            self.prepare_next()
+        self.advance()
+    
+    def submit(self, event=None):
+        text = self.answer_entry.get().strip()
+        if not text:
+            return "break"
+        try:
+            value = float(text)
+        except ValueError:
+            self.feedback_label.configure(text=tr("⚠️ Please enter a valid number!"), text_color=COLORS['warning'])
+            return "break"
+        elapsed = time.monotonic() - self.started
+        correct = grade(value, self.problem.answer)
+        self.controller.history.record(self.problem, value, 0, elapsed, correct, mode="Drill")
+        self.answered += 1
+        if correct:
+            self.solved += 1
+            self.controller.score += xp_for(0)
+            self.controller.problems_solved += 1
+            if self.controller.classroom:
+                self.controller.classroom.submit(self.controller.score)
+            self.feedback_label.configure(text=tr("✅ Correct! {seconds:.1f}s").format(seconds=elapsed),
+                                          text_color=COLORS['success'])
+            self.next_problem()
+        else:
+            self.feedback_label.configure(text=tr("❌ Not quite - try again, or Esc to skip"), text_color=COLORS['error'])
+            self.answer_entry.select_range(0, 'end')
+            self.update_stats()
+        return "break"
+    
+    def skip(self, event=None):
+        problem = self.problem
+        self.controller.history.record(problem, None, 0, time.monotonic() - self.started, False, mode="Drill")
+        self.feedback_label.configure(
+            text=tr("⏭ The answer was {answer:g} {unit}").format(answer=problem.answer, unit=problem.unit),
+            text_color=COLORS['text_medium']
+        )
+        self.next_problem()
+        return "break"
+    
+    def update_stats(self):
+        self.stats_label.configure(text=tr("Solved {solved} · Answered {answered}").format(
+            solved=self.solved, answered=self.answered))
+    
+    def show_trend(self):
+        lines = []
+        for topic, (n, mean, slope) in sorted(speed_trends(self.controller.history).items()):
+            line = tr("{topic}: {count} solved, {seconds:.1f}s average").format(topic=tr(topic), count=n, seconds=mean)
+            if slope is not None:
+                change = tr("{seconds:.2f}s faster per problem") if slope < 0 else tr("{seconds:.2f}s slower per problem")
+                line += ", " + change.format(seconds=abs(slope))
+            lines.append(line)
+        self.trend_label.configure(text="\n".join(lines) or tr("Solve a few problems to see your speed trend."))
+        self.trend_label.pack(pady=(0, 20), padx=40, before=self.footer)
+    
+    def finish(self):
+        self.controller.mode = "Study"
+        self.controller.show_frame("HomeFrame")
+
+# ======================
+# HISTORY FRAME
+# ======================
+class HistoryFrame(ctk.CTkFrame):
+    # Lists every attempt, newest first. Only the visible rows exist as widgets:
+    # a fixed pool of row buttons is relabelled as the list scrolls, so the widget
+    # count depends on the window height, not on the number of attempts.
+    ROW_HEIGHT = 44
+    
+    def __init__(self, parent, controller):
+        super().__init__(parent, fg_color=COLORS['bg'])
+        self.controller = controller
+        self.rows = []
+        self.placed = 0      # rows[:placed] are on screen, the rest are hidden
+        self.visible = 0
+        self.first = 0       # index of the top row, 0 = newest attempt
+        self.shown_history = None
+        self.shown_total = -1
+        self.refresh_pending = False
+        
+        header = ctk.CTkFrame(self, fg_color=COLORS['momentum'], **STYLES.shape("header"))
+        header.pack(fill="x", padx=0, pady=0)
+        
+        ctk.CTkLabel(
+            header,
+            text=tr("📜 Your History"),
+            font=STYLES.font(28, "bold"),
+            text_color="#FFFFFF"
+        ).pack(side="left", padx=30, pady=20)
+        
+        self.count_label = ctk.CTkLabel(
+            header,
+            text="",
+            font=STYLES.font(14),
+            text_color="#FFFFFF"
+        )
+        self.count_label.pack(side="right", padx=30, pady=20)
+        
+        # Review panel for the selected attempt
+        footer = ctk.CTkFrame(self, fg_color="transparent")
+        footer.pack(side="bottom", fill="x", padx=30, pady=(0, 15))
+        
+        self.review_card = ctk.CTkFrame(footer, fg_color=COLORS['card_bg'], border_color=COLORS['input_border'], **STYLES.shape("card"))
+        self.review_card.pack(fill="x", pady=(10, 10))
+        
+        self.review_label = ctk.CTkLabel(
+            self.review_card,
+            text=tr("Select an attempt to review it."),
+            font=STYLES.font(13),
+            text_color=COLORS['text_medium'],
+            wraplength=800,
+            justify="left"
+        )
+        self.review_label.pack(padx=20, pady=15, anchor="w")
+        
+        RoundedButton(
+            footer,
+            text=tr("💾 Export"),
+            command=self.export,
+            color=COLORS['success'],
+            width=300
+        ).pack(pady=(0, 8), anchor="center")
+        
+        RoundedButton(
+            footer,
+            text=tr("← Back to Home"),
+            command=lambda: controller.show_frame("HomeFrame"),
+            color=COLORS['text_light'],
+            width=300
+        ).pack(anchor="center")
+        
+        # Virtual list
+        list_frame = ctk.CTkFrame(self, fg_color="transparent")
+        list_frame.pack(fill="both", expand=True, padx=30, pady=(15, 0))
+        
+        self.scrollbar = ctk.CTkScrollbar(list_frame, command=self.on_scrollbar)
+        self.scrollbar.pack(side="right", fill="y")
+        
+        self.viewport = ctk.CTkFrame(list_frame, fg_color=COLORS['card_bg'], **STYLES.shape("tile"))
+        self.viewport.pack(side="left", fill="both", expand=True)
+        self.viewport.bind("<Configure>", self.on_resize)
+        self.bind_wheel(self.viewport)
+    
+    def bind_wheel(self, widget):
+        widget.bind("<MouseWheel>", lambda e: self.scroll_by(-1 if e.delta > 0 else 1))
+        widget.bind("<Button-4>", lambda e: self.scroll_by(-1))
+        widget.bind("<Button-5>", lambda e: self.scroll_by(1))
+    
+    def on_resize(self, event):
+        self.visible = max(1, event.height // self.ROW_HEIGHT)
+        # The pool only grows to fit the tallest the window has been
+        while len(self.rows) < self.visible:
+            k = len(self.rows)
+            row = ctk.CTkButton(
+                self.viewport,
+                text="",
+                height=self.ROW_HEIGHT - 6,
+                anchor="w",
+                font=STYLES.font(13),
+                fg_color="transparent",
+                hover_color=COLORS['bg_secondary'],
+                text_color=COLORS['text_dark'],
+                command=lambda k=k: self.select(self.first + k),
+                **STYLES.shape("row")
+            )
+            self.bind_wheel(row)
+            self.rows.append(row)
+        self.shown_total = -1
+        self.schedule_refresh()
+    
+    def tkraise(self):
+        super().tkraise()
+        # Only redraw if attempts were added (or the student changed) since the rows were last filled
+        history = self.controller.history
+        if self.shown_history is not history or self.shown_total != history.total:
+            self.first = 0
+            self.schedule_refresh()
+    
+    def on_scrollbar(self, action, amount, unit=None):
+        if action == "moveto":
+            self.scroll_to(int(float(amount) * len(self.controller.history)))
+        elif unit == "pages":
+            self.scroll_by(int(amount) * self.visible)
+        else:
+            self.scroll_by(int(amount))
+    
+    def scroll_by(self, rows):
+        self.scroll_to(self.first + rows)
+    
+    def scroll_to(self, first):
+        total = len(self.controller.history)
+        first = max(0, min(first, total - self.visible))
+        if first != self.first:
+            self.first = first
+            self.schedule_refresh()
+    
+    def schedule_refresh(self):
+        # A burst of wheel or scrollbar events costs one refresh
+        if not self.refresh_pending:
+            self.refresh_pending = True
+            self.after_idle(self.refresh)
+    
+    def refresh(self):
+        self.refresh_pending = False
+        history = self.controller.history
+        total = len(history)
+        self.first = max(0, min(self.first, total - self.visible))
+        
+        # Rows past the end of the list or below the viewport are hidden, so a
+        # stale row can't be seen or clicked
+        shown = max(0, min(self.visible, total - self.first))
+        for k, row in enumerate(self.rows):
+            if k < shown:
+                text, color = self.describe(history, self.first + k)
+                if row.cget("text") != text:
+                    row.configure(text=text, text_color=color)
+                if k >= self.placed:
+                    row.place(x=8, y=k * self.ROW_HEIGHT + 3, relwidth=0.98)
+            elif k < self.placed:
+                row.place_forget()
+        self.placed = shown
+        
+        if total:
+            self.scrollbar.set(self.first / total, min(1.0, (self.first + self.visible) / total))
+        else:
+            self.scrollbar.set(0, 1)
+        self.count_label.configure(text=tr("{count} attempts").format(count=history.total))
+        self.shown_history = history
+        self.shown_total = history.total
+    
+    def describe(self, history, index):
+        attempt = history[-(index + 1)]
+        unit = find_problem_type(attempt.topic, attempt.problem_type).unit
+        mark = "✅" if attempt.correct else "❌"
+        given = "—" if math.isnan(attempt.submitted) else f"{attempt.submitted:g}"
+        when = time.strftime("%H:%M", time.localtime(attempt.timestamp))
+        text = tr("{mark}  #{number}  {topic}   you: {given}   answer: {answer:g} {unit}   💡{hints}   {when}").format(
+            mark=mark, number=history.total - index, topic=tr(attempt.topic), given=given,
+            answer=attempt.answer, unit=unit, hints=attempt.hints, when=when)
+        if not math.isnan(attempt.elapsed):
+            text += f"   ⏱ {attempt.elapsed:.1f}s"
+        return text, COLORS['text_dark'] if attempt.correct else COLORS['error']
+    
+    def export(self):
+        from tkinter import filedialog
+        path = filedialog.asksaveasfilename(
+            parent=self,
+            title=tr("Export attempts"),
+            defaultextension=".npz",
+            initialfile="smartlearn_attempts.npz",
+            filetypes=[("NumPy archive", "*.npz")]
+        )
+        if not path:
+            return
+        try:
+            self.controller.history.export(path)
+        except OSError as e:
+            message, color = f"⚠️ Export failed: {e}", COLORS['error']
+        else:
+            message, color = f"💾 Saved {len(self.controller.history)} attempts to {path}", COLORS['success']
+        self.review_label.configure(text=message, text_color=color)
+    
+    def select(self, index):
+        history = self.controller.history
+        if index >= len(history):
+            return
+        attempt = history[-(index + 1)]
+        problem = attempt.problem()
+        self.review_label.configure(
+            text=f"{problem.problem_text}\n\n{tr('📚 Solution:')}\n{problem.solution}",
+            text_color=COLORS['text_dark']
+        )
+
+# ======================
+# PROFILING
+# ======================
+class LatencyHistogram:
+    # Log-spaced buckets: constant memory however many samples, ~3% resolution
+    RESOLUTION = math.log(1.03)
+    
+    def __init__(self):
+        self.buckets = {}
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = 0
+    
+    def record(self, ns: int):
+        bucket = int(math.log(ns) / self.RESOLUTION) if ns > 1 else 0
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+        self.count += 1
+        self.total += ns
+        if self.min is None or ns < self.min:
+            self.min = ns
+        if ns > self.max:
+            self.max = ns
+    
+    def percentile(self, p: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = p / 100 * self.count
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                estimate = math.exp((bucket + 0.5) * self.RESOLUTION)
+                return min(max(estimate, self.min), self.max)
+        return float(self.max)
+    
+    def summary(self) -> Dict:
+        ms = 1e-6
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total / max(1, self.count) * ms, 4),
+            "min_ms": round((self.min or 0) * ms, 4),
+            "p50_ms": round(self.percentile(50) * ms, 4),
+            "p95_ms": round(self.percentile(95) * ms, 4),
+            "p99_ms": round(self.percentile(99) * ms, 4),
+            "max_ms": round(self.max * ms, 4),
+        }
+
+class Profiler:
+    def __init__(self):
+        self.histograms = {}
+        self.installed = []
+    
+    def histogram(self, name: str) -> LatencyHistogram:
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = LatencyHistogram()
+        return histogram
+    
+    def record(self, name: str, ns: int):
+        self.histogram(name).record(ns)
+    
+    def wrap(self, name, func, ui=False):
+        histogram = self.histogram(name)
+        settled = self.histogram(f"{name} (until idle)") if ui else None
+        clock = time.perf_counter_ns
+        
+        @functools.wraps(func)
+        def timed(widget, *args, **kwargs):
+            start = clock()
+            try:
+                return func(widget, *args, **kwargs)
+            finally:
+                histogram.record(clock() - start)
+                if settled is not None:
+                    # Also time until Tk has processed the redraws the call queued
+                    widget.after_idle(lambda: settled.record(clock() - start))
+        return timed
+    
+    def install(self, hot_paths=None):
+        # Timing wrappers only exist while profiling, so a normal run pays nothing.
+        # Install before the app is built: buttons capture bound methods on creation.
+        for cls, name, ui in hot_paths or HOT_PATHS:
+            original = cls.__dict__[name]
+            setattr(cls, name, self.wrap(f"{cls.__name__}.{name}", original, ui))
+            self.installed.append((cls, name, original))
+    
+    def uninstall(self):
+        for cls, name, original in reversed(self.installed):
+            setattr(cls, name, original)
+        self.installed.clear()
+    
+    def report(self) -> Dict:
+        return {name: h.summary() for name, h in sorted(self.histograms.items()) if h.count}
+    
+    def write(self, path: str):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({
+                "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "python": sys.version.split()[0],
+                "platform": sys.platform,
+                "operations": self.report(),
+            }, f, indent=2)
+
+# (class, method, also time until the UI is idle again)
+HOT_PATHS = [
+    (PhysicsProblem, "generate", False),
+    (ProblemFrame, "load_problem", True),
+    (ProblemFrame, "show_hint", True),
+    (ProblemFrame, "check_answer", True),
+    (SmartLearnPhysics, "show_frame", True),
+]
+
+PROFILER = None  # the active Profiler when launched with --profile
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="SmartLearn Physics")
+    parser.add_argument("--profile", nargs="?", const="smartlearn_profile.json", metavar="FILE",
+                        help="record per-operation latency histograms and write them to FILE on exit")
+    parser.add_argument("--classroom", metavar="URL",
+                        help="report XP to a classroom leaderboard server, e.g. http://127.0.0.1:8765")
+    parser.add_argument("--student", default=getpass.getuser(), help="name shown on the leaderboard")
+    parser.add_argument("--history-limit", type=int, metavar="N",
+                        help="keep only the newest N attempts, for kiosks that run all day")
+    parser.add_argument("--kiosk", action="store_true",
+                        help=f"let students switch profiles in place on a shared PC (saved in {PROFILE_DIR})")
+    parser.add_argument("--kiosk-memory", type=int, default=PROFILE_MEMORY_LIMIT // 2**20, metavar="MB",
+                        help="memory for student profiles kept loaded in kiosk mode (default %(default)s MB)")
+    parser.add_argument("--no-resume", action="store_true",
+                        help=f"start a fresh session instead of resuming the one saved in {SNAPSHOT_PATH}")
+    parser.add_argument("--lang", metavar="CODE", help="interface and problem language, e.g. es (default: English)")
+    parser.add_argument("--compile-catalogs", action="store_true",
+                        help=f"compile every translation catalog under {LOCALE_DIR} and exit")
+    return parser.parse_args(argv)
+
 # ======================
 # RUN APPLICATION
 # ======================
 if __name__ == "__main__":
-    app = SmartLearnPhysics()
-    app.mainloop()
-  
+    args = parse_args()
+    if args.compile_catalogs:
+        print(f"Compiled {compile_catalogs()} catalogs")
+        sys.exit(0)
+    set_language(args.lang)
+    if args.profile:
+        PROFILER = Profiler()
+        PROFILER.install()
+    
+    app = SmartLearnPhysics(history_limit=args.history_limit, snapshot_path=SNAPSHOT_PATH, resume=not args.no_resume,
+                            profile_dir=PROFILE_DIR if args.kiosk else None, student=args.student,
+                            profile_memory=args.kiosk_memory * 2**20)
+    if args.classroom:
+        from classroom_server import ClassroomClient
+        app.classroom = ClassroomClient(args.classroom, app.student)  # the resumed kiosk student, if any
+    try:
+        app.mainloop()
+    finally:
+        try:
+            app.save_snapshot()
+        except tkinter.TclError:
+            pass  # the window is gone; the last periodic snapshot stands
+        if PROFILER:
+            PROFILER.write(args.profile)
+            print(f"Profile written to {args.profile}")
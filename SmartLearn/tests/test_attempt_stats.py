@@ -0,0 +1,130 @@
+import json
+import math
+
+import pytest
+
+np = pytest.importorskip("numpy")
+import attempt_stats
+from attempt_stats import Moments, TDigest, TopicStats
+
+# Largest allowed rank error of a TDigest(200) quantile on continuous data: the
+# returned value must lie between the exact (q - RANK_ERROR) and (q + RANK_ERROR)
+# quantiles. Observed errors are below 0.0015.
+RANK_ERROR = 0.005
+QS = (0.001, 0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99, 0.999)
+
+def samples(seed, n=5000):
+    rng = np.random.default_rng(seed)
+    return {
+        "lognormal": rng.lognormal(2, 0.8, n),
+        "uniform": rng.uniform(0, 100, n),
+        "exponential": rng.exponential(10, n),
+        "bimodal": np.concatenate((rng.normal(5, 1, n // 2), rng.normal(40, 8, n - n // 2))),
+    }
+
+def assert_rank_close(values, q, estimate):
+    ordered = np.sort(values)
+    low = ordered[max(0, math.floor((q - RANK_ERROR) * len(ordered)))]
+    high = ordered[min(len(ordered) - 1, math.ceil((q + RANK_ERROR) * len(ordered)))]
+    assert low <= estimate <= high, (q, estimate, low, high)
+
+def moments_of(values):
+    values = np.asarray(values, dtype=np.float64)
+    mean = values.mean() if values.size else 0.0
+    return Moments(values.size, float(mean), float(((values - mean) ** 2).sum()))
+
+@pytest.mark.parametrize("splits", [1, 2, 7, 50])
+def test_merged_moments_match_single_pass(splits):
+    rng = np.random.default_rng(splits)
+    values = np.concatenate((rng.normal(1e6, 3, 900), rng.integers(0, 5, 1100).astype(float)))
+    merged = Moments()
+    for part in np.array_split(values, splits):
+        merged.merge(moments_of(part))
+    assert merged.count == values.size
+    assert merged.mean == pytest.approx(values.mean(), rel=1e-9, abs=1e-9)
+    assert merged.variance == pytest.approx(values.var(ddof=1), rel=1e-9, abs=1e-9)
+
+def test_moments_merge_with_empty_parts():
+    merged = Moments()
+    merged.merge(Moments())
+    merged.merge(moments_of([2.0, 4.0]))
+    merged.merge(Moments())
+    assert (merged.count, merged.mean, merged.variance) == (2, 3.0, 2.0)
+    assert math.isnan(moments_of([1.0]).variance)
+
+@pytest.mark.parametrize("name", ["lognormal", "uniform", "exponential", "bimodal"])
+def test_tdigest_quantiles_within_rank_error(name):
+    values = samples(0)[name]
+    digest = TDigest(200)
+    digest.add(values)
+    assert digest.count == values.size
+    assert digest.means.size <= 200
+    assert digest.quantile(0) == values.min()
+    assert digest.quantile(1) == values.max()
+    for q in QS:
+        assert_rank_close(values, q, digest.quantile(q))
+
+@pytest.mark.parametrize("name", ["lognormal", "uniform", "exponential", "bimodal"])
+def test_merged_digests_match_single_digest(name):
+    # As in main(): each chunk is summarized on its own, then the digests merge
+    values = samples(1)[name]
+    single = TDigest(200)
+    single.add(values)
+    merged = TDigest(200)
+    for part in np.array_split(values, 9):
+        digest = TDigest(200)
+        for chunk in np.array_split(part, 4):
+            digest.add(chunk)
+        merged.merge(digest)
+    assert merged.count == single.count
+    assert (merged.min, merged.max) == (single.min, single.max)
+    for q in QS:
+        assert_rank_close(values, q, merged.quantile(q))
+        assert_rank_close(values, q, single.quantile(q))
+
+def test_empty_digest():
+    digest = TDigest()
+    digest.add([])
+    assert math.isnan(digest.quantile(0.5))
+    assert math.isnan(TopicStats().report()["accuracy"])
+
+def write_export(directory, rows, seed):
+    # The columns attempt_stats reads, laid out as SessionHistory.export() writes them
+    rng = np.random.default_rng(seed)
+    directory.mkdir()
+    correct = rng.random(rows) < 0.7
+    submitted = np.where(rng.random(rows) < 0.05, np.nan, rng.normal(10, 3, rows))
+    columns = {
+        "topics": np.array(["Kinematics", "Free Fall", "Dynamics"]),
+        "topic": rng.integers(0, 3, rows).astype(np.uint8),
+        "submitted": submitted,
+        "hints": rng.integers(0, 4, rows).astype(np.uint8),
+        "elapsed": rng.lognormal(2.5, 0.6, rows).astype(np.float32),
+        "correct": correct,
+    }
+    for name, column in columns.items():
+        np.save(directory / f"{name}.npy", column)
+    return columns
+
+def test_process_pool_shards_match_one_pass(tmp_path):
+    exports = [write_export(tmp_path / f"class_{i}", 6000 + 1500 * i, i) for i in range(3)]
+    reports = []
+    for shard in (1000, 1 << 20):
+        out = tmp_path / f"report_{shard}.json"
+        attempt_stats.main([str(tmp_path), "--jobs", "2", "--shard", str(shard), "--chunk", "700",
+                            "--json", str(out)])
+        with open(out, encoding="utf-8") as f:
+            reports.append(json.load(f)["topics"])
+    sharded, whole = reports
+
+    for topic_id, topic in enumerate(["Kinematics", "Free Fall", "Dynamics"]):
+        answered = [(e["topic"] == topic_id) & ~np.isnan(e["submitted"]) for e in exports]
+        hints = np.concatenate([e["hints"][a] for e, a in zip(exports, answered)]).astype(float)
+        solved = np.concatenate([e["elapsed"][a & e["correct"]] for e, a in zip(exports, answered)])
+        for report in (sharded[topic], whole[topic]):
+            assert report["answered"] == hints.size
+            assert report["hints_mean"] == pytest.approx(hints.mean(), rel=1e-9)
+            assert report["hints_sd"] == pytest.approx(hints.std(ddof=1), rel=1e-9)
+            for q in (0.5, 0.9, 0.99):
+                assert_rank_close(solved, q, report["solve_time"][f"p{round(q * 100)}"])
+        assert sharded[topic]["accuracy"] == whole[topic]["accuracy"]
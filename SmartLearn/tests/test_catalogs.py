@@ -0,0 +1,87 @@
+import json
+import os
+
+import pytest
+
+pytest.importorskip("customtkinter")
+import smartlearn_physics as slp
+from smartlearn_physics import Catalog, Localizer, compile_catalog
+
+MESSAGES = {
+    "Next Problem ➡️": "Siguiente problema ➡️",
+    "Hint": "Pista",
+    "Check Answer": "Comprobar respuesta",
+    "A car accelerates from {v0} m/s.": "Un coche acelera desde {v0} m/s.",
+    "": "vacío",
+    "Untranslated": "",
+    "ñandú": "Ñandú",
+}
+
+def test_every_key_is_found():
+    catalog = Catalog(compile_catalog(MESSAGES))
+    assert catalog.count == 6  # empty translations are left out
+    for msgid, text in MESSAGES.items():
+        assert catalog.get(msgid) == (text or None)
+
+def test_absent_keys_miss():
+    catalog = Catalog(compile_catalog(MESSAGES))
+    for msgid in ("Next Problem", "hint", "Check Answer ", "zzz"):
+        assert catalog.get(msgid) is None
+    assert Catalog(compile_catalog({})).get("Hint") is None
+
+def test_colliding_hashes(monkeypatch):
+    # Every msgid in one of two buckets: lookups must compare the msgid itself
+    monkeypatch.setattr(slp, "_catalog_hash", lambda key: len(key) % 2)
+    catalog = Catalog(compile_catalog(MESSAGES))
+    for msgid, text in MESSAGES.items():
+        assert catalog.get(msgid) == (text or None)
+    assert catalog.get("Pist") is None  # same bucket as "Hint", no entry
+
+@pytest.mark.parametrize("data", [
+    b"", b"SLC1", b"XXXX" + compile_catalog(MESSAGES)[4:], compile_catalog(MESSAGES)[:-1],
+    compile_catalog(MESSAGES) + b"\0", compile_catalog(MESSAGES)[:40],
+])
+def test_damaged_catalogs_are_rejected(data):
+    with pytest.raises(ValueError):
+        Catalog(data)
+
+@pytest.fixture
+def locale_dir(tmp_path):
+    (tmp_path / "es").mkdir()
+    with open(tmp_path / "es" / "ui.json", "w", encoding="utf-8") as f:
+        json.dump(MESSAGES, f, ensure_ascii=False)
+    return tmp_path
+
+def test_localizer_compiles_and_falls_back_to_english(locale_dir):
+    locale = Localizer("es", str(locale_dir))
+    assert locale.tr("Hint") == "Pista"
+    assert locale.tr("Untranslated") == "Untranslated"
+    assert locale.tr("Not in the catalog") == "Not in the catalog"
+    assert locale.tr("Hint", domain="kinematics") == "Hint"  # no such domain
+    assert (locale_dir / "es" / "ui.slc").exists()
+    assert Localizer("en", str(locale_dir)).tr("Hint") == "Hint"
+
+def test_stale_catalog_is_recompiled(locale_dir):
+    Localizer("es", str(locale_dir)).tr("Hint")
+    source, compiled = locale_dir / "es" / "ui.json", locale_dir / "es" / "ui.slc"
+    updated = dict(MESSAGES, Hint="Ayuda")
+    with open(source, "w", encoding="utf-8") as f:
+        json.dump(updated, f)
+    stamp = os.path.getmtime(source)
+    os.utime(compiled, (stamp - 10, stamp - 10))
+    assert Localizer("es", str(locale_dir)).tr("Hint") == "Ayuda"
+    assert compiled.read_bytes() == compile_catalog(updated)
+
+@pytest.mark.parametrize("damage", [b"", b"garbage", compile_catalog(MESSAGES)[:-5]])
+def test_corrupt_catalog_is_recompiled(locale_dir, damage):
+    source, compiled = locale_dir / "es" / "ui.json", locale_dir / "es" / "ui.slc"
+    compiled.write_bytes(damage)
+    stamp = os.path.getmtime(source)
+    os.utime(compiled, (stamp + 10, stamp + 10))  # newer than the JSON, so not stale
+    assert Localizer("es", str(locale_dir)).tr("Check Answer") == "Comprobar respuesta"
+    assert compiled.read_bytes() == compile_catalog(MESSAGES)
+
+def test_corrupt_catalog_without_source_is_ignored(locale_dir):
+    (locale_dir / "es" / "ui.json").unlink()
+    (locale_dir / "es" / "ui.slc").write_bytes(b"garbage")
+    assert Localizer("es", str(locale_dir)).tr("Hint") == "Hint"
@@ -0,0 +1,119 @@
+import http.client
+import io
+import json
+import random
+import threading
+import urllib.request
+
+import pytest
+
+from classroom_server import MAX_SCORE, ClassroomClient, ClassroomServer, FenwickTree, Leaderboard
+
+def brute_rank(scores, student):
+    return 1 + sum(score > scores[student] for score in scores.values())
+
+def brute_top(scores, arrival, k):
+    # Highest score first; ties keep the order students reached that score in
+    order = sorted(scores, key=lambda s: (-scores[s], arrival[s]))
+    return [(brute_rank(scores, s), s, scores[s]) for s in order[:k]]
+
+def test_fenwick_prefix_and_find():
+    rng = random.Random(1)
+    counts = [rng.randrange(4) for _ in range(100)]
+    tree = FenwickTree(100)
+    for index, count in enumerate(counts):
+        tree.add(index, count)
+    for index in range(100):
+        assert tree.prefix(index) == sum(counts[:index + 1])
+    for k in range(1, sum(counts) + 1):
+        assert tree.find(k) == next(i for i in range(100) if sum(counts[:i + 1]) >= k)
+
+def test_fenwick_from_counts_matches_adds():
+    counts = {0: 2, 5: 1, 17: 3, 63: 1}
+    built = FenwickTree.from_counts(counts, 64)
+    added = FenwickTree(64)
+    for index, count in counts.items():
+        added.add(index, count)
+    assert built.tree == added.tree
+
+@pytest.mark.parametrize("seed", range(5))
+def test_leaderboard_matches_brute_force(seed):
+    rng = random.Random(seed)
+    board = Leaderboard()
+    scores, arrival, step = {}, {}, 0
+    for _ in range(500):
+        student = f"s{rng.randrange(40)}"
+        if student in scores and rng.random() < 0.5:
+            delta = rng.randrange(-scores[student], 50)
+            board.add(student, delta)
+            score = scores[student] + delta
+        else:
+            # Occasionally far past the tree size, so it has to grow
+            score = rng.randrange(3000) if rng.random() < 0.05 else rng.randrange(200)
+            board.set_score(student, score)
+        if scores.get(student) != score:
+            scores[student] = score
+            arrival[student] = step
+            step += 1
+
+        assert len(board) == len(scores)
+        probe = rng.choice(list(scores))
+        assert board.rank(probe) == brute_rank(scores, probe)
+        k = rng.randrange(1, 15)
+        assert board.top(k) == brute_top(scores, arrival, k)
+    assert board.top(len(scores) + 5) == brute_top(scores, arrival, len(scores))
+
+def test_leaderboard_rejects_out_of_range_scores():
+    board = Leaderboard()
+    for score in (-1, MAX_SCORE + 1):
+        with pytest.raises(ValueError):
+            board.set_score("ana", score)
+    assert len(board) == 0
+
+def post_score(server, payload):
+    return server.route("POST", "/score", {}, json.dumps(payload).encode())
+
+@pytest.mark.parametrize("payload", [
+    {"student": "ana", "score": 10 ** 9},
+    {"student": "ana", "score": MAX_SCORE + 1},
+    {"student": "ana", "score": -5},
+    {"student": "ana", "score": 12.5},
+    {"student": "ana", "score": "12"},
+    {"student": "ana", "score": True},
+    {"student": "ana", "delta": MAX_SCORE + 1},
+])
+def test_server_rejects_bad_scores(payload):
+    server = ClassroomServer()
+    status, body = post_score(server, payload)
+    assert status == 400
+    assert len(server.board) == 0
+    assert server.board.tree.size == FenwickTree().size
+    assert server.version == 0
+
+def test_server_accepts_scores_up_to_the_cap():
+    server = ClassroomServer()
+    assert post_score(server, {"student": "ana", "score": MAX_SCORE}) == \
+        (200, {"student": "ana", "score": MAX_SCORE, "rank": 1})
+    assert post_score(server, {"student": "ana", "delta": 1})[0] == 400
+    assert server.board.scores["ana"] == MAX_SCORE
+
+def test_client_survives_request_errors(monkeypatch):
+    errors = [ValueError("bad url"), http.client.RemoteDisconnected("dropped"), OSError("refused")]
+    sent = []
+    done = threading.Event()
+
+    def urlopen(request, timeout):
+        if errors:
+            raise errors.pop(0)
+        sent.append(json.loads(request.data))
+        done.set()
+        return io.BytesIO()
+
+    monkeypatch.setattr(urllib.request, "urlopen", urlopen)
+    client = ClassroomClient("http://teacher:8765", "ana")
+    for score in (1, 2, 3, 4):
+        client.submit(score)
+        while client.pending:
+            done.wait(0.01)
+    assert done.wait(5)
+    assert sent[-1] == {"student": "ana", "score": 4}
@@ -0,0 +1,35 @@
+import random
+
+import pytest
+
+pytest.importorskip("customtkinter")
+import smartlearn_physics as slp
+from smartlearn_physics import PhysicsProblem, draw_exam_paper, localized_problem_types
+
+def test_rows_match_the_problems_they_describe():
+    rows = draw_exam_paper(localized_problem_types(), 25, random.Random(0))
+    assert len(rows) == 25
+    for row in rows:
+        topic, problem_type, unit, params, answer, text, hints, solution = row
+        problem = PhysicsProblem(topic, problem_type=problem_type, params=params)
+        assert (problem.unit, problem.answer, problem.problem_text, problem.hints, problem.solution) == \
+            (unit, answer, text, hints, solution)
+        prepared = PhysicsProblem.prepared(*row)
+        assert (prepared.topic, prepared.problem_type, prepared.params, prepared.answer) == \
+            (topic, problem_type, params, answer)
+
+def test_every_topic_before_a_repeat():
+    kinds = localized_problem_types()
+    rows = draw_exam_paper(kinds, len(kinds), random.Random(1))
+    assert sorted(row[0] for row in rows) == sorted(kinds)
+
+def test_only_the_given_rng_is_used(monkeypatch):
+    # The worker must not touch the module-level random or the locale
+    kinds = localized_problem_types()
+    random.seed(5)
+    expected = random.random()
+    random.seed(5)
+    monkeypatch.setattr(slp, "LOCALE", None)
+    first = draw_exam_paper(kinds, 12, random.Random(2))
+    assert random.random() == expected
+    assert draw_exam_paper(kinds, 12, random.Random(2)) == first
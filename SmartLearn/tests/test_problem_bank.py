@@ -0,0 +1,81 @@
+import multiprocessing
+import random
+
+import pytest
+
+pytest.importorskip("customtkinter")
+import smartlearn_physics as slp
+from problem_bank import ProblemBank, sample_rows
+
+def all_kinds():
+    return [kind for kinds in slp.PROBLEM_TYPES.values() for kind in kinds]
+
+class FirstIndices:
+    # A stand-in rng whose sample() returns the first k indices in order
+    def sample(self, population, k):
+        return list(population)[:k]
+
+@pytest.mark.parametrize("kind", all_kinds(), ids=lambda k: f"{k.topic}-{k.problem_type}")
+def test_sample_rows_decodes_in_product_order(kind):
+    space = list(kind.param_space())
+    assert sample_rows(kind, len(space), random.Random(0)) == space
+    count = min(len(space) - 1, 500)
+    assert sample_rows(kind, count, FirstIndices()) == space[:count]
+    rows = sample_rows(kind, count, random.Random(1))
+    assert len(set(rows)) == count
+    assert set(rows) <= set(space)
+
+def test_sample_rows_handles_large_spaces():
+    # 10^12 combinations: sampling must not enumerate them
+    spec = {"topic": "Huge", "type": 1, "answer": "a + b + c + d", "text": "", "hints": [], "solution": "",
+            "params": {name: {"min": 0, "max": 999} for name in "abcd"}}
+    kind = slp.ProblemTemplate(spec)
+    rows = sample_rows(kind, 1000, random.Random(2))
+    assert len(set(rows)) == 1000
+    assert all(len(row) == 4 and all(0 <= v <= 999 for v in row) for row in rows)
+
+def table_contents(bank):
+    # Every stored row as (topic, type, params, answer)
+    return [(topic, table.problem_type, table.params(row), table.answer(row))
+            for topic, tables in bank.tables.items() for table in tables for row in range(table.rows)]
+
+def read_bank(name):
+    # Runs in a spawned worker
+    bank = ProblemBank.attach(name)
+    try:
+        return table_contents(bank)
+    finally:
+        bank.close()
+
+def test_bank_rows_match_compute():
+    bank = ProblemBank.create(max_rows=300, seed=4)
+    try:
+        for kind in all_kinds():
+            table = bank.table(kind.topic, kind.problem_type)
+            space = set(kind.param_space())
+            assert table.rows == min(300, len(space))
+            for row in range(table.rows):
+                params = table.params(row)
+                assert params in space
+                assert table.answer(row) == kind.compute(params)
+        with pytest.raises(KeyError):
+            bank.table("Kinematics", 99)
+        problem = bank.problem("Dynamics", rng=random.Random(0))
+        assert problem.answer == slp.find_problem_type("Dynamics", problem.problem_type).compute(problem.params)
+    finally:
+        bank.close()
+
+def test_spawned_worker_reads_the_same_bank():
+    bank = ProblemBank.create(max_rows=200, seed=5)
+    try:
+        expected = table_contents(bank)
+        with multiprocessing.get_context("spawn").Pool(1) as pool:
+            assert pool.apply(read_bank, (bank.name,)) == expected
+        # The worker has exited; the segment must still be there
+        again = ProblemBank.attach(bank.name)
+        try:
+            assert table_contents(again) == expected
+        finally:
+            again.close()
+    finally:
+        bank.close()
@@ -0,0 +1,118 @@
+import random
+import threading
+
+import pytest
+
+pytest.importorskip("customtkinter")
+import smartlearn_physics as slp
+from smartlearn_physics import AtomicWriter, PhysicsProblem, ProfileStore, StudentProfile
+
+EMPTY = StudentProfile("x", slp.SessionHistory()).nbytes  # an empty profile's size
+
+def practise(profile, count):
+    random.seed(count)
+    for _ in range(count):
+        problem = PhysicsProblem("Kinematics")
+        profile.history.record(problem, problem.answer, 0, 2.0, True)
+        profile.score += 10
+        profile.problems_solved += 1
+
+def in_memory(store):
+    return sum(profile.nbytes for profile in store.profiles.values())
+
+@pytest.fixture
+def store(tmp_path):
+    # Room for three empty profiles
+    writer = AtomicWriter()
+    yield ProfileStore(str(tmp_path), 3 * EMPTY + EMPTY // 2, writer=writer)
+    assert writer.flush()
+
+def test_least_recently_used_is_evicted_first(store):
+    for name in ("ana", "ben", "cai"):
+        store.get(name)
+    store.get("ana")
+    store.get("dee")
+    assert store.recent() == ["dee", "ana", "cai"]
+    store.get("cai")
+    store.get("eve")
+    assert store.recent() == ["eve", "cai", "dee"]
+
+def test_active_profile_is_never_evicted(store):
+    store.memory_limit = 1
+    profile = store.get("ana")
+    assert store.recent() == ["ana"]
+    assert store.get("ben") is not profile
+    assert store.recent() == ["ben"]
+
+def test_cap_holds_when_a_cached_profile_grows(store):
+    for name in ("ana", "ben", "cai"):
+        store.get(name)
+    assert in_memory(store) <= store.memory_limit
+    # The active profile grows past what is left for the others
+    cai = store.get("cai")
+    practise(cai, 40)
+    assert in_memory(store) > store.memory_limit
+    store.save(cai)
+    assert in_memory(store) <= store.memory_limit
+    assert store.recent() == ["cai", "ben"]
+
+def test_put_enforces_the_cap(store):
+    for name in ("ana", "ben", "cai"):
+        store.get(name)
+    big = StudentProfile("dee", slp.SessionHistory())
+    practise(big, 40)
+    store.put(big)
+    assert store.recent()[0] == "dee"
+    assert in_memory(store) <= store.memory_limit
+
+def test_evicted_profile_is_reloaded_from_disk(store, tmp_path):
+    ana = store.get("ana")
+    practise(ana, 5)
+    for name in ("ben", "cai", "dee"):
+        store.get(name)
+    assert "ana" not in store.recent()
+    assert store.writer.flush()
+
+    fresh = ProfileStore(str(tmp_path), store.memory_limit, writer=AtomicWriter())
+    for reloaded in (store.get("ana"), fresh.get("ana")):
+        assert reloaded is not ana
+        assert (reloaded.score, reloaded.problems_solved, len(reloaded.history)) == (50, 5, 5)
+
+def test_reads_see_writes_still_queued(store, monkeypatch):
+    # Hold every disk write until released: an evicted profile read back in the
+    # meantime must come from the writer's queue, not the stale (missing) file
+    release = threading.Event()
+    real_write = slp.write_atomic
+
+    def slow_write(path, data):
+        release.wait(10)
+        real_write(path, data)
+
+    monkeypatch.setattr(slp, "write_atomic", slow_write)
+    try:
+        ana = store.get("ana")
+        practise(ana, 3)
+        for name in ("ben", "cai", "dee"):
+            store.get(name)
+        assert "ana" not in store.recent()
+        assert store.writer.latest(store.path("ana")) is not None
+
+        reloaded = store.get("ana")
+        assert (reloaded.score, len(reloaded.history)) == (30, 3)
+        practise(reloaded, 2)
+        for name in ("ben", "cai", "dee"):
+            store.get(name)
+        again = store.get("ana")
+        assert (again.score, len(again.history)) == (50, 5)
+    finally:
+        release.set()
+    assert store.writer.flush()
+    assert not store.writer.errors
+
+def test_memory_only_store_keeps_nothing_on_disk(tmp_path):
+    store = ProfileStore(None, 2 * EMPTY)
+    practise(store.get("ana"), 2)
+    store.get("ben")
+    store.get("cai")
+    assert store.get("ana").score == 0
+    assert not list(tmp_path.iterdir())
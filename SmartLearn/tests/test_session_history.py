@@ -0,0 +1,70 @@
+import math
+import random
+
+import pytest
+
+pytest.importorskip("customtkinter")
+from smartlearn_physics import PROBLEM_TYPES, PhysicsProblem, SessionHistory
+
+def record_attempts(history, count, seed=0):
+    # Records `count` attempts with timestamps 0..count-1; returns the problems
+    rng = random.Random(seed)
+    random.seed(seed)
+    problems = []
+    for i in range(count):
+        problem = PhysicsProblem(rng.choice(list(PROBLEM_TYPES)))
+        history.record(problem, problem.answer if i % 3 else None, i % 4, 1.5 * i, i % 3 != 0, timestamp=i,
+                       mode="Drill" if i % 2 else "Study")
+        problems.append(problem)
+    return problems
+
+def rows(history):
+    # NaN marks a missing value and never equals itself, so compare it as None
+    return [tuple(None if isinstance(v, float) and math.isnan(v) else v for v in attempt) for attempt in history]
+
+def test_ring_buffer_keeps_newest_in_order():
+    history = SessionHistory(capacity=5)
+    problems = record_attempts(history, 13)
+    assert len(history) == 5
+    assert history.total == 13
+    assert [a.timestamp for a in history] == [8, 9, 10, 11, 12]
+    assert [(a.topic, a.params) for a in history] == [(p.topic, tuple(p.params)) for p in problems[8:]]
+    assert [a.timestamp for a in history.last(3)] == [12, 11, 10]
+    assert history[-1].timestamp == 12 and history[0].timestamp == 8
+    with pytest.raises(IndexError):
+        history[5]
+
+def test_unbounded_history_keeps_everything():
+    history = SessionHistory()
+    record_attempts(history, 7)
+    assert [a.timestamp for a in history] == list(range(7))
+    assert [a.mode for a in history] == ["Study", "Drill"] * 3 + ["Study"]
+
+@pytest.mark.parametrize("recorded", [3, 5, 12])
+def test_dump_load_round_trip(recorded):
+    history = SessionHistory(capacity=5)
+    record_attempts(history, recorded)
+    loaded, offset = SessionHistory.load(history.dump(), capacity=5)
+    assert offset == len(history.dump())
+    assert rows(loaded) == rows(history)
+    # The loaded ring keeps wrapping in order
+    record_attempts(loaded, 2, seed=1)
+    record_attempts(history, 2, seed=1)
+    assert rows(loaded) == rows(history)
+
+def test_load_truncates_to_smaller_capacity():
+    history = SessionHistory(capacity=10)
+    record_attempts(history, 14)
+    loaded, _ = SessionHistory.load(history.dump(), capacity=4)
+    assert len(loaded) == 4
+    assert rows(loaded) == rows(history)[-4:]
+    record_attempts(loaded, 1, seed=2)
+    assert [a.timestamp for a in loaded] == [11, 12, 13, 0]
+
+def test_load_with_offset():
+    history = SessionHistory()
+    record_attempts(history, 4)
+    data = b"prefix" + history.dump() + b"suffix"
+    loaded, offset = SessionHistory.load(data, 6)
+    assert data[offset:] == b"suffix"
+    assert rows(loaded) == rows(history)
@@ -0,0 +1,46 @@
+import random
+import struct
+
+import pytest
+
+pytest.importorskip("customtkinter")
+from smartlearn_physics import SNAPSHOT_VERSION, PhysicsProblem, pack_snapshot, unpack_snapshot
+
+def test_round_trip():
+    random.seed(3)
+    problem = PhysicsProblem("Kinematics")
+    data = pack_snapshot(120, 9, 2, "ProblemFrame", problem, draft="12.5", student="Zoë")
+    state = unpack_snapshot(data)
+    assert state["score"] == 120
+    assert state["problems_solved"] == 9
+    assert state["hints_shown"] == 2
+    assert state["screen"] == "ProblemFrame"
+    assert state["problem"] == (problem.topic, problem.problem_type, tuple(problem.params))
+    assert state["draft"] == "12.5"
+    assert state["student"] == "Zoë"
+    rebuilt = PhysicsProblem(state["problem"][0], problem_type=state["problem"][1], params=state["problem"][2])
+    assert rebuilt.answer == problem.answer
+
+def test_round_trip_without_problem():
+    state = unpack_snapshot(pack_snapshot(0, 0, 300, "HomeFrame"))
+    assert state["problem"] is None
+    assert state["hints_shown"] == 255  # stored in one byte
+    assert (state["draft"], state["student"]) == ("", "")
+
+def test_rejects_other_versions():
+    data = bytearray(pack_snapshot(5, 1, 0, "HomeFrame"))
+    data[4] = SNAPSHOT_VERSION + 1
+    with pytest.raises(ValueError):
+        unpack_snapshot(bytes(data))
+
+def test_rejects_other_files():
+    data = b"SLPF" + pack_snapshot(5, 1, 0, "HomeFrame")[4:]
+    with pytest.raises(ValueError):
+        unpack_snapshot(data)
+
+def test_rejects_truncated_data():
+    data = pack_snapshot(5, 1, 0, "TopicFrame", draft="typed")
+    with pytest.raises((ValueError, struct.error)):
+        unpack_snapshot(data[:-3])
+    with pytest.raises((ValueError, struct.error)):
+        unpack_snapshot(data[:10])
@@ -0,0 +1,160 @@
+import json
+import os
+import random
+import re
+
+import pytest
+
+pytest.importorskip("customtkinter")
+import smartlearn_physics as slp
+from smartlearn_physics import PROBLEM_TYPES, PhysicsProblem, ProblemTemplate, TemplateError, load_templates
+
+# Output of the hand-written generate_* methods the templates replaced, for
+# random.seed(0..7) on each topic
+with open(os.path.join(os.path.dirname(__file__), "data", "handwritten_problems.json"), encoding="utf-8") as f:
+    HANDWRITTEN = json.load(f)
+
+def output(problem):
+    return {"text": problem.problem_text, "answer": problem.answer, "unit": problem.unit,
+            "hints": problem.hints, "solution": problem.solution}
+
+def expected(case):
+    return {key: case[key] for key in ("text", "answer", "unit", "hints", "solution")}
+
+@pytest.mark.parametrize("case", [c for c in HANDWRITTEN if c["topic"] != "Unit Conversion"],
+                         ids=lambda c: f"{c['topic']}-{c['seed']}")
+def test_builtin_templates_match_handwritten_generators(case):
+    random.seed(case["seed"])
+    assert output(PhysicsProblem(case["topic"])) == expected(case)
+
+@pytest.mark.parametrize("case", [c for c in HANDWRITTEN if c["topic"] == "Unit Conversion"],
+                         ids=lambda c: f"Unit Conversion-{c['seed']}")
+def test_unit_conversion_matches_handwritten_for_the_same_value(case):
+    # Random draws differ (each conversion is its own type now), so compare the
+    # problem the old generator picked, rebuilt from its value
+    value = int(re.match(r"Convert (\d+) ", case["text"]).group(1))
+    rebuilt = [output(PhysicsProblem("Unit Conversion", problem_type=kind.problem_type, params=(value,)))
+               for kind in PROBLEM_TYPES["Unit Conversion"]]
+    assert expected(case) in rebuilt
+
+def test_answers_match_compute():
+    rng = random.Random(5)
+    for kinds in PROBLEM_TYPES.values():
+        for kind in kinds:
+            for _ in range(20):
+                params, answer, *_ = kind.generate(rng)
+                assert kind.compute(params) == answer
+
+def spec(**changes):
+    base = {
+        "topic": "Waves", "type": 1, "unit": "m/s",
+        "params": {"f": {"min": 2, "max": 20}, "lam": {"choices": [0.5, 1, 2]}, "k": {"value": 3}},
+        "derived": {"v": "f * lam"},
+        "answer": "v",
+        "text": "A wave has frequency {f} Hz and wavelength {lam} m.",
+        "hints": ["v = {f} × {lam} = {v:.1f} m/s"],
+        "solution": "v = {v} m/s",
+    }
+    base.update(changes)
+    return base
+
+def test_template_compiles():
+    template = ProblemTemplate(spec())
+    params, answer, text, hints, solution = template.render((4, 0.5))
+    assert params == (4, 0.5)
+    assert answer == 2.0
+    assert text == "A wave has frequency 4 Hz and wavelength 0.5 m."
+    assert hints == ["v = 4 × 0.5 = 2.0 m/s"]
+    assert template.compute((4, 0.5)) == 2.0
+    assert len(list(template.param_space())) == 19 * 3
+
+@pytest.mark.parametrize("expression", [
+    "f.real",                      # attribute access
+    "lam.__class__",
+    "__import__('os')",            # calls to names outside TEMPLATE_FUNCTIONS
+    "open('x')",
+    "eval('1')",
+    "f(1)",
+    "sqrt(x=4)",
+    "(lambda: 1)()",
+    "import os",                   # statements do not parse as an expression
+    "__builtins__",                # dunder and unknown names
+    "__class__",
+    "undefined + 1",
+    "[f, lam][0]",                 # other syntax
+    "f if lam else 1",
+    "f < lam",
+    "'text'",
+    "f and lam",
+])
+def test_forbidden_expressions_are_rejected(expression):
+    with pytest.raises(TemplateError):
+        ProblemTemplate(spec(answer=expression))
+    with pytest.raises(TemplateError):
+        ProblemTemplate(spec(derived={"v": expression}))
+
+@pytest.mark.parametrize("text", [
+    "{f.__class__}", "{f[0]}", "{f!r}", "{unknown}", "{f:{lam}}", "{f", "{f:'+__import__('os')+'}",
+])
+def test_forbidden_format_fields_are_rejected(text):
+    with pytest.raises(TemplateError):
+        ProblemTemplate(spec(text=text))
+
+@pytest.mark.parametrize("name", ["__x", "_f", "class", "sqrt", "2f", "a-b"])
+def test_bad_names_are_rejected(name):
+    with pytest.raises(TemplateError):
+        ProblemTemplate(spec(params={name: {"min": 1, "max": 2}}, derived={}, answer="1"))
+
+@pytest.mark.parametrize("changes", [
+    {"type": 0}, {"type": 256}, {"type": "3"}, {"type": 1.5}, {"type": True},
+    {"topic": ""}, {"topic": 7},
+    {"params": "f"}, {"params": {"f": {"min": 5, "max": 1}}}, {"params": {"f": {"choices": []}}},
+    {"params": {"f": {"choices": ["a"]}}}, {"hints": None},
+])
+def test_invalid_specs_are_rejected(changes):
+    with pytest.raises(TemplateError):
+        ProblemTemplate(spec(**changes))
+
+def test_missing_keys_are_rejected():
+    for key in ("topic", "type", "params", "answer", "text", "hints", "solution"):
+        broken = spec()
+        del broken[key]
+        with pytest.raises(TemplateError, match=key):
+            ProblemTemplate(broken)
+
+@pytest.fixture
+def registry(monkeypatch):
+    # load_templates registers into PROBLEM_TYPES; give it a copy to change
+    types = {topic: list(kinds) for topic, kinds in PROBLEM_TYPES.items()}
+    monkeypatch.setattr(slp, "PROBLEM_TYPES", types)
+    return types
+
+def test_malformed_files_are_skipped(tmp_path, registry, capsys):
+    (tmp_path / "a_broken.toml").write_text("[[template]\ntopic = ", encoding="utf-8")
+    (tmp_path / "b_broken.json").write_text("[{", encoding="utf-8")
+    (tmp_path / "c_object.json").write_text('{"topic": "Waves"}', encoding="utf-8")
+    (tmp_path / "d_type.json").write_text(json.dumps([spec(topic="Optics", type=300)]), encoding="utf-8")
+    (tmp_path / "e_partly_bad.json").write_text(json.dumps([spec(topic="Optics"), spec(answer="f.real")]),
+                                                encoding="utf-8")
+    (tmp_path / "f_duplicate.json").write_text(json.dumps([spec(topic="Kinematics")]), encoding="utf-8")
+    (tmp_path / "g_good.json").write_text(json.dumps([spec(), spec(type=2)]), encoding="utf-8")
+    (tmp_path / "notes.txt").write_text("not a template", encoding="utf-8")
+
+    assert load_templates(str(tmp_path)) == 2
+    assert [kind.problem_type for kind in registry["Waves"]] == [1, 2]
+    assert "Optics" not in registry
+    errors = capsys.readouterr().err
+    for name in ("a_broken.toml", "b_broken.json", "c_object.json", "d_type.json", "e_partly_bad.json"):
+        assert name in errors
+    assert "Duplicate problem type 1 for topic 'Kinematics'" in errors
+
+def test_toml_templates_load(tmp_path, registry):
+    (tmp_path / "waves.toml").write_text(
+        '[[template]]\ntopic = "Waves"\ntype = 1\nanswer = "v"\ntext = "{f} Hz"\n'
+        'hints = ["{v}"]\nsolution = "{v}"\n[template.params]\nf = { min = 2, max = 4 }\n'
+        '[template.derived]\nv = "f * 2"\n', encoding="utf-8")
+    assert load_templates(str(tmp_path)) == 1
+    assert PhysicsProblem("Waves", problem_type=1, params=(3,)).answer == 6
+
+def test_missing_directory_loads_nothing(tmp_path):
+    assert load_templates(str(tmp_path / "missing")) == 0